@@ -4,9 +4,13 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from .ids import new_id as make_id
 from .db import (
     list_users,
     list_actions,
+    query_actions,
+    count_actions,
+    get_action,
     list_ncrs,
     upsert_action as db_upsert_action,
     upsert_ncr as db_upsert_ncr,
@@ -21,25 +25,41 @@ def now_iso() -> str:
 
 
 def new_id(prefix: str) -> str:
-    return f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    return make_id(prefix)
 
 
 def list_usernames() -> List[str]:
     return sorted([u["username"] for u in list_users()])
 
 
+def _with_related(a: Dict[str, Any]) -> Dict[str, Any]:
+    rel = {}
+    if a.get("related_ncr_id"):
+        rel["ncr_id"] = a.get("related_ncr_id")
+    if a.get("related_entry_id"):
+        rel["entry_id"] = a.get("related_entry_id")
+    a = dict(a)
+    a["related"] = rel
+    return a
+
+
 def load_actions_store() -> Dict[str, Any]:
-    actions = []
-    for a in list_actions():
-        rel = {}
-        if a.get("related_ncr_id"):
-            rel["ncr_id"] = a.get("related_ncr_id")
-        if a.get("related_entry_id"):
-            rel["entry_id"] = a.get("related_entry_id")
-        a = dict(a)
-        a["related"] = rel
-        actions.append(a)
-    return {"version": 1, "actions": actions}
+    return {"version": 1, "actions": [_with_related(a) for a in list_actions()]}
+
+
+def load_actions_page(filters: Dict[str, Any], after=None, limit: int = 200) -> Dict[str, Any]:
+    """One Action Center page: {"actions", "next", "total"} (filters as db.query_actions)."""
+    page = query_actions(after=after, limit=limit, **filters)
+    return {
+        "actions": [_with_related(a) for a in page["rows"]],
+        "next": page["next"],
+        "total": count_actions(**filters),
+    }
+
+
+def find_action(action_id: str) -> Optional[Dict[str, Any]]:
+    a = get_action(action_id)
+    return _with_related(a) if a else None
 
 
 def save_actions_store(store: Dict[str, Any]) -> None:
@@ -0,0 +1,152 @@
+# app/alerts.py
+"""
+Incremental, persisted alert engine for the Notifications screen.
+
+Alerts live in the alerts table, one row per stable key (andon:<entry>,
+risk:<entry>, copq:<entry>, gage:<gage_id>), with status Open / Acknowledged /
+Resolved and an optional snooze. The rules are quality_engine's
+entry_notifications and gage_notifications.
+
+Triggers on tool_entries (db.ALERT_ENTRY_COLUMNS) queue the id of every entry
+whose alert inputs were inserted, changed or deleted. evaluate() reads the
+queue past its watermark (meta alerts_entry_seq), re-evaluates just those
+entries and moves the watermark, so a refresh costs O(changed entries):
+
+- an alert produced again keeps its ack/snooze, unless it was resolved or its
+  severity went up, in which case it is open again;
+- an entry's alerts that are no longer produced (or whose entry was deleted)
+  are resolved.
+
+Gages live in GAGES_FILE and their due status moves with the calendar, so the
+(few) gages are re-evaluated when the file, the risk settings or the date
+changed. When RISK_CONFIG_FILE changes (COPQ thresholds) and on the very first
+run, the current month's entries are evaluated from scratch instead of the
+queue.
+
+Bootstrap runs one evaluate() in the background (start_evaluator), so the
+queue is trimmed to the watermark on a station that never opens Notifications.
+An archive purge (app/archive.py) drops what it queues: archived entries keep
+their alerts.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from . import db
+from .config import ALERTS_BATCH_SIZE, GAGES_FILE, RISK_CONFIG_FILE, current_month_iso
+from .quality_engine import entry_notifications, gage_notifications
+from .rule_config import RiskRules, gages, risk_rules
+from .storage import ENTRY_COLUMNS
+
+
+def _mtime(path: str) -> str:
+    try:
+        return str(os.path.getmtime(path))
+    except OSError:
+        return "0"
+
+
+def _entry_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """tool_entries row -> the ENTRY_COLUMNS names the rules read."""
+    return {c: row.get(c.lower(), "") for c in ENTRY_COLUMNS}
+
+
+def _entry_alerts(rows: List[Dict[str, Any]], risk_cfg: RiskRules) -> List[Dict[str, Any]]:
+    alerts: List[Dict[str, Any]] = []
+    for r in rows:
+        alerts.extend(entry_notifications(_entry_row(r), risk_cfg))
+    return alerts
+
+
+def evaluate(batch: int = ALERTS_BATCH_SIZE) -> Dict[str, Any]:
+    """Bring the alerts table up to date. Returns what was evaluated."""
+    risk_cfg = risk_rules()
+    rules_sig = _mtime(RISK_CONFIG_FILE)
+    stats = {"rescan": False, "entries": 0, "gages": False, "upserted": 0, "resolved": 0}
+
+    def add(result: Dict[str, int]) -> None:
+        stats["upserted"] += result["upserted"]
+        stats["resolved"] += result["resolved"]
+
+    seq = db.get_meta("alerts_entry_seq")
+    if seq is None or db.get_meta("alerts_rules_sig") != rules_sig:
+        # Read the queue head first: entries written meanwhile are still queued after it.
+        head = db.alert_queue_head()
+        rows = db.fetch_tool_entries(current_month_iso())
+        add(db.save_alerts(
+            _entry_alerts(rows, risk_cfg),
+            entry_ids=[r["id"] for r in rows],
+            queue_seq=head,
+            meta={"alerts_rules_sig": rules_sig},
+        ))
+        stats["rescan"] = True
+        stats["entries"] += len(rows)
+        seq = head
+
+    seq = int(seq)
+    while True:
+        page = db.alert_queue_since(seq, batch)
+        if page["last_seq"] == seq:
+            break
+        rows = db.fetch_tool_entries_by_ids(page["entry_ids"])
+        add(db.save_alerts(
+            _entry_alerts(rows, risk_cfg),
+            entry_ids=page["entry_ids"],
+            queue_seq=page["last_seq"],
+        ))
+        stats["entries"] += len(page["entry_ids"])
+        seq = page["last_seq"]
+
+    gage_sig = f"{_mtime(GAGES_FILE)}|{rules_sig}|{datetime.now():%Y-%m-%d}"
+    if db.get_meta("alerts_gage_sig") != gage_sig:
+        add(db.save_alerts(
+            gage_notifications(gages(), risk_cfg),
+            gages=True,
+            meta={"alerts_gage_sig": gage_sig},
+        ))
+        stats["gages"] = True
+    return stats
+
+
+_evaluator: Optional[threading.Thread] = None
+
+
+def start_evaluator() -> threading.Thread:
+    """Run evaluate() in the background unless a pass is running; returns that pass."""
+    global _evaluator
+    if _evaluator is None or not _evaluator.is_alive():
+        _evaluator = threading.Thread(target=evaluate, daemon=True, name="alerts")
+        _evaluator.start()
+    return _evaluator
+
+
+def list_alerts(
+    min_severity: str = "",
+    *,
+    include_acked: bool = False,
+    include_snoozed: bool = False,
+) -> List[Dict[str, Any]]:
+    """Unresolved alerts, most severe first; acknowledged and snoozed ones on request."""
+    return db.query_alerts(
+        min_severity=min_severity,
+        include_acked=include_acked,
+        include_snoozed=include_snoozed,
+    )
+
+
+def acknowledge(alert_key: str, user: str = "") -> bool:
+    ok = db.ack_alert(alert_key, user)
+    if ok:
+        db.log_audit(user, f"Acknowledged alert {alert_key}")
+    return ok
+
+
+def snooze(alert_key: str, hours: float, user: str = "") -> bool:
+    until = (datetime.now() + timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+    ok = db.snooze_alert(alert_key, until)
+    if ok:
+        db.log_audit(user, f"Snoozed alert {alert_key} until {until}")
+    return ok
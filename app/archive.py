@@ -0,0 +1,267 @@
+# app/archive.py
+"""
+Closed-month archive for tool_entries.
+
+Months older than the current quarter are only read for analytics, so they can
+be snapshotted to one compressed Parquet file per month under ARCHIVE_DIR and
+removed from the live table. manifest.json records what has been archived.
+
+Reads go through memory-mapped files with column projection, so a long-window
+Pareto only touches the columns it groups/sums.
+
+pyarrow is optional: without it nothing is archived and the app keeps reading
+the live table only.
+
+Run manually:  python -m app.archive [--keep-live]
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .config import ARCHIVE_DIR, ARCHIVE_MANIFEST_FILE
+from .db import connect, iter_query, list_entry_months
+from .storage import ENTRY_COLUMNS, load_json, save_json
+from .sync import unlogged
+
+CHUNK_ROWS = 5000
+COMPRESSION = "zstd"
+
+NUMERIC_COLUMNS = {"Downtime_Mins", "Production_Qty", "Cost", "Tool_Life", "Defect_Qty", "COPQ_Est"}
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None, None
+    return pa, pq
+
+
+def archive_available() -> bool:
+    return _arrow()[0] is not None
+
+
+def _schema(pa):
+    return pa.schema([(c, pa.float64() if c in NUMERIC_COLUMNS else pa.string()) for c in ENTRY_COLUMNS])
+
+
+# -----------------------------
+# Manifest
+# -----------------------------
+def load_manifest() -> Dict[str, Any]:
+    manifest = load_json(ARCHIVE_MANIFEST_FILE, {})
+    if not isinstance(manifest, dict):
+        manifest = {}
+    manifest.setdefault("version", 1)
+    manifest.setdefault("months", {})
+    return manifest
+
+
+def archived_months() -> List[str]:
+    """YYYY-MM keys with an archive file, newest first."""
+    months = load_manifest()["months"]
+    return sorted(
+        [m for m, info in months.items() if os.path.exists(archive_path(m))],
+        reverse=True,
+    )
+
+
+def archive_path(month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"tool_entries_{month.replace('-', '_')}.parquet")
+
+
+# -----------------------------
+# Month helpers
+# -----------------------------
+def _month_bounds(month: str) -> tuple[str, str]:
+    """[first day, first day of next month) as YYYY-MM-DD strings."""
+    y, m = int(month[:4]), int(month[5:7])
+    ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+    return f"{y:04d}-{m:02d}-01", f"{ny:04d}-{nm:02d}-01"
+
+
+def months_between(start: str, end: str) -> List[str]:
+    """YYYY-MM keys covering the YYYY-MM-DD range [start, end]."""
+    y, m = int(start[:4]), int(start[5:7])
+    ey, em = int(end[:4]), int(end[5:7])
+    out = []
+    while (y, m) <= (ey, em):
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def closed_months(now: Optional[datetime] = None) -> List[str]:
+    """Live months strictly older than the current quarter (oldest first)."""
+    now = now or datetime.now()
+    q_start = f"{now.year:04d}-{((now.month - 1) // 3) * 3 + 1:02d}"
+    return sorted(m for m in list_entry_months() if m < q_start)
+
+
+# -----------------------------
+# Write
+# -----------------------------
+def _column_arrays(pa, schema, rows: List[tuple]):
+    cols = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, cols):
+        if field.name in NUMERIC_COLUMNS:
+            arrays.append(pa.array([float(v or 0.0) for v in values], type=field.type))
+        else:
+            arrays.append(pa.array(["" if v is None else str(v) for v in values], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def archive_month(month: str, *, purge: bool = True) -> int:
+    """
+    Snapshot one month of tool_entries into its Parquet file.
+    If the month was archived before, rows already in the file are kept unless the
+    live table has a newer copy (same ID). When purge is set, the archived rows are
+    deleted from the live table after the file is written and its row count checked.
+    Returns rows in the archive file.
+    """
+    pa, pq = _arrow()
+    if pa is None:
+        raise RuntimeError("pyarrow is required to archive months (pip install pyarrow).")
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    first, after = _month_bounds(month)
+    path = archive_path(month)
+    tmp = path + ".tmp"
+    schema = _schema(pa)
+    db_cols = ", ".join(c.lower() for c in ENTRY_COLUMNS)
+
+    live_ids = set()
+    written = 0
+    writer = pq.ParquetWriter(tmp, schema, compression=COMPRESSION)
+    try:
+        batch: List[tuple] = []
+        for row in iter_query(
+            f"SELECT {db_cols} FROM tool_entries WHERE date >= ? AND date < ? ORDER BY date, time, id",
+            (first, after),
+            chunk_rows=CHUNK_ROWS,
+        ):
+            live_ids.add(str(row[0]))
+            batch.append(row)
+            if len(batch) >= CHUNK_ROWS:
+                writer.write_batch(_column_arrays(pa, schema, batch))
+                written += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(_column_arrays(pa, schema, batch))
+            written += len(batch)
+
+        # Carry over previously archived rows that were not re-read from the live table.
+        if os.path.exists(path):
+            for old in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=CHUNK_ROWS):
+                keep = [i for i, v in enumerate(old.column(0).to_pylist()) if v not in live_ids]
+                if keep:
+                    writer.write_batch(old.take(pa.array(keep)))
+                    written += len(keep)
+    except BaseException:
+        writer.close()
+        os.remove(tmp)
+        raise
+    writer.close()
+
+    if pq.ParquetFile(tmp).metadata.num_rows != written:
+        os.remove(tmp)
+        raise RuntimeError(f"Archive row count mismatch for {month}; live rows left untouched.")
+    os.replace(tmp, path)
+
+    manifest = load_manifest()
+    manifest["months"][month] = {
+        "file": os.path.basename(path),
+        "rows": written,
+        "bytes": os.path.getsize(path),
+        "archived_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "purged": bool(purge),
+    }
+    save_json(ARCHIVE_MANIFEST_FILE, manifest)
+
+    if purge and live_ids:
+        _delete_live(month, live_ids)
+    return written
+
+
+def _delete_live(month: str, ids: Iterable[str]) -> None:
+    """Delete exactly the archived IDs, so rows written during the snapshot survive."""
+    first, after = _month_bounds(month)
+    ids = list(ids)
+    # Archiving is local housekeeping, not a delete to replicate to other stations.
+    with connect() as conn, unlogged(conn):
+        # Nor a delete that resolves the entries' alerts: drop what the delete trigger queues.
+        head = conn.execute("SELECT COALESCE(MAX(seq), 0) AS s FROM alert_queue").fetchone()["s"]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ", ".join(["?"] * len(chunk))
+            conn.execute(
+                f"DELETE FROM tool_entries WHERE date >= ? AND date < ? AND id IN ({marks})",
+                [first, after, *chunk],
+            )
+        conn.execute("DELETE FROM alert_queue WHERE seq > ?", (head,))
+
+
+def archive_closed_months(*, purge: bool = True, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Archive every live month older than the current quarter. Returns {month: rows}."""
+    return {m: archive_month(m, purge=purge) for m in closed_months(now)}
+
+
+# -----------------------------
+# Read
+# -----------------------------
+def read_archive(
+    months: Iterable[str],
+    columns: Optional[Iterable[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Archived entries for the given months, as a DataFrame with ENTRY_COLUMNS names.
+    columns projects the read (ID and Date are always included); start/end
+    (YYYY-MM-DD) filter on Date. Files are memory mapped.
+    """
+    cols = list(ENTRY_COLUMNS)
+    if columns:
+        wanted = set(columns) | {"ID", "Date"}
+        cols = [c for c in ENTRY_COLUMNS if c in wanted]
+
+    paths = [archive_path(m) for m in months]
+    paths = [p for p in paths if os.path.exists(p)]
+    if not paths:
+        return pd.DataFrame(columns=cols)
+
+    pa, pq = _arrow()
+    if pa is None:
+        raise RuntimeError("pyarrow is required to read archived months (pip install pyarrow).")
+
+    filters = []
+    if start:
+        filters.append(("Date", ">=", start))
+    if end:
+        filters.append(("Date", "<=", end))
+
+    tables = [
+        pq.read_table(p, columns=cols, memory_map=True, filters=filters or None)
+        for p in paths
+    ]
+    return pa.concat_tables(tables).to_pandas()
+
+
+if __name__ == "__main__":
+    import sys
+
+    keep_live = "--keep-live" in sys.argv[1:]
+    if not archive_available():
+        print("pyarrow is not installed; nothing archived.")
+        sys.exit(1)
+    done = archive_closed_months(purge=not keep_live)
+    if not done:
+        print("No closed months to archive.")
+    for m, n in done.items():
+        print(f"{m}: {n} rows -> {archive_path(m)}")
@@ -12,8 +12,11 @@ logging.basicConfig(
     format="%(asctime)s - %(message)s"
 )
 
-def log_audit(user: str, action: str):
+def log_audit(user: str, action: str, to_db: bool = True):
+    """to_db=False: file only, for actions whose audit_logs row is written with the change itself."""
     logging.info(f"User: {user} | Action: {action}")
+    if not to_db:
+        return
     try:
         db_log_audit(user, action)
     except Exception:
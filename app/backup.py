@@ -0,0 +1,256 @@
+# app/backup.py
+"""
+Online backups of the live SQLite database.
+
+Uses sqlite3.Connection.backup() a few pages at a time, so the copy is
+consistent (WAL content included) and writers are only blocked for one step.
+Each backup is integrity-checked, then kept in BACKUPS_DIR with rotation.
+Duration and size are written to the backup_log table.
+
+BackupScheduler runs this in the background every BACKUP_INTERVAL_MINUTES.
+Run manually:  python -m app.backup
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from .config import (
+    DB_PATH,
+    BACKUPS_DIR,
+    BACKUP_INTERVAL_MINUTES,
+    BACKUP_KEEP,
+    BACKUP_PAGES_PER_STEP,
+)
+from .db import record_backup
+
+BACKUP_PREFIX = "toollife_"
+BACKUP_SUFFIX = ".db"
+
+ProgressFn = Callable[[int, int], None]
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+def backup_path(now: Optional[datetime] = None) -> str:
+    now = now or datetime.now()
+    return os.path.join(BACKUPS_DIR, f"{BACKUP_PREFIX}{now.strftime('%Y%m%d_%H%M%S')}{BACKUP_SUFFIX}")
+
+
+def integrity_check(path: str) -> str:
+    """'ok' or the first problem reported by PRAGMA integrity_check."""
+    conn = sqlite3.connect(path)
+    try:
+        return str(conn.execute("PRAGMA integrity_check").fetchone()[0])
+    finally:
+        conn.close()
+
+
+def backup_database(
+    dest: Optional[str] = None,
+    *,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    progress: Optional[ProgressFn] = None,
+    cancel: Optional[threading.Event] = None,
+) -> Dict[str, Any]:
+    """
+    Copy DB_PATH to dest (default: a timestamped file in BACKUPS_DIR).
+    Writes to a temp file and only renames it into place after integrity_check passes.
+    progress(copied_pages, total_pages) is called after each step.
+    Returns the backup_log record.
+    """
+    started = datetime.now()
+    dest = dest or backup_path(started)
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    tmp = dest + ".tmp"
+    result: Dict[str, Any] = {
+        "started_at": started.strftime("%Y-%m-%d %H:%M:%S"),
+        "path": dest,
+        "status": "failed",
+    }
+    t0 = time.perf_counter()
+    total_pages = 0
+
+    def _step(status, remaining, total):
+        nonlocal total_pages
+        total_pages = total
+        if cancel is not None and cancel.is_set():
+            raise BackupCancelled()
+        if progress:
+            progress(total - remaining, total)
+
+    try:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        src = sqlite3.connect(DB_PATH)
+        dst = sqlite3.connect(tmp)
+        try:
+            src.backup(dst, pages=pages, progress=_step)
+        finally:
+            dst.close()
+            src.close()
+
+        integrity = integrity_check(tmp)
+        result["integrity"] = integrity
+        if integrity != "ok":
+            raise RuntimeError(f"Backup failed integrity check: {integrity}")
+
+        os.replace(tmp, dest)
+        result["status"] = "ok"
+        result["bytes"] = os.path.getsize(dest)
+        result["pages"] = total_pages
+    except BackupCancelled:
+        result["status"] = "cancelled"
+        raise
+    except Exception as exc:
+        result["error"] = str(exc)
+        raise
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        result["duration_s"] = round(time.perf_counter() - t0, 3)
+        try:
+            record_backup(result)
+        except Exception:
+            pass
+    return result
+
+
+def rotate_backups(keep: int = BACKUP_KEEP) -> list[str]:
+    """Delete the oldest scheduled backups beyond keep. Returns deleted paths."""
+    if not os.path.isdir(BACKUPS_DIR):
+        return []
+    names = sorted(
+        n for n in os.listdir(BACKUPS_DIR)
+        if n.startswith(BACKUP_PREFIX) and n.endswith(BACKUP_SUFFIX)
+    )
+    deleted = []
+    for name in names[:max(0, len(names) - keep)]:
+        path = os.path.join(BACKUPS_DIR, name)
+        try:
+            os.remove(path)
+            deleted.append(path)
+        except OSError:
+            pass
+    return deleted
+
+
+def latest_backup_time() -> Optional[datetime]:
+    if not os.path.isdir(BACKUPS_DIR):
+        return None
+    names = sorted(
+        n for n in os.listdir(BACKUPS_DIR)
+        if n.startswith(BACKUP_PREFIX) and n.endswith(BACKUP_SUFFIX)
+    )
+    if not names:
+        return None
+    stamp = names[-1][len(BACKUP_PREFIX):-len(BACKUP_SUFFIX)]
+    try:
+        return datetime.strptime(stamp, "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+# -----------------------------
+# Background work
+# -----------------------------
+class BackupJob(threading.Thread):
+    """
+    One backup on a worker thread, polled by the UI like ExportJob
+    (done/total pages, finished, error, cancelled).
+    """
+
+    def __init__(self, dest: Optional[str] = None):
+        super().__init__(daemon=True)
+        self.path = dest or backup_path()
+        self._cancel = threading.Event()
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _progress(self, done: int, total: int) -> None:
+        self.done = done
+        self.total = total
+
+    def run(self) -> None:
+        try:
+            self.result = backup_database(self.path, progress=self._progress, cancel=self._cancel)
+        except BackupCancelled:
+            self.cancelled = True
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.finished = True
+
+
+class BackupScheduler(threading.Thread):
+    """Backs up every interval_minutes (first run as soon as the last backup is due), then rotates."""
+
+    def __init__(self, interval_minutes: float = BACKUP_INTERVAL_MINUTES, keep: int = BACKUP_KEEP):
+        super().__init__(daemon=True, name="backup-scheduler")
+        self.interval_s = max(60.0, float(interval_minutes) * 60.0)
+        self.keep = keep
+        self._stopping = threading.Event()  # not _stop: that name is Thread's own method
+        self.last_result: Dict[str, Any] = {}
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _initial_delay(self) -> float:
+        last = latest_backup_time()
+        if last is None:
+            return 0.0
+        age = (datetime.now() - last).total_seconds()
+        return max(0.0, self.interval_s - age)
+
+    def run(self) -> None:
+        if self._stopping.wait(self._initial_delay()):
+            return
+        while True:
+            try:
+                self.last_result = backup_database()
+                rotate_backups(self.keep)
+            except Exception as exc:
+                self.last_result = {"status": "failed", "error": str(exc)}
+            if self._stopping.wait(self.interval_s):
+                return
+
+
+_scheduler: Optional[BackupScheduler] = None
+
+
+def start_scheduler() -> BackupScheduler:
+    """Start the process-wide backup scheduler once."""
+    global _scheduler
+    if _scheduler is None or not _scheduler.is_alive():
+        _scheduler = BackupScheduler()
+        _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler() -> None:
+    if _scheduler is not None:
+        _scheduler.stop()
+
+
+if __name__ == "__main__":
+    res = backup_database(progress=lambda d, t: print(f"\r{d}/{t} pages", end=""))
+    print()
+    print(f"{res['status']}: {res['path']} ({res.get('bytes', 0)} bytes, {res['duration_s']}s)")
+    for p in rotate_backups():
+        print(f"removed {p}")
@@ -0,0 +1,253 @@
+# app/bench.py
+"""
+Benchmark suite for the data and analytics paths.
+
+Builds a scratch database with app/synthetic.py at a named scale, then times
+the hot paths the screens use. Results are written as JSON so runs from
+different commits can be compared; with --baseline, any benchmark whose
+median is more than --threshold times the baseline median is reported as a
+regression and the exit code is 1.
+
+    python -m app.bench [--scale medium] [--repeat 5] [--out bench.json]
+    python -m app.bench --baseline bench_main.json --threshold 1.25
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from . import archive, db
+from .config import DEFAULT_REPEAT_RULES, DEFAULT_RISK_CONFIG
+from .synthetic import SyntheticSpec, generate
+
+SCALES: Dict[str, SyntheticSpec] = {
+    "small": SyntheticSpec(lines=1, machines_per_line=5, years=0.25),
+    "medium": SyntheticSpec(lines=3, machines_per_line=20, years=1.0),
+    "large": SyntheticSpec(lines=3, machines_per_line=20, years=3.0),
+    # Master-data heavy: 2,000 parts and 500 tools, few entries.
+    "master": SyntheticSpec(lines=4, machines_per_line=2, years=0.1, parts_per_line=500, tools_per_line=500),
+}
+
+DEFAULT_THRESHOLD = 1.25
+
+
+@contextmanager
+def scratch_database(root: str):
+    """Point the data layer (and the archive) at files under root for the duration."""
+    saved = (db.DB_PATH, archive.ARCHIVE_DIR, archive.ARCHIVE_MANIFEST_FILE)
+    db.DB_PATH = os.path.join(root, "toollife.db")
+    archive.ARCHIVE_DIR = os.path.join(root, "archive")
+    archive.ARCHIVE_MANIFEST_FILE = os.path.join(archive.ARCHIVE_DIR, "manifest.json")
+    try:
+        yield db.DB_PATH
+    finally:
+        db.DB_PATH, archive.ARCHIVE_DIR, archive.ARCHIVE_MANIFEST_FILE = saved
+
+
+def _timeit(fn: Callable[[], Any], repeat: int, number: int = 1) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return {
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+def _benchmarks(gages: Dict[str, Any], end: date) -> Dict[str, Callable[[], Any]]:
+    from .quality_engine import detect_repeat_offenders, generate_notifications
+    from .storage import get_df, parts_for_line, save_df
+    from .ui_dashboard import PARETO_KEYS, load_window, pareto_table, trend_table
+    from .ui_health_check import run_checks
+    from .data_quality import evaluate, list_issues
+    from .rule_config import as_gages, as_repeat_rules, as_risk_rules
+
+    month = end.strftime("%Y-%m")
+    month_df, _ = get_df(month)
+    save_rows = month_df.head(500).copy()
+    # Compiled once, as the screens get them from rule_config's cache.
+    gage_set = as_gages(gages)
+    risk = as_risk_rules(DEFAULT_RISK_CONFIG)
+    repeat = as_repeat_rules(DEFAULT_REPEAT_RULES)
+    # detect_repeat_offenders groups on Defect_Code, which entries do not store;
+    # Defect_Reason is the field the screens fill for it.
+    coded_df = month_df.assign(Defect_Code=month_df["Defect_Reason"])
+    counter = {"n": 0}
+
+    def upsert_one():
+        counter["n"] += 1
+        now = datetime.now()
+        db.upsert_tool_entry({
+            "ID": f"BENCH-{counter['n']:08d}",
+            "Date": end.strftime("%Y-%m-%d"),
+            "Time": now.strftime("%H:%M:%S"),
+            "Line": "L1",
+            "Machine": "L1-M01",
+            "Tool_Num": "1",
+            "Reason": "Worn",
+            "Downtime_Mins": 5,
+        })
+
+    def dashboard(days: int):
+        def run():
+            stop = datetime(end.year, end.month, end.day, 23, 59, 59)
+            start = datetime(end.year, end.month, end.day) - timedelta(days=days - 1)
+            sub = load_window(start, stop)
+            if sub.empty:
+                return
+            for key, _label in PARETO_KEYS:
+                pareto_table(sub, key, 15)
+            trend_table(sub)
+        return run
+
+    def health_check(days: int):
+        def run():
+            start = end - timedelta(days=days - 1)
+            evaluate()
+            list_issues(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), gage_set, risk)
+        return run
+
+    return {
+        "get_df_month": lambda: get_df(month),
+        "save_df_500": lambda: save_df(save_rows, month),
+        "upsert_tool_entry": upsert_one,
+        "list_parts_with_lines": db.list_parts_with_lines,
+        "list_tools_with_mappings": lambda: db.list_tools_with_mappings("All"),
+        "parts_for_line": lambda: parts_for_line("L1"),
+        "dashboard_30d": dashboard(30),
+        "dashboard_365d": dashboard(365),
+        "generate_notifications_month": lambda: generate_notifications(month_df, gage_set, risk),
+        "detect_repeat_offenders_month": lambda: detect_repeat_offenders(coded_df, repeat),
+        "health_check_month": lambda: run_checks(month_df, gage_set, risk),
+        "health_check_365d": health_check(365),
+    }
+
+
+# Single-row writes are timed in loops so the numbers are not all noise.
+NUMBER = {"upsert_tool_entry": 50, "list_parts_with_lines": 10, "list_tools_with_mappings": 10, "parts_for_line": 10}
+
+
+def run(scale: str = "medium", repeat: int = 5, only: Optional[List[str]] = None, end: Optional[date] = None) -> Dict[str, Any]:
+    base = SCALES[scale]
+    spec = SyntheticSpec(**{**base.__dict__, "end": end or date.today()})
+    root = tempfile.mkdtemp(prefix="toollife_bench_")
+    try:
+        with scratch_database(root):
+            t0 = time.perf_counter()
+            data = generate(spec)
+            gen_s = time.perf_counter() - t0
+            # Time writes with the station-sync triggers in place, as in the app.
+            from .sync import install_sync
+            install_sync()
+
+            gages = data.pop("gages_store")
+            results = {}
+            for name, fn in _benchmarks(gages, spec.end_date()).items():
+                if only and name not in only:
+                    continue
+                results[name] = _timeit(fn, repeat, NUMBER.get(name, 1))
+                print(f"  {name:32s} median {results[name]['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "spec": {k: v for k, v in spec.__dict__.items() if k not in ("end", "line_names")},
+            "rows": data,
+            "generate_s": round(gen_s, 3),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """Benchmarks whose median slowed by more than threshold x the baseline median."""
+    regressions = []
+    for name, res in current.get("results", {}).items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old.get("median_s"):
+            continue
+        ratio = res["median_s"] / old["median_s"]
+        if ratio > threshold:
+            regressions.append({
+                "name": name,
+                "baseline_s": old["median_s"],
+                "current_s": res["median_s"],
+                "ratio": round(ratio, 2),
+            })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tool Life data/analytics benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="benchmark names to run")
+    parser.add_argument("--end", default="", help="last synthetic day (YYYY-MM-DD), default today")
+    parser.add_argument("--out", default="", help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default="", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    end = datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None
+    report = run(args.scale, args.repeat, args.only, end)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print(f"warning: baseline scale is {baseline.get('meta', {}).get('scale')}", file=sys.stderr)
+        report["regressions"] = compare(report, baseline, args.threshold)
+        report["baseline_commit"] = baseline.get("meta", {}).get("commit", "")
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['name']}: {r['baseline_s']:.4f}s -> {r['current_s']:.4f}s (x{r['ratio']})", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
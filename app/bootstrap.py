@@ -7,13 +7,18 @@ from datetime import datetime
 
 import pandas as pd
 
+from .exporter import ExportSheet, export
+from .sync import install_sync
+from .migrations import start_backfill
+from .data_quality import start_evaluator
+from . import alerts
 from .config import (
     DATA_DIR, LOGS_DIR, BACKUPS_DIR,
     USERS_FILE, REASONS_FILE, PARTS_FILE, TOOL_CONFIG_FILE,
     DEFECT_CODES_FILE, ANDON_REASONS_FILE, COST_CONFIG_FILE, RISK_CONFIG_FILE,
     REPEAT_RULES_FILE, LPA_CHECKLIST_FILE, GAGES_FILE, GAGE_VERIFICATION_Q_FILE,
-    NCRS_FILE, ACTIONS_FILE,
-    alerts_file_for_month, month_excel_path, gage_verification_log_path,
+    NCRS_FILE, ACTIONS_FILE, SERVICE_URL,
+    month_excel_path, gage_verification_log_path,
     COLUMNS,
     DEFAULT_USERS, DEFAULT_REASONS, DEFAULT_PARTS, DEFAULT_TOOL_CONFIG,
     DEFAULT_DEFECT_CODES, DEFAULT_ANDON_REASONS, DEFAULT_COST_CONFIG, DEFAULT_RISK_CONFIG,
@@ -73,15 +78,6 @@ def _ensure_json_files() -> None:
     _write_json_if_missing(NCRS_FILE, DEFAULT_NCRS)
     _write_json_if_missing(ACTIONS_FILE, DEFAULT_ACTIONS)
 
-    # Monthly alerts store (current month)
-    now = datetime.now()
-    alert_path = alerts_file_for_month(now)
-    if not os.path.exists(alert_path):
-        _write_json_if_missing(
-            alert_path,
-            {"version": 1, "month": now.strftime("%Y-%m"), "alerts": []},
-        )
-
 
 def _ensure_default_users() -> None:
     """Ensure default admin/super accounts exist."""
@@ -114,8 +110,15 @@ def _ensure_month_excel_schema(xlsx_path: str) -> None:
         df.to_excel(xlsx_path, index=False)
         return
 
+    # Only the header row is needed to decide; read_only mode does not load the sheet.
     try:
-        df = pd.read_excel(xlsx_path)
+        from openpyxl import load_workbook
+
+        wb = load_workbook(xlsx_path, read_only=True)
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        header = [str(h) if h is not None else "" for h in header]
+        wb.close()
     except Exception:
         # If corrupted/unreadable, do NOT overwrite silently.
         # Create a safe new file and leave the original for recovery.
@@ -124,15 +127,21 @@ def _ensure_month_excel_schema(xlsx_path: str) -> None:
         pd.DataFrame(columns=COLUMNS).to_excel(rescue, index=False)
         return
 
-    changed = False
-    for col in COLUMNS:
-        if col not in df.columns:
-            df[col] = ""
-            changed = True
+    if all(col in header for col in COLUMNS):
+        return
 
-    if changed:
-        df = df[COLUMNS]
-        df.to_excel(xlsx_path, index=False)
+    # Missing columns: stream the rows into a new workbook in COLUMNS order.
+    pos = {h: i for i, h in enumerate(header) if h}
+
+    def rows():
+        src = load_workbook(xlsx_path, read_only=True)
+        try:
+            for row in src.worksheets[0].iter_rows(min_row=2, values_only=True):
+                yield [row[pos[c]] if c in pos and pos[c] < len(row) else "" for c in COLUMNS]
+        finally:
+            src.close()
+
+    export(xlsx_path, [ExportSheet(name="Sheet1", columns=COLUMNS, rows=rows())])
 
 
 def _ensure_gage_verification_log(xlsx_path: str) -> None:
@@ -229,30 +238,32 @@ def ensure_app_initialized() -> None:
     """
     _ensure_dirs()
 
-    # SQLite (new system of record)
-    init_db()
-    seed_default_users(DEFAULT_USERS)
-    ensure_lines(DEFAULT_LINES)
-    for code in DEFAULT_DOWNTIME_CODES:
-        upsert_downtime_code(code)
-    if get_meta("json_migrated") != "1":
-        run_migration()
-        set_meta("json_migrated", "1")
-    _seed_default_tools()
+    # SQLite (new system of record). Thin clients leave this to the data service.
+    if not SERVICE_URL:
+        init_db()
+        seed_default_users(DEFAULT_USERS)
+        ensure_lines(DEFAULT_LINES)
+        for code in DEFAULT_DOWNTIME_CODES:
+            upsert_downtime_code(code)
+        if get_meta("json_migrated") != "1":
+            run_migration()
+            set_meta("json_migrated", "1")
+        _seed_default_tools()
 
     # Legacy files still used elsewhere in the app (for now)
     _ensure_json_files()
     _ensure_default_users()
-    # SQLite (new system of record)
-    init_db()
-    seed_default_users(DEFAULT_USERS)
-    ensure_lines(DEFAULT_LINES)
-    for code in DEFAULT_DOWNTIME_CODES:
-        upsert_downtime_code(code)
-    if get_meta("json_migrated") != "1":
-        run_migration()
-        set_meta("json_migrated", "1")
-    _seed_default_tools()
+    # SQLite (new system of record). Thin clients leave this to the data service.
+    if not SERVICE_URL:
+        init_db()
+        seed_default_users(DEFAULT_USERS)
+        ensure_lines(DEFAULT_LINES)
+        for code in DEFAULT_DOWNTIME_CODES:
+            upsert_downtime_code(code)
+        if get_meta("json_migrated") != "1":
+            run_migration()
+            set_meta("json_migrated", "1")
+        _seed_default_tools()
 
     # Legacy files still used elsewhere in the app (for now)
     _ensure_json_files()
@@ -264,3 +275,19 @@ def ensure_app_initialized() -> None:
 
     # Ensure gage verification log exists for current month
     _ensure_gage_verification_log(gage_verification_log_path(now))
+
+    # Station sync: change_log triggers follow the current table columns
+    if not SERVICE_URL:
+        install_sync()
+
+    # Typed tool_entries columns for rows written before the migration (background)
+    if not SERVICE_URL:
+        start_backfill()
+
+    # Data-quality issues: a first run or a RULES_VERSION change rebuilds them (background)
+    if not SERVICE_URL:
+        start_evaluator()
+
+    # Alerts: evaluating trims alert_queue to its watermark (background)
+    if not SERVICE_URL:
+        alerts.start_evaluator()
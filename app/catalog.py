@@ -0,0 +1,168 @@
+# app/catalog.py
+"""
+In-memory master-data catalog for the entry screens' comboboxes.
+
+Lines, parts (with their lines), tools (with lines, parts and insert types),
+downtime codes and the reason list are loaded in one go, on one connection,
+and kept as an immutable snapshot. Screens ask the snapshot, so picking a
+line or machine does not touch the database. Entry writes take their
+dimension keys from it too (Catalog.dimension_ids).
+
+Every write to the master-data tables bumps meta.catalog_version (triggers in
+db.init_db), whichever station makes it. get_catalog() compares that version,
+and REASONS_FILE's mtime, at most every CATALOG_CHECK_SECONDS and reloads
+when either moved. Tool stock is live inventory and stays a db.get_tool() call.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import db, rule_config
+from .config import CATALOG_CHECK_SECONDS, REASONS_FILE, SERVICE_URL
+
+
+@dataclass(frozen=True)
+class Catalog:
+    version: str = ""
+    reasons_mtime: float = 0.0
+    lines: Tuple[str, ...] = ()
+    parts: Tuple[str, ...] = ()
+    parts_by_line: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    tools: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    tools_by_line: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    unassigned_tools: Tuple[str, ...] = ()
+    downtime_codes: Tuple[Dict[str, str], ...] = ()
+    reasons: Tuple[str, ...] = ()
+    line_ids: Dict[str, int] = field(default_factory=dict)
+    part_ids: Dict[str, int] = field(default_factory=dict)
+    tool_ids: Dict[str, int] = field(default_factory=dict)
+
+    def parts_for_line(self, line: str = "") -> List[str]:
+        """Same result as storage.parts_for_line / db.list_parts_for_line."""
+        if not line:
+            return list(self.parts)
+        return list(self.parts_by_line.get(line, ()))
+
+    def tools_for_line(self, line: str, *, include_unassigned: bool = False) -> List[str]:
+        """Same result as db.list_tools_for_line."""
+        if not line or line.lower() == "all":
+            return list(self.tools)
+        if line not in self.lines:
+            return []
+        tools = list(self.tools_by_line.get(line, ()))
+        if include_unassigned:
+            tools = sorted(set(tools) | set(self.unassigned_tools))
+        return tools
+
+    def tool(self, tool_num: str) -> Optional[Dict[str, Any]]:
+        return self.tools.get(str(tool_num))
+
+    def tool_inserts(self, tool_num: str) -> List[Dict[str, Any]]:
+        t = self.tools.get(str(tool_num))
+        return [dict(i) for i in t["inserts"]] if t else []
+
+    def dimension_ids(self, entry: Dict[str, Any]) -> Dict[str, Optional[int]]:
+        """db.DIMENSION_ID_COLUMNS of a tool_entries row (db column names); None for unknown names."""
+        def name(col: str) -> str:
+            return str(entry.get(col, "") or "")
+
+        return {
+            "line_id": self.line_ids.get(name("line")),
+            "part_id": self.part_ids.get(name("part_number")),
+            "tool_id": self.tool_ids.get(name("tool_num")),
+        }
+
+
+def _reasons_mtime() -> float:
+    try:
+        return os.path.getmtime(REASONS_FILE)
+    except OSError:
+        return 0.0
+
+
+def _current_version() -> str:
+    return db.get_meta("catalog_version") or "0"
+
+
+def _build() -> Catalog:
+    version = _current_version()
+    lines = tuple(db.list_lines())
+
+    parts_by_line: Dict[str, List[str]] = {}
+    parts = []
+    for p in db.list_parts_with_lines():
+        pn = p.get("part_number", "")
+        if not pn:
+            continue
+        parts.append(pn)
+        for ln in p.get("lines", []):
+            parts_by_line.setdefault(ln, []).append(pn)
+
+    tools: Dict[str, Dict[str, Any]] = {}
+    tools_by_line: Dict[str, List[str]] = {}
+    unassigned = []
+    for t in db.list_tools_with_mappings("All"):
+        tools[t["tool_num"]] = t
+        if not t["lines"]:
+            unassigned.append(t["tool_num"])
+        for ln in t["lines"]:
+            tools_by_line.setdefault(ln, []).append(t["tool_num"])
+
+    ids = db.dimension_ids()
+    mtime = _reasons_mtime()
+    return Catalog(
+        version=version,
+        reasons_mtime=mtime,
+        lines=lines,
+        parts=tuple(sorted(parts)),
+        parts_by_line={k: tuple(sorted(v)) for k, v in parts_by_line.items()},
+        tools=tools,
+        tools_by_line={k: tuple(v) for k, v in tools_by_line.items()},
+        unassigned_tools=tuple(unassigned),
+        downtime_codes=tuple(db.list_downtime_codes()),
+        reasons=rule_config.reasons(),
+        line_ids=ids["lines"],
+        part_ids=ids["parts"],
+        tool_ids=ids["tools"],
+    )
+
+
+def load() -> Catalog:
+    """Read the whole catalog (one connection unless running against a data service)."""
+    if SERVICE_URL:
+        return _build()
+    with db.connect() as conn, db.bind_connection(conn):
+        return _build()
+
+
+_lock = threading.Lock()
+_catalog: Optional[Catalog] = None
+_checked_at = 0.0
+
+
+def get_catalog() -> Catalog:
+    """The current snapshot, reloaded when another write bumped the version."""
+    global _catalog, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _catalog is not None and now - _checked_at < CATALOG_CHECK_SECONDS:
+            return _catalog
+        _checked_at = now
+        if (
+            _catalog is None
+            or _catalog.version != _current_version()
+            or _catalog.reasons_mtime != _reasons_mtime()
+        ):
+            _catalog = load()
+        return _catalog
+
+
+def invalidate() -> None:
+    """Drop the snapshot; the next get_catalog() reloads."""
+    global _catalog
+    with _lock:
+        _catalog = None
@@ -1,6 +1,8 @@
 # app/config.py
 from __future__ import annotations
 
+import os
+import socket
 from pathlib import Path
 from datetime import datetime
 
@@ -16,6 +18,11 @@ LOGS_DIR = str(PROJECT_ROOT / "logs")
 LOG_DIR = LOGS_DIR  # compat alias
 BACKUPS_DIR = str(PROJECT_ROOT / "backups")
 
+# Online backups (app/backup.py)
+BACKUP_INTERVAL_MINUTES = 240
+BACKUP_KEEP = 14
+BACKUP_PAGES_PER_STEP = 256
+
 # Logs
 AUDIT_LOG_FILE = str(Path(LOGS_DIR) / "audit.log")
 AUDIT_LOGFILE = AUDIT_LOG_FILE  # compat alias
@@ -42,6 +49,84 @@ GAGES_FILE = str(Path(DATA_DIR) / "gages.json")
 GAGE_VERIFICATION_Q_FILE = str(Path(DATA_DIR) / "gage_verification_questions.json")
 DB_PATH = str(Path(DATA_DIR) / "toollife.db")
 
+# Lock handling (app/db.py). SQLite waits up to the busy timeout for a lock,
+# then writes are retried with jittered exponential backoff.
+DB_BUSY_TIMEOUT_MS = 5000
+DB_LOCK_RETRIES = 4
+DB_RETRY_BASE_S = 0.1
+DB_RETRY_MAX_S = 2.0
+
+# Hot-path timing (app/perf.py). Off unless TOOLLIFE_PERF=1; samples kept per timed name.
+PERF_ENABLED = os.environ.get("TOOLLIFE_PERF", "").strip().lower() in ("1", "true", "yes", "on")
+PERF_RING_SIZE = 512
+
+# SQL tracer (app/sqltrace.py). Off unless TOOLLIFE_SQLTRACE=1.
+SQLTRACE_ENABLED = os.environ.get("TOOLLIFE_SQLTRACE", "").strip().lower() in ("1", "true", "yes", "on")
+SQLTRACE_THRESHOLD_MS = float(os.environ.get("TOOLLIFE_SQLTRACE_MS", "50") or 50)
+SQLTRACE_LOG_FILE = str(Path(LOGS_DIR) / "slow_sql.log")
+
+# UI stall watchdog (app/watchdog.py). On unless TOOLLIFE_WATCHDOG=0.
+WATCHDOG_ENABLED = os.environ.get("TOOLLIFE_WATCHDOG", "1").strip().lower() not in ("0", "false", "no", "off")
+WATCHDOG_INTERVAL_MS = 100
+WATCHDOG_STALL_MS = 500
+WATCHDOG_SAMPLE_MS = 50
+WATCHDOG_HANG_S = 10
+WATCHDOG_STACK_DEPTH = 15
+WATCHDOG_LOG_FILE = str(Path(LOGS_DIR) / "ui_stalls.jsonl")
+
+# On-demand screen profiling (app/profiler.py): functions listed per capture summary.
+PROFILE_TOP_N = 40
+
+# Master-data catalog (app/catalog.py): how often to look for a newer catalog_version.
+CATALOG_CHECK_SECONDS = 5
+
+# Action Center rows per page (keyset-paged in SQL).
+ACTIONS_PAGE_SIZE = 200
+
+# Station name used in minted IDs (app/ids.py).
+STATION_NAME = os.environ.get("TOOLLIFE_STATION", "").strip() or socket.gethostname()
+
+# Alert engine (app/alerts.py): queued tool entries evaluated per batch.
+ALERTS_BATCH_SIZE = 2000
+
+# Live screen updates (app/events.py): event pump / change poll interval, the
+# slower poll used against a data service, and the Dashboard's reload debounce.
+EVENTS_POLL_MS = 500
+EVENTS_SERVICE_POLL_MS = 5000
+EVENTS_DEBOUNCE_MS = 2000
+
+# Schema migrations (app/migrations.py): rows per typed-column backfill batch
+# and the pause between batches.
+BACKFILL_BATCH = 2000
+BACKFILL_PAUSE_S = 0.05
+
+# Data-quality issues (app/data_quality.py): entries evaluated per batch, for
+# queued changes and for a rebuild; stored issues the Health Check lists at most.
+DATA_ISSUES_BATCH = 2000
+DATA_ISSUES_SHOWN = 5000
+
+# Durable submit queue (app/submit_queue.py)
+SUBMIT_QUEUE_FILE = str(Path(DATA_DIR) / "submit_queue.jsonl")
+SUBMIT_QUEUE_FAILED_FILE = str(Path(DATA_DIR) / "submit_queue_failed.jsonl")
+SUBMIT_QUEUE_BATCH = 200
+SUBMIT_QUEUE_DRAIN_SECONDS = 5
+SUBMIT_INLINE_BUSY_MS = 250  # submit()'s one inline write attempt waits at most this for a lock
+
+# Closed-month archive (columnar snapshots of tool_entries)
+ARCHIVE_DIR = str(Path(DATA_DIR) / "archive")
+ARCHIVE_MANIFEST_FILE = str(Path(ARCHIVE_DIR) / "manifest.json")
+
+# Data service (app/service.py). When TOOLLIFE_SERVICE_URL is set, the app talks
+# to the service at that URL instead of opening DB_PATH.
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_URL = os.environ.get("TOOLLIFE_SERVICE_URL", "").strip()
+SERVICE_READ_POOL = 4
+SERVICE_MAX_BATCH = 64
+# Shared secret between the service and its terminals, sent in the
+# X-Toollife-Token header. The service refuses to listen beyond loopback without one.
+SERVICE_TOKEN = os.environ.get("TOOLLIFE_SERVICE_TOKEN", "").strip()
+
 # Action/NCR system
 NCRS_FILE = str(Path(DATA_DIR) / "ncrs.json")
 ACTIONS_FILE = str(Path(DATA_DIR) / "actions.json")
@@ -70,12 +155,6 @@ def month_excel_path(dt: datetime | None = None) -> str:
     return str(Path(DATA_DIR) / f"tool_life_data_{dt.strftime('%Y_%m')}.xlsx")
 
 
-def alerts_file_for_month(dt: datetime | None = None) -> str:
-    if dt is None:
-        dt = datetime.now()
-    return str(Path(DATA_DIR) / f"alerts_{dt.strftime('%Y_%m')}.json")
-
-
 def gage_verification_log_path(dt: datetime | None = None) -> str:
     if dt is None:
         dt = datetime.now()
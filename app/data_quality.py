@@ -0,0 +1,313 @@
+# app/data_quality.py
+"""
+Incremental, persisted data-quality checks for the Health Check screen.
+
+The entry rules (entry_issues: missing fields, defect logic, QC sign-off,
+NCR closure, overdue actions) are evaluated per tool entry and kept in the
+data_issues table, one row per (entry_id, rule) with the entry's date, so the
+screen reads any date range with one indexed query.
+
+Triggers on tool_entries (db.DATA_ISSUE_ENTRY_COLUMNS) queue the id of every
+entry whose rule inputs were inserted, changed or deleted. evaluate() reads
+the queue past its watermark (meta data_issues_seq), re-evaluates just those
+entries and moves the watermark, so a refresh costs O(changed entries).
+
+An overdue action depends on the calendar: the issue is stored with the day
+it becomes overdue (active_from) and the query leaves it out until then.
+Gage issues depend on GAGES_FILE and the calendar rather than the entry, so
+they are worked out when read (gage_issues) from the range's entries that
+name a gage, against the compiled gages and risk rules (app/rule_config.py).
+
+When RULES_VERSION changes (or on the very first run) rebuild() re-evaluates
+every entry in id order, DATA_ISSUES_BATCH entries per transaction. Its
+cursor is kept in meta, so an interrupted rebuild resumes; changes made
+meanwhile stay queued and are picked up after it. The screen runs
+evaluate() on an Evaluator thread (start_evaluator), so a rebuild never
+blocks the Tk loop; the station also starts one at bootstrap.
+
+Run by hand:  python -m app.data_quality [--rebuild]
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import db
+from .config import DATA_ISSUES_BATCH, DATA_ISSUES_SHOWN
+from .rule_config import Gages, RiskRules, as_gages, as_risk_rules, gages, parse_date, risk_rules
+from .storage import ENTRY_COLUMNS, safe_int
+
+# Bump when entry_issues changes, so stored issues are rebuilt.
+RULES_VERSION = "1"
+
+REQUIRED_FIELDS = ("Line", "Machine", "Tool_Num", "Reason", "Part_Number")
+
+
+def gage_statuses(gage_set: Gages | Dict[str, Any], risk: RiskRules | Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """{gage_id: status, next_due, criticality} for every gage with an ID."""
+    due_soon_days = as_risk_rules(risk).gage_due_soon_days
+    today = datetime.now().date()
+    out = {}
+    for gid, g in as_gages(gage_set).by_id.items():
+        status, next_due, _ = g.due_status(due_soon_days, today)
+        out[gid] = {"status": status, "next_due": next_due, "criticality": g.criticality}
+    return out
+
+
+def _issue(rule, sev, entry_id, cat, issue, suggestion, active_from="") -> Dict[str, Any]:
+    return {
+        "rule": rule,
+        "severity": sev,
+        "entry_id": entry_id,
+        "category": cat,
+        "issue": issue,
+        "suggestion": suggestion,
+        "active_from": active_from,
+    }
+
+
+def entry_issues(r: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Issues of one entry (ENTRY_COLUMNS names), each with a stable rule id."""
+    issues = []
+    entry_id = str(r.get("ID", "") or "")
+
+    for col in REQUIRED_FIELDS:
+        if not str(r.get(col, "") or "").strip():
+            issues.append(_issue(f"missing:{col}", "High", entry_id, "Missing Field",
+                                 f"Missing required field: {col}",
+                                 f"Fill {col} before saving/closing."))
+
+    defects_present = str(r.get("Defects_Present", "") or "").strip().lower()
+    defect_qty = safe_int(r.get("Defect_Qty", 0), 0)
+    defect_code = str(r.get("Defect_Code", "") or "").strip()
+
+    if defects_present == "yes" and defect_qty <= 0:
+        issues.append(_issue("defects_without_qty", "High", entry_id, "Defects Logic",
+                             "Defects_Present=Yes but Defect_Qty is 0/blank",
+                             "Enter a valid defect quantity (or set Defects_Present=No)."))
+
+    if defects_present == "no" and defect_qty > 0:
+        issues.append(_issue("qty_without_defects", "Medium", entry_id, "Defects Logic",
+                             "Defects_Present=No but Defect_Qty > 0",
+                             "Set Defects_Present=Yes or set Defect_Qty to 0."))
+
+    if defects_present == "yes" and not defect_code:
+        issues.append(_issue("defect_code", "High", entry_id, "Defect Classification",
+                             "Defects present but Defect_Code is blank",
+                             "Select a Defect_Code for Pareto and NCR tracking."))
+
+    qc_status = str(r.get("QC_Status", "") or "").strip()
+    q_user = str(r.get("Quality_User", "") or "").strip()
+    q_time = str(r.get("Quality_Time", "") or "").strip()
+
+    if qc_status in ("Verified", "Closed") and (not q_user or not q_time):
+        issues.append(_issue("qc_signoff", "Medium", entry_id, "QC Workflow",
+                             f"QC_Status={qc_status} but missing Quality_User/Quality_Time",
+                             "Set Quality_User and Quality_Time when verifying."))
+
+    ncr_id = str(r.get("NCR_ID", "") or "").strip()
+    ncr_status = str(r.get("NCR_Status", "") or "").strip()
+    ncr_close = str(r.get("NCR_Close_Date", "") or "").strip()
+
+    if ncr_id and ncr_status == "Closed" and not ncr_close:
+        issues.append(_issue("ncr_close_date", "High", entry_id, "NCR",
+                             "NCR_Status=Closed but NCR_Close_Date is blank",
+                             "Enter NCR_Close_Date or reopen the NCR."))
+
+    action_status = str(r.get("Action_Status", "") or "").strip()
+    due_dt = parse_date(r.get("Action_Due_Date", ""))
+    if action_status in ("Open", "Overdue") and due_dt:
+        # Overdue from the day after the due date.
+        issues.append(_issue("action_overdue", "High", entry_id, "Actions",
+                             f"Action is overdue (due {due_dt.strftime('%Y-%m-%d')})",
+                             "Complete the action or update the due date/owner.",
+                             active_from=(due_dt + timedelta(days=1)).strftime("%Y-%m-%d")))
+
+    return issues
+
+
+def gage_issues(entry_id: str, gage_id: str, statuses: Dict[str, Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Issues for an entry that used gage_id, given gage_statuses()."""
+    g_used = str(gage_id or "").strip()
+    if not g_used:
+        return []
+    gs = statuses.get(g_used)
+    if not gs:
+        return [_issue("gage", "Medium", entry_id, "Gage Calibration",
+                       f"Gage_Used={g_used} not found in gages.json",
+                       "Add gage in Gages & Calibration Manager or correct the gage ID.")]
+    crit = gs["criticality"]
+    if gs["status"] == "Overdue":
+        sev = "Critical" if crit in ("High", "Critical") else "High"
+        return [_issue("gage", sev, entry_id, "Gage Calibration",
+                       f"Gage {g_used} is Overdue (criticality={crit}, due {gs['next_due']})",
+                       "Stop using this gage until calibrated (or correct last calibration date).")]
+    if gs["status"] == "Due Soon":
+        return [_issue("gage", "Medium", entry_id, "Gage Calibration",
+                       f"Gage {g_used} is Due Soon (criticality={crit}, due {gs['next_due']})",
+                       "Plan calibration before due date to avoid escalation.")]
+    return []
+
+
+def _entry_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """tool_entries row -> the ENTRY_COLUMNS names the rules read."""
+    return {c: row.get(c.lower(), "") for c in ENTRY_COLUMNS}
+
+
+def _evaluate_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    for r in rows:
+        for it in entry_issues(_entry_row(r)):
+            it["entry_date"] = str(r.get("date", "") or "")
+            issues.append(it)
+    return issues
+
+
+def rebuild(batch: int = DATA_ISSUES_BATCH) -> int:
+    """Re-evaluate every entry (resumable). Returns entries evaluated."""
+    head = db.get_meta("data_issues_rebuild_head")
+    if not head:
+        # Read the queue head first: entries written meanwhile are still queued after it.
+        head = str(db.data_issue_queue_head())
+        db.save_data_issues([], meta={"data_issues_rebuild_head": head, "data_issues_rebuild_after": ""})
+    after = db.get_meta("data_issues_rebuild_after") or ""
+    total = 0
+    while True:
+        rows = db.fetch_tool_entries_page(after, batch)
+        if not rows:
+            break
+        after = rows[-1]["id"]
+        db.save_data_issues(
+            _evaluate_rows(rows),
+            entry_ids=[r["id"] for r in rows],
+            meta={"data_issues_rebuild_after": after},
+        )
+        total += len(rows)
+        if len(rows) < batch:
+            break
+    db.save_data_issues(
+        [],
+        prune=True,
+        queue_seq=int(head),
+        meta={
+            "data_issues_rules": RULES_VERSION,
+            "data_issues_rebuild_head": "",
+            "data_issues_rebuild_after": "",
+        },
+    )
+    return total
+
+
+def evaluate(batch: int = DATA_ISSUES_BATCH) -> Dict[str, Any]:
+    """Bring data_issues up to date. Returns what was evaluated."""
+    stats = {"rebuilt": False, "entries": 0}
+    if db.get_meta("data_issues_rules") != RULES_VERSION:
+        stats["entries"] += rebuild(batch)
+        stats["rebuilt"] = True
+
+    seq = int(db.get_meta("data_issues_seq") or 0)
+    while True:
+        page = db.data_issue_queue_since(seq, batch)
+        if page["last_seq"] == seq:
+            break
+        rows = db.fetch_tool_entries_by_ids(page["entry_ids"])
+        db.save_data_issues(
+            _evaluate_rows(rows),
+            entry_ids=page["entry_ids"],
+            queue_seq=page["last_seq"],
+        )
+        stats["entries"] += len(page["entry_ids"])
+        seq = page["last_seq"]
+    return stats
+
+
+def rebuild_pending() -> bool:
+    """True while the stored issues predate RULES_VERSION (evaluate() rebuilds)."""
+    return db.get_meta("data_issues_rules") != RULES_VERSION
+
+
+class Evaluator(threading.Thread):
+    """Runs evaluate() in the background, backing off while the station is busy."""
+
+    def __init__(self, batch: int = DATA_ISSUES_BATCH, pause_s: float = 0.5):
+        super().__init__(daemon=True, name="data-issues")
+        self.batch = batch
+        self.pause_s = pause_s
+        self._stopping = threading.Event()
+        self.rebuilding = False
+        self.stats: Dict[str, Any] = {}
+        self.done = False
+        self.error = ""
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.rebuilding = rebuild_pending()
+                self.stats = evaluate(self.batch)
+            except sqlite3.OperationalError as exc:
+                if not db.is_lock_error(exc):
+                    self.error = str(exc)
+                    return
+                self._stopping.wait(self.pause_s)  # both passes resume at their meta cursor
+                continue
+            except Exception as exc:
+                self.error = str(exc)
+                return
+            self.done = True
+            return
+
+
+_evaluator: Optional[Evaluator] = None
+
+
+def start_evaluator() -> Evaluator:
+    """Start an evaluation pass unless one is running; returns the running pass."""
+    global _evaluator
+    if _evaluator is None or not _evaluator.is_alive():
+        _evaluator = Evaluator()
+        _evaluator.start()
+    return _evaluator
+
+
+def list_issues(
+    start: str,
+    end: str,
+    gage_set: Optional[Gages] = None,
+    risk: Optional[RiskRules] = None,
+    *,
+    min_severity: str = "",
+    category: str = "",
+    limit: int = DATA_ISSUES_SHOWN,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Issues of entries dated start..end (YYYY-MM-DD): stored ones plus gage
+    issues, most severe first. Gages and risk rules default to the config files.
+    At most limit stored issues are read; the flag is True when more exist.
+    """
+    issues = db.query_data_issues(start, end, min_severity=min_severity, category=category, limit=limit + 1)
+    truncated = len(issues) > limit
+    del issues[limit:]
+    if not category or category == "Gage Calibration":
+        statuses = gage_statuses(gage_set or gages(), risk or risk_rules())
+        min_rank = db.SEVERITY_RANK.get(min_severity, 0)
+        for r in db.list_entry_gages(start, end):
+            for it in gage_issues(r["id"], r["gage_used"], statuses):
+                if db.SEVERITY_RANK.get(it["severity"], 0) >= min_rank:
+                    it["entry_date"] = r["date"]
+                    issues.append(it)
+    issues.sort(key=lambda it: db.SEVERITY_RANK.get(it["severity"], 0), reverse=True)
+    return issues, truncated
+
+
+if __name__ == "__main__":
+    import sys
+
+    db.init_db()
+    if "--rebuild" in sys.argv[1:]:
+        db.set_meta("data_issues_rules", "")
+    print(evaluate())
@@ -1,17 +1,68 @@
 # app/db.py
 from __future__ import annotations
 
+import functools
+import random
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
 
-from .config import DB_PATH
+from .config import (
+    DB_PATH,
+    DB_BUSY_TIMEOUT_MS,
+    DB_LOCK_RETRIES,
+    DB_RETRY_BASE_S,
+    DB_RETRY_MAX_S,
+    SERVICE_URL,
+)
+
+from .events import ACTIONS, MASTER_DATA, NCRS, TOOL_ENTRIES, publish
+from .ids import new_id
+from .sqltrace import connect_kwargs
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+_bound = threading.local()
+
+
+class NoLocalDatabase(RuntimeError):
+    """connect() on a thin terminal (TOOLLIFE_SERVICE_URL set): the database is on the service host."""
 
 
 @contextmanager
-def connect():
-    conn = sqlite3.connect(DB_PATH)
+def bind_connection(conn: sqlite3.Connection):
+    """
+    Make connect() on this thread reuse conn instead of opening the file.
+    The owner of conn handles transactions (used by the service's writer and read pool).
+    """
+    prev = getattr(_bound, "conn", None)
+    _bound.conn = conn
+    try:
+        yield conn
+    finally:
+        _bound.conn = prev
+
+
+@contextmanager
+def connect(busy_timeout_ms: Optional[int] = None):
+    bound = getattr(_bound, "conn", None)
+    if bound is not None:
+        yield bound
+        return
+    if SERVICE_URL:
+        # Only the functions in app/service_client.py reach the service; opening
+        # DB_PATH here would quietly create an empty database on the terminal.
+        raise NoLocalDatabase(
+            f"This terminal uses the data service at {SERVICE_URL}; "
+            "this action only runs on the service host."
+        )
+    # timeout= is SQLite's busy handler: wait for the other station's lock instead of failing at once.
+    timeout_ms = DB_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+    conn = sqlite3.connect(DB_PATH, timeout=timeout_ms / 1000.0, **connect_kwargs())
     try:
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON;")
@@ -25,6 +76,107 @@ def connect():
         conn.close()
 
 
+# -----------------------------
+# Lock retry
+# -----------------------------
+_lock_stats_guard = threading.Lock()
+_lock_stats: Dict[str, float] = {
+    "lock_errors": 0,    # "database is locked/busy" raised by a write attempt
+    "retries": 0,        # attempts repeated after a lock error
+    "failures": 0,       # calls that still failed after all retries
+    "wait_s": 0.0,       # time spent in failed attempts and backoff sleeps
+    "max_wait_s": 0.0,   # longest total wait for a single call
+}
+
+
+def is_lock_error(exc: BaseException) -> bool:
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    msg = str(exc).lower()
+    return "locked" in msg or "busy" in msg
+
+
+def _record_lock_wait(waited: float, retries: int, failed: bool) -> None:
+    with _lock_stats_guard:
+        _lock_stats["lock_errors"] += retries + (1 if failed else 0)
+        _lock_stats["retries"] += retries
+        _lock_stats["failures"] += 1 if failed else 0
+        _lock_stats["wait_s"] += waited
+        _lock_stats["max_wait_s"] = max(_lock_stats["max_wait_s"], waited)
+
+
+def lock_stats() -> Dict[str, float]:
+    """Lock wait counters for this process (see retry_on_lock)."""
+    with _lock_stats_guard:
+        out = dict(_lock_stats)
+    out["wait_s"] = round(out["wait_s"], 3)
+    out["max_wait_s"] = round(out["max_wait_s"], 3)
+    return out
+
+
+def retry_on_lock(fn: F) -> F:
+    """
+    Retry fn when SQLite reports the database locked/busy, sleeping
+    base * 2**attempt (capped, with full jitter) between attempts.
+    Each attempt opens its own connection, so a failed one has fully rolled back.
+    Not retried when a connection is bound: its owner controls the transaction.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if getattr(_bound, "conn", None) is not None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        for attempt in range(DB_LOCK_RETRIES + 1):
+            try:
+                result = fn(*args, **kwargs)
+            except sqlite3.OperationalError as exc:
+                if not is_lock_error(exc) or attempt >= DB_LOCK_RETRIES:
+                    if is_lock_error(exc):
+                        _record_lock_wait(time.perf_counter() - t0, attempt, True)
+                    raise
+                time.sleep(random.uniform(0, min(DB_RETRY_MAX_S, DB_RETRY_BASE_S * (2 ** attempt))))
+                continue
+            if attempt:
+                _record_lock_wait(time.perf_counter() - t0, attempt, False)
+            return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _publishes(topic: str, ids: Optional[Callable[[Any, tuple], Iterable[Any]]] = None):
+    """
+    Publish topic on the event bus (app/events.py) after the write returned.
+    ids(result, args) names the rows written, when the call knows them.
+    """
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            publish(topic, ids(result, args) if ids else None)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return deco
+
+
+def iter_query(sql: str, params: Sequence[Any] = (), *, chunk_rows: int = 1000) -> Iterator[tuple]:
+    """
+    Stream a SELECT as plain tuples, fetchmany() at a time.
+    The connection stays open until the generator is exhausted or closed,
+    so consume it on the thread that started it.
+    """
+    with connect() as conn:
+        cur = conn.execute(sql, tuple(params))
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
+
+
 def init_db() -> None:
     schema = """
     CREATE TABLE IF NOT EXISTS meta (
@@ -256,6 +408,18 @@ def init_db() -> None:
         action TEXT NOT NULL DEFAULT ''
     );
 
+    CREATE TABLE IF NOT EXISTS backup_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        path TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT '',
+        integrity TEXT NOT NULL DEFAULT '',
+        bytes INTEGER NOT NULL DEFAULT 0,
+        pages INTEGER NOT NULL DEFAULT 0,
+        duration_s REAL NOT NULL DEFAULT 0.0,
+        error TEXT NOT NULL DEFAULT ''
+    );
+
     CREATE TABLE IF NOT EXISTS part_costs (
         part_id INTEGER NOT NULL UNIQUE,
         scrap_cost REAL NOT NULL DEFAULT 0.0,
@@ -265,18 +429,219 @@ def init_db() -> None:
 
     CREATE INDEX IF NOT EXISTS idx_parts_active ON parts(is_active);
     CREATE INDEX IF NOT EXISTS idx_tools_active ON tools(is_active);
+    CREATE INDEX IF NOT EXISTS idx_tool_entries_date ON tool_entries(date, time);
+    CREATE INDEX IF NOT EXISTS idx_tool_entries_shift_prod ON tool_entries(date, time)
+        WHERE reason = 'Shift Production';
+    CREATE INDEX IF NOT EXISTS idx_audit_logs_created ON audit_logs(created_at);
+    CREATE INDEX IF NOT EXISTS idx_part_lines_line ON part_lines(line_id);
+    CREATE INDEX IF NOT EXISTS idx_tool_lines_line ON tool_lines(line_id);
+    CREATE INDEX IF NOT EXISTS idx_tool_parts_part ON tool_parts(part_id);
+    CREATE INDEX IF NOT EXISTS idx_tool_inserts_tool ON tool_inserts(tool_id);
+    CREATE INDEX IF NOT EXISTS idx_actions_status_sev_due ON actions(status, severity, due_date);
+    CREATE INDEX IF NOT EXISTS idx_actions_owner ON actions(owner);
+
+    CREATE TABLE IF NOT EXISTS alerts (
+        alert_key TEXT PRIMARY KEY,
+        type TEXT NOT NULL DEFAULT '',
+        severity TEXT NOT NULL DEFAULT '',
+        title TEXT NOT NULL DEFAULT '',
+        details TEXT NOT NULL DEFAULT '',
+        entry_id TEXT NOT NULL DEFAULT '',
+        gage_id TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'Open',
+        first_seen TEXT NOT NULL DEFAULT '',
+        last_seen TEXT NOT NULL DEFAULT '',
+        acked_by TEXT NOT NULL DEFAULT '',
+        acked_at TEXT NOT NULL DEFAULT '',
+        snoozed_until TEXT NOT NULL DEFAULT '',
+        resolved_at TEXT NOT NULL DEFAULT ''
+    );
+
+    CREATE TABLE IF NOT EXISTS alert_queue (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_alerts_status ON alerts(status, severity);
+    CREATE INDEX IF NOT EXISTS idx_alerts_entry ON alerts(entry_id);
     """
     with connect() as conn:
         conn.executescript(schema)
         conn.execute("INSERT OR IGNORE INTO meta(key,value) VALUES('schema_version','1')")
+        _install_catalog_triggers(conn)
+        _install_alert_triggers(conn)
+        _install_event_triggers(conn)
         _ensure_columns(conn, "tools", {
             "stock_qty": "INTEGER NOT NULL DEFAULT 0",
             "inserts_per_tool": "INTEGER NOT NULL DEFAULT 1",
         })
         _ensure_columns(conn, "tool_entries", {
+            "cell": "TEXT NOT NULL DEFAULT ''",
             "tool_life": "REAL NOT NULL DEFAULT 0.0",
             "production_qty": "REAL NOT NULL DEFAULT 0.0",
         })
+        from .migrations import migrate
+
+        migrate(conn)
+
+
+# Master-data tables cached by app/catalog.py. Any change to them bumps
+# meta.catalog_version so every station reloads its catalog. tools.stock_qty
+# is live inventory, not catalog data, so stock updates do not count.
+CATALOG_TABLES = {
+    "lines": "",
+    "parts": "",
+    "part_lines": "",
+    "tools": "OF tool_num, name, unit_cost, inserts_per_tool, is_active ",
+    "tool_lines": "",
+    "tool_parts": "",
+    "tool_inserts": "",
+    "downtime_codes": "",
+}
+
+
+
+def _bump_meta_sql(key: str) -> str:
+    return (
+        f"INSERT INTO meta(key, value) VALUES('{key}', '1') "
+        "ON CONFLICT(key) DO UPDATE SET value=CAST(meta.value AS INTEGER) + 1;"
+    )
+
+
+_BUMP_CATALOG = _bump_meta_sql("catalog_version")
+
+
+def _install_catalog_triggers(conn: sqlite3.Connection) -> None:
+    for table, update_cols in CATALOG_TABLES.items():
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            cols = update_cols if op == "UPDATE" else ""
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS catalog_{table}_{op.lower()} "
+                f"AFTER {op} {cols}ON {table} BEGIN {_BUMP_CATALOG} END"
+            )
+
+
+# Change counters the event poller (app/events.py) compares, per topic. Master
+# data shares the catalog's version; the others are bumped by triggers below.
+EVENT_VERSION_KEYS = {
+    TOOL_ENTRIES: "tool_entries_version",
+    ACTIONS: "actions_version",
+    NCRS: "ncrs_version",
+    MASTER_DATA: "catalog_version",
+}
+
+# The columns of tool_entries as entered (ENTRY_COLUMNS, lower-cased). Only
+# these count as a change: the typed columns derived from them
+# (TYPED_ENTRY_COLUMNS) are rewritten by the migration backfill.
+TOOL_ENTRY_COLUMNS = (
+    "id", "date", "time", "shift", "line", "cell", "machine", "part_number", "tool_num",
+    "reason", "downtime_mins", "production_qty", "cost", "tool_life", "tool_changer",
+    "defects_present", "defect_qty", "sort_done", "defect_reason", "quality_verified",
+    "quality_user", "quality_time", "leader_sign", "leader_user", "leader_time",
+    "serial_numbers", "andon_flag", "customer_risk", "qc_status", "ncr_id", "ncr_status",
+    "ncr_close_date", "action_status", "action_due_date", "gage_used", "copq_est",
+)
+_EVENT_UPDATE_OF = {TOOL_ENTRIES: f"OF {', '.join(TOOL_ENTRY_COLUMNS)} "}
+
+
+def _install_event_triggers(conn: sqlite3.Connection) -> None:
+    for table in (TOOL_ENTRIES, ACTIONS, NCRS):
+        bump = _bump_meta_sql(EVENT_VERSION_KEYS[table])
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            cols = _EVENT_UPDATE_OF.get(table, "") if op == "UPDATE" else ""
+            conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS events_{table}_{op.lower()} "
+                f"AFTER {op} {cols}ON {table} BEGIN {bump} END"
+            )
+
+
+def event_versions() -> Dict[str, str]:
+    """Current change counter of every event topic."""
+    keys = list(EVENT_VERSION_KEYS.values())
+    with connect() as conn:
+        rows = conn.execute(
+            f"SELECT key, value FROM meta WHERE key IN ({', '.join('?' * len(keys))})", keys
+        ).fetchall()
+    values = {r["key"]: r["value"] for r in rows}
+    return {topic: values.get(key, "0") for topic, key in EVENT_VERSION_KEYS.items()}
+
+
+# tool_entries columns the alert rules read (app/quality_engine.entry_notifications).
+# Inserting, deleting or changing one of them queues the entry for app/alerts.py.
+ALERT_ENTRY_COLUMNS = (
+    "line", "machine", "part_number", "tool_num", "andon_flag", "customer_risk", "copq_est",
+)
+
+
+def _install_alert_triggers(conn: sqlite3.Connection) -> None:
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in ALERT_ENTRY_COLUMNS)
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS alerts_tool_entries_insert AFTER INSERT ON tool_entries "
+        "BEGIN INSERT INTO alert_queue(entry_id) VALUES (NEW.id); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS alerts_tool_entries_update AFTER UPDATE ON tool_entries "
+        f"WHEN {changed} BEGIN INSERT INTO alert_queue(entry_id) VALUES (NEW.id); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS alerts_tool_entries_delete AFTER DELETE ON tool_entries "
+        "BEGIN INSERT INTO alert_queue(entry_id) VALUES (OLD.id); END"
+    )
+
+
+# tool_entries columns the data-quality rules read (app/data_quality.entry_issues).
+# Inserting, deleting or changing one of them queues the entry for re-evaluation.
+DATA_ISSUE_ENTRY_COLUMNS = (
+    "date", "line", "machine", "tool_num", "reason", "part_number",
+    "defects_present", "defect_qty", "qc_status", "quality_user", "quality_time",
+    "ncr_id", "ncr_status", "ncr_close_date", "action_status", "action_due_date",
+)
+
+
+def _install_data_issue_triggers(conn: sqlite3.Connection) -> None:
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in DATA_ISSUE_ENTRY_COLUMNS)
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS data_issues_tool_entries_insert AFTER INSERT ON tool_entries "
+        "BEGIN INSERT INTO data_issue_queue(entry_id) VALUES (NEW.id); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS data_issues_tool_entries_update AFTER UPDATE ON tool_entries "
+        f"WHEN {changed} BEGIN INSERT INTO data_issue_queue(entry_id) VALUES (NEW.id); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS data_issues_tool_entries_delete AFTER DELETE ON tool_entries "
+        "BEGIN INSERT INTO data_issue_queue(entry_id) VALUES (OLD.id); END"
+    )
+
+
+# Dimension keys of tool_entries (app/migrations.py): the lines, parts and tools
+# rows an entry names, set by the writer from the catalog snapshot
+# (upsert_tool_entry, sync) and by the migration backfill for older rows.
+# Names master data does not know stay NULL: entries never register master
+# data, and readers match NULL keys by name (storage.dimension_keys).
+# Machines have no master data to key into, so they are grouped by name.
+DIMENSION_ID_COLUMNS = ("line_id", "part_id", "tool_id")
+_DIMENSION_TABLES = {
+    "line_id": ("lines", "name"),
+    "part_id": ("parts", "part_number"),
+    "tool_id": ("tools", "tool_num"),
+}
+
+
+def _dimension_ids_sql(r: str) -> Dict[str, str]:
+    """DIMENSION_ID_COLUMNS -> subquery finding the id for entry row r."""
+    return {
+        "line_id": f"(SELECT id FROM lines WHERE name = {r}.line)",
+        "part_id": f"(SELECT id FROM parts WHERE part_number = {r}.part_number)",
+        "tool_id": f"(SELECT id FROM tools WHERE tool_num = {r}.tool_num)",
+    }
+
+
+def entry_dimension_ids(record: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """DIMENSION_ID_COLUMNS for a tool_entries row (db column names), from the catalog snapshot."""
+    from .catalog import get_catalog  # the catalog reads through this module
+
+    return get_catalog().dimension_ids(record)
 
 
 def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
@@ -286,6 +651,7 @@ def _ensure_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str
             conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_def}")
 
 
+@retry_on_lock
 def log_audit(username: str, action: str) -> None:
     with connect() as conn:
         conn.execute(
@@ -317,6 +683,35 @@ def list_audit_logs(limit: int = 500) -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+def record_backup(entry: Dict[str, Any]) -> None:
+    record = {
+        "started_at": entry.get("started_at", ""),
+        "path": entry.get("path", ""),
+        "status": entry.get("status", ""),
+        "integrity": entry.get("integrity", ""),
+        "bytes": int(entry.get("bytes", 0) or 0),
+        "pages": int(entry.get("pages", 0) or 0),
+        "duration_s": float(entry.get("duration_s", 0.0) or 0.0),
+        "error": entry.get("error", ""),
+    }
+    columns = ", ".join(record.keys())
+    placeholders = ", ".join(["?"] * len(record))
+    with connect() as conn:
+        conn.execute(
+            f"INSERT INTO backup_log ({columns}) VALUES ({placeholders})",
+            list(record.values()),
+        )
+
+
+def list_backup_log(limit: int = 50) -> List[Dict[str, Any]]:
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM backup_log ORDER BY id DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
 def seed_default_users(default_users: Dict[str, Dict[str, Any]]) -> None:
     with connect() as conn:
         for username, u in default_users.items():
@@ -335,6 +730,7 @@ def seed_default_users(default_users: Dict[str, Dict[str, Any]]) -> None:
             )
 
 
+@_publishes(MASTER_DATA)
 def ensure_lines(names: Iterable[str]) -> None:
     with connect() as conn:
         for n in names:
@@ -383,6 +779,7 @@ def upsert_production_goal(line: str, target: float) -> None:
         )
 
 
+@_publishes(MASTER_DATA)
 def upsert_part(part_number: str, name: str = "", lines: Optional[List[str]] = None) -> None:
     lines = lines or []
     with connect() as conn:
@@ -398,6 +795,7 @@ def upsert_part(part_number: str, name: str = "", lines: Optional[List[str]] = N
             VALUES(?, ?, 1)
             ON CONFLICT(part_number) DO UPDATE SET
               name=excluded.name,
+              is_active=1,
               updated_at=datetime('now')
             """,
             (part_number, name),
@@ -418,6 +816,7 @@ def upsert_part(part_number: str, name: str = "", lines: Optional[List[str]] = N
             conn.execute("INSERT OR IGNORE INTO part_lines(part_id,line_id) VALUES(?,?)", (part_id, line_id))
 
 
+@_publishes(MASTER_DATA)
 def deactivate_part(part_number: str) -> None:
     with connect() as conn:
         conn.execute(
@@ -426,8 +825,10 @@ def deactivate_part(part_number: str) -> None:
         )
 
 
+@_publishes(MASTER_DATA)
 def upsert_tool(tool_num: str, name: str = "", unit_cost: float = 0.0) -> None:
     with connect() as conn:
+        before = _unit_cost(conn, tool_num)
         conn.execute(
             """
             INSERT INTO tools(tool_num, name, unit_cost, stock_qty, inserts_per_tool, is_active)
@@ -435,12 +836,16 @@ def upsert_tool(tool_num: str, name: str = "", unit_cost: float = 0.0) -> None:
             ON CONFLICT(tool_num) DO UPDATE SET
               name=excluded.name,
               unit_cost=excluded.unit_cost,
+              is_active=1,
               updated_at=datetime('now')
             """,
             (tool_num, name, float(unit_cost)),
         )
+        if before != float(unit_cost):
+            _refresh_change_cost(conn, _tool_id(conn, tool_num))
 
 
+@_publishes(MASTER_DATA)
 def upsert_tool_inventory(
     tool_num: str,
     *,
@@ -450,6 +855,7 @@ def upsert_tool_inventory(
     inserts_per_tool: int = 1,
 ) -> None:
     with connect() as conn:
+        before = _unit_cost(conn, tool_num)
         conn.execute(
             """
             INSERT INTO tools(tool_num, name, unit_cost, stock_qty, inserts_per_tool, is_active)
@@ -459,21 +865,100 @@ def upsert_tool_inventory(
               unit_cost=excluded.unit_cost,
               stock_qty=excluded.stock_qty,
               inserts_per_tool=excluded.inserts_per_tool,
+              is_active=1,
               updated_at=datetime('now')
             """,
             (tool_num, name, float(unit_cost), int(stock_qty), int(inserts_per_tool)),
         )
+        if before != float(unit_cost):
+            _refresh_change_cost(conn, _tool_id(conn, tool_num))
 
 
 def get_tool(tool_num: str) -> Optional[Dict[str, Any]]:
     with connect() as conn:
         row = conn.execute(
-            "SELECT tool_num, name, unit_cost, stock_qty, inserts_per_tool FROM tools WHERE tool_num=?",
+            "SELECT tool_num, name, unit_cost, stock_qty, inserts_per_tool, cost_per_change "
+            "FROM tools WHERE tool_num=?",
             (tool_num,),
         ).fetchone()
         return dict(row) if row else None
 
 
+def insert_change_cost(inserts: Iterable[Dict[str, Any]]) -> float:
+    """Insert cost of one tool change: per insert type, count * price / life / sides."""
+    def num(value: Any, default: float) -> float:
+        try:
+            return default if value is None or str(value).strip() == "" else float(value)
+        except (TypeError, ValueError):
+            return default
+
+    total = 0.0
+    for ins in inserts:
+        count = num(ins.get("insert_count"), 0.0)
+        price = num(ins.get("price_per_insert"), 0.0)
+        life = num(ins.get("tool_life"), 0.0)
+        sides = num(ins.get("sides_per_insert"), 1.0)
+        if life <= 0 or sides <= 0:
+            continue
+        total += ((count * price) / life) / sides
+    return total
+
+
+def _refresh_change_cost(conn: sqlite3.Connection, tool_id: Optional[int]) -> None:
+    """
+    Recompute tools.cost_per_change: the insert cost when the tool has insert
+    types, else its unit cost. A change is recorded in tool_cost_history by trigger.
+    Call it only when this station changed the tool's inserts or unit cost:
+    tool_inserts are not synced, so a peer recomputing on any other write would
+    overwrite the synced insert cost with the unit cost.
+    """
+    if not tool_id:
+        return
+    inserts = conn.execute(
+        "SELECT insert_count, price_per_insert, sides_per_insert, tool_life FROM tool_inserts WHERE tool_id=?",
+        (tool_id,),
+    ).fetchall()
+    if inserts:
+        cost = insert_change_cost(dict(r) for r in inserts)
+    else:
+        cost = float(conn.execute("SELECT unit_cost FROM tools WHERE id=?", (tool_id,)).fetchone()["unit_cost"])
+    conn.execute(
+        "UPDATE tools SET cost_per_change=? WHERE id=? AND cost_per_change IS NOT ?",
+        (cost, tool_id, cost),
+    )
+
+
+def tool_cost_at(tool_num: str, when: str) -> Optional[float]:
+    """Cost per change of tool_num as it stood at when ("YYYY-MM-DD HH:MM:SS", local time)."""
+    with connect() as conn:
+        row = conn.execute(
+            """
+            SELECT h.cost_per_change
+            FROM tool_cost_history h JOIN tools t ON t.id = h.tool_id
+            WHERE t.tool_num=? AND h.changed_at <= ?
+            ORDER BY h.changed_at DESC, h.id DESC
+            LIMIT 1
+            """,
+            (tool_num, when),
+        ).fetchone()
+        return float(row["cost_per_change"]) if row else None
+
+
+def list_tool_cost_history(tool_num: str) -> List[Dict[str, Any]]:
+    with connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT h.changed_at, h.cost_per_change
+            FROM tool_cost_history h JOIN tools t ON t.id = h.tool_id
+            WHERE t.tool_num=?
+            ORDER BY h.changed_at, h.id
+            """,
+            (tool_num,),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+@retry_on_lock
 def update_tool_stock(tool_num: str, stock_qty: int) -> None:
     with connect() as conn:
         conn.execute(
@@ -482,6 +967,7 @@ def update_tool_stock(tool_num: str, stock_qty: int) -> None:
         )
 
 
+@_publishes(MASTER_DATA)
 def deactivate_tool(tool_num: str) -> None:
     with connect() as conn:
         conn.execute(
@@ -498,6 +984,11 @@ def _tool_id(conn: sqlite3.Connection, tool_num: str) -> Optional[int]:
     return row["id"] if row else None
 
 
+def _unit_cost(conn: sqlite3.Connection, tool_num: str) -> Optional[float]:
+    row = conn.execute("SELECT unit_cost FROM tools WHERE tool_num=?", (tool_num,)).fetchone()
+    return float(row["unit_cost"]) if row else None
+
+
 def _part_id(conn: sqlite3.Connection, part_number: str) -> Optional[int]:
     row = conn.execute(
         "SELECT id FROM parts WHERE part_number=?",
@@ -506,6 +997,7 @@ def _part_id(conn: sqlite3.Connection, part_number: str) -> Optional[int]:
     return row["id"] if row else None
 
 
+@_publishes(MASTER_DATA)
 def set_tool_lines(tool_num: str, lines: Iterable[str]) -> None:
     lines = [ln.strip() for ln in lines if (ln or "").strip()]
     with connect() as conn:
@@ -537,6 +1029,7 @@ def get_tool_lines(tool_num: str) -> List[str]:
         return [r["name"] for r in rows]
 
 
+@_publishes(MASTER_DATA)
 def set_tool_parts(tool_num: str, parts: Iterable[str]) -> None:
     parts = [pn.strip() for pn in parts if (pn or "").strip()]
     with connect() as conn:
@@ -574,6 +1067,7 @@ def get_tool_parts(tool_num: str) -> List[str]:
         return [r["part_number"] for r in rows]
 
 
+@_publishes(MASTER_DATA)
 def replace_tool_inserts(tool_num: str, inserts: Iterable[Dict[str, Any]]) -> None:
     with connect() as conn:
         tool_id = _tool_id(conn, tool_num)
@@ -597,6 +1091,7 @@ def replace_tool_inserts(tool_num: str, inserts: Iterable[Dict[str, Any]]) -> No
                     float(ins.get("tool_life", 0.0) or 0.0),
                 ),
             )
+        _refresh_change_cost(conn, tool_id)
 
 
 def list_tool_inserts(tool_num: str) -> List[Dict[str, Any]]:
@@ -675,31 +1170,117 @@ def set_scrap_cost(part_number: str, scrap_cost: float) -> None:
             """,
             (part_id, float(scrap_cost)),
         )
+
+
+# Separator for GROUP_CONCAT lists (ASCII unit separator; never typed into names).
+_SEP = "\x1f"
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return sorted(v for v in (value or "").split(_SEP) if v)
+
+
 def list_parts_with_lines():
     with connect() as conn:
-        parts = conn.execute(
-            "SELECT id, part_number, name FROM parts WHERE is_active=1 ORDER BY part_number"
+        rows = conn.execute(
+            """
+            SELECT p.id, p.part_number, p.name,
+                   (SELECT GROUP_CONCAT(l.name, char(31))
+                    FROM part_lines pl JOIN lines l ON l.id = pl.line_id
+                    WHERE pl.part_id = p.id) AS lines
+            FROM parts p
+            WHERE p.is_active=1
+            ORDER BY p.part_number
+            """
         ).fetchall()
-
-        out = []
-        for p in parts:
-            lines = conn.execute(
+        return [
+            {
+                "id": r["id"],
+                "part_number": r["part_number"],
+                "name": r["name"],
+                "lines": _split(r["lines"]),
+            }
+            for r in rows
+        ]
+
+
+def list_parts_for_line(line: str = "") -> List[str]:
+    """Active part numbers assigned to a line (all active parts when line is blank)."""
+    with connect() as conn:
+        if not line:
+            rows = conn.execute(
+                "SELECT part_number FROM parts WHERE is_active=1 ORDER BY part_number"
+            ).fetchall()
+        else:
+            rows = conn.execute(
                 """
-                SELECT l.name
-                FROM part_lines pl
+                SELECT p.part_number
+                FROM parts p
+                JOIN part_lines pl ON pl.part_id = p.id
                 JOIN lines l ON l.id = pl.line_id
-                WHERE pl.part_id=?
-                ORDER BY l.name
+                WHERE p.is_active=1 AND l.name=?
+                ORDER BY p.part_number
                 """,
-                (p["id"],),
+                (line,),
             ).fetchall()
-            out.append({
-                "id": p["id"],
-                "part_number": p["part_number"],
-                "name": p["name"],
-                "lines": [r["name"] for r in lines],
-            })
-        return out
+        return [r["part_number"] for r in rows if r["part_number"]]
+
+
+def list_tools_with_mappings(line: str = "") -> List[Dict[str, Any]]:
+    """
+    Active tools with their lines, parts and insert types, in two queries.
+    With a line (other than "All"), only tools assigned to that line.
+    """
+    line_filter = ""
+    params: List[Any] = []
+    if line and line.lower() != "all":
+        line_filter = """
+              AND t.id IN (SELECT tl.tool_id FROM tool_lines tl
+                           JOIN lines l ON l.id = tl.line_id WHERE l.name=?)"""
+        params.append(line)
+    with connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT t.id, t.tool_num, t.name, t.unit_cost, t.stock_qty, t.inserts_per_tool, t.cost_per_change,
+                   (SELECT GROUP_CONCAT(l.name, char(31))
+                    FROM tool_lines tl JOIN lines l ON l.id = tl.line_id
+                    WHERE tl.tool_id = t.id) AS lines,
+                   (SELECT GROUP_CONCAT(p.part_number, char(31))
+                    FROM tool_parts tp JOIN parts p ON p.id = tp.part_id
+                    WHERE tp.tool_id = t.id) AS parts
+            FROM tools t
+            WHERE t.is_active=1{line_filter}
+            ORDER BY t.tool_num
+            """,
+            params,
+        ).fetchall()
+        inserts: Dict[int, List[Dict[str, Any]]] = {}
+        for r in conn.execute(
+            """
+            SELECT ti.tool_id, ti.insert_name, ti.insert_count, ti.price_per_insert,
+                   ti.sides_per_insert, ti.tool_life
+            FROM tool_inserts ti
+            JOIN tools t ON t.id = ti.tool_id
+            WHERE t.is_active=1
+            ORDER BY ti.tool_id, ti.id
+            """
+        ):
+            ins = dict(r)
+            inserts.setdefault(ins.pop("tool_id"), []).append(ins)
+
+    out = []
+    for r in rows:
+        out.append({
+            "tool_num": r["tool_num"],
+            "name": r["name"],
+            "unit_cost": r["unit_cost"],
+            "stock_qty": r["stock_qty"],
+            "inserts_per_tool": r["inserts_per_tool"],
+            "lines": _split(r["lines"]),
+            "parts": _split(r["parts"]),
+            "inserts": inserts.get(r["id"], []),
+        })
+    return out
 
 
 def list_tools_simple():
@@ -723,6 +1304,26 @@ def get_scrap_costs_simple():
         return {r["part_number"]: float(r["scrap_cost"]) for r in rows}
 
 
+def dimension_ids() -> Dict[str, Any]:
+    """name -> id of lines, parts and tools (app/catalog.py)."""
+    with connect() as conn:
+        out: Dict[str, Dict[str, int]] = {}
+        for column, (table, name_col) in _DIMENSION_TABLES.items():
+            rows = conn.execute(f"SELECT id, {name_col} AS name FROM {table}").fetchall()
+            out[table] = {r["name"]: r["id"] for r in rows}
+        return out
+
+
+def dimension_rows(column: str) -> List[Dict[str, Any]]:
+    """id and display name of every row behind a tool_entries dimension key (DIMENSION_ID_COLUMNS)."""
+    with connect() as conn:
+        if column not in _DIMENSION_TABLES:
+            raise ValueError(f"Not a dimension key: {column}")
+        table, name_col = _DIMENSION_TABLES[column]
+        rows = conn.execute(f"SELECT id, {name_col} AS name FROM {table}").fetchall()
+        return [dict(r) for r in rows]
+
+
 def list_downtime_codes(active_only: bool = True) -> List[Dict[str, Any]]:
     with connect() as conn:
         if active_only:
@@ -736,6 +1337,7 @@ def list_downtime_codes(active_only: bool = True) -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+@_publishes(MASTER_DATA)
 def upsert_downtime_code(code: str, description: str = "") -> None:
     with connect() as conn:
         conn.execute(
@@ -751,6 +1353,7 @@ def upsert_downtime_code(code: str, description: str = "") -> None:
         )
 
 
+@_publishes(MASTER_DATA)
 def deactivate_downtime_code(code: str) -> None:
     with connect() as conn:
         conn.execute(
@@ -759,6 +1362,7 @@ def deactivate_downtime_code(code: str) -> None:
         )
 
 
+@retry_on_lock
 def upsert_operator_entry(entry: Dict[str, Any]) -> None:
     if not entry.get("id"):
         raise ValueError("Entry must include id")
@@ -908,6 +1512,25 @@ def list_screen_permissions(username: Optional[str] = None) -> List[Dict[str, An
         return [dict(r) for r in rows]
 
 
+def count_tool_entries() -> int:
+    with connect() as conn:
+        return int(conn.execute("SELECT COUNT(*) FROM tool_entries").fetchone()[0])
+
+
+def fetch_archived_entries(start: str, end: str, columns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Archived (closed-month) entries with start <= Date <= end, as ENTRY_COLUMNS
+    records, for terminals: the archive files live next to the database.
+    """
+    from .archive import archived_months, months_between, read_archive  # archive imports this module
+
+    on_file = set(archived_months())
+    months = [m for m in months_between(start, end) if m in on_file]
+    if not months:
+        return []
+    return read_archive(months, columns=columns, start=start, end=end).to_dict("records")
+
+
 def list_entry_months() -> List[str]:
     with connect() as conn:
         rows = conn.execute(
@@ -916,6 +1539,60 @@ def list_entry_months() -> List[str]:
         return [r["month"] for r in rows if r["month"]]
 
 
+# Typed columns of tool_entries (added by app/migrations.py), derived from the
+# text columns on every write and by the backfill for older rows:
+#   ts          date + time as seconds since 1970, the wall clock as entered
+#   <flag>_code FLAG_CODES of the Yes/No/Pending/N/A columns in FLAG_COLUMNS
+#   *_cents     cost and copq_est in integer cents
+# NULL means "not derived yet" (or not parseable): read the text column instead.
+FLAG_CODES = {"": 0, "no": 1, "yes": 2, "pending": 3, "n/a": 4}
+FLAG_COLUMNS = ("defects_present", "sort_done", "quality_verified", "leader_sign", "andon_flag")
+CENTS_COLUMNS = {"cost": "cost_cents", "copq_est": "copq_cents"}
+TYPED_ENTRY_COLUMNS = ("ts",) + tuple(f"{c}_code" for c in FLAG_COLUMNS) + tuple(CENTS_COLUMNS.values())
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def entry_ts(date: Any, time_of_day: Any = "") -> Optional[int]:
+    """Seconds since 1970 of a YYYY-MM-DD date plus HH:MM[:SS] (midnight if the time is unreadable)."""
+    try:
+        day = datetime.strptime(str(date or "").strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
+    secs = 0
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            t = datetime.strptime(str(time_of_day or "").strip(), fmt)
+        except ValueError:
+            continue
+        secs = t.hour * 3600 + t.minute * 60 + t.second
+        break
+    return int((day - _EPOCH).total_seconds()) + secs
+
+
+def flag_code(value: Any) -> Optional[int]:
+    return FLAG_CODES.get(str(value or "").strip().lower())
+
+
+def to_cents(value: Any) -> Optional[int]:
+    try:
+        return int(round(float(value or 0.0) * 100))
+    except (TypeError, ValueError):
+        return None
+
+
+def typed_entry_values(record: Dict[str, Any]) -> Dict[str, Any]:
+    """TYPED_ENTRY_COLUMNS for a tool_entries row (db column names)."""
+    out: Dict[str, Any] = {"ts": entry_ts(record.get("date"), record.get("time"))}
+    for col in FLAG_COLUMNS:
+        out[f"{col}_code"] = flag_code(record.get(col))
+    for col, cents in CENTS_COLUMNS.items():
+        out[cents] = to_cents(record.get(col))
+    return out
+
+
+@_publishes(TOOL_ENTRIES, lambda result, args: [args[0].get("ID") or args[0].get("id")])
+@retry_on_lock
 def upsert_tool_entry(entry: Dict[str, Any]) -> None:
     if not entry.get("ID") and not entry.get("id"):
         raise ValueError("Entry must include ID")
@@ -959,6 +1636,8 @@ def upsert_tool_entry(entry: Dict[str, Any]) -> None:
         "gage_used": entry.get("Gage_Used", ""),
         "copq_est": float(entry.get("COPQ_Est", 0.0) or 0.0),
     }
+    record.update(typed_entry_values(record))
+    record.update(entry_dimension_ids(record))
     with connect() as conn:
         existing = conn.execute(
             "SELECT id FROM tool_entries WHERE id=?",
@@ -977,6 +1656,36 @@ def upsert_tool_entry(entry: Dict[str, Any]) -> None:
             )
 
 
+@_publishes(TOOL_ENTRIES, lambda result, args: [args[0].get("ID")])
+@retry_on_lock
+def record_tool_change(change: Dict[str, Any]) -> None:
+    """
+    A submitted entry (change["entry"]) with its side effects, in one
+    transaction: one tool out of stock when change["take_tool"] (if any are
+    left) and change["audit"] in audit_logs. Those only happen when the entry
+    is new, so replaying a queued submit (app/submit_queue.py) does not take a
+    second tool or log twice.
+    """
+    entry = change["entry"]
+    entry_id = str(entry.get("ID") or entry.get("id") or "")
+    with connect() as conn, bind_connection(conn):
+        new = conn.execute("SELECT 1 FROM tool_entries WHERE id=?", (entry_id,)).fetchone() is None
+        upsert_tool_entry(entry)
+        if not new:
+            return
+        if change.get("take_tool"):
+            conn.execute(
+                "UPDATE tools SET stock_qty=stock_qty-1, updated_at=datetime('now') "
+                "WHERE tool_num=? AND stock_qty > 0",
+                (str(entry.get("Tool_Num", "")),),
+            )
+        if change.get("audit"):
+            conn.execute(
+                "INSERT INTO audit_logs(username, action) VALUES(?, ?)",
+                (change.get("user") or "", change["audit"]),
+            )
+
+
 def fetch_tool_entries(month: Optional[str] = None) -> List[Dict[str, Any]]:
     with connect() as conn:
         if month:
@@ -991,10 +1700,125 @@ def fetch_tool_entries(month: Optional[str] = None) -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+def fetch_tool_entries_range(
+    start: str,
+    end: str,
+    columns: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Entries with start <= date <= end (YYYY-MM-DD strings).
+    columns limits the SELECT to those tool_entries columns; unknown names are ignored.
+    """
+    with connect() as conn:
+        cols = "*"
+        if columns:
+            known = {r["name"] for r in conn.execute("PRAGMA table_info(tool_entries)").fetchall()}
+            picked = [c for c in columns if c in known]
+            if picked:
+                cols = ", ".join(picked)
+        rows = conn.execute(
+            f"SELECT {cols} FROM tool_entries WHERE date >= ? AND date <= ? ORDER BY date DESC, time DESC",
+            (start, end),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+# Shift-production reports (AdminUI). The WHERE must stay reason = 'Shift Production'
+# verbatim so SQLite can use the partial index idx_tool_entries_shift_prod.
+SHIFT_MINUTES = 480.0
+_SHIFT_SORT = {
+    "Line": "e.line, e.date, e.time",
+    "Shift": "e.shift, e.date, e.time",
+    "Operator": "e.tool_changer, e.date, e.time",
+}
+
+
+def query_shift_reports(
+    *,
+    line: Optional[str] = None,
+    shift: Optional[str] = None,
+    operator: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    sort: str = "Date",
+) -> List[Dict[str, Any]]:
+    """
+    Shift-production entries filtered and sorted in SQL (start/end are
+    YYYY-MM-DD, inclusive), with the line's goal and percent-of-goal columns:
+    pct_goal_adj is against the goal scaled down by the shift's downtime.
+    Sort "Line", "Shift" or "Operator", else newest first.
+    """
+    # Numbered parameters: ?1 is the shift length, filters follow from ?2.
+    where = ["e.reason = 'Shift Production'"]
+    params: List[Any] = []
+    for column, value in (("e.line", line), ("e.shift", shift), ("e.tool_changer", operator)):
+        if value:
+            params.append(value)
+            where.append(f"{column} = ?{len(params) + 1}")
+    if start:
+        params.append(start)
+        where.append(f"e.date >= ?{len(params) + 1}")
+    if end:
+        params.append(end)
+        where.append(f"e.date <= ?{len(params) + 1}")
+    order = _SHIFT_SORT.get(sort, "e.date DESC, e.time DESC")
+    sql = f"""
+        SELECT e.id, e.date, e.time, e.line, e.shift, e.tool_changer,
+               e.production_qty, e.downtime_mins,
+               COALESCE(g.target, 0.0) AS target,
+               CASE WHEN g.target > 0
+                    THEN e.production_qty * 100.0 / g.target ELSE 0.0 END AS pct_goal,
+               CASE WHEN g.target > 0 AND e.downtime_mins < ?1
+                    THEN e.production_qty * 100.0 / (g.target * (1.0 - e.downtime_mins / ?1))
+                    ELSE 0.0 END AS pct_goal_adj
+        FROM tool_entries e
+        LEFT JOIN production_goals g ON g.line = e.line
+        WHERE {" AND ".join(where)}
+        ORDER BY {order}
+    """
+    with connect() as conn:
+        rows = conn.execute(sql, [SHIFT_MINUTES, *params]).fetchall()
+        return [dict(r) for r in rows]
+
+
+def list_shift_operators() -> List[str]:
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT DISTINCT tool_changer FROM tool_entries "
+            "WHERE reason = 'Shift Production' AND tool_changer != '' ORDER BY tool_changer"
+        ).fetchall()
+        return [r["tool_changer"] for r in rows]
+
+
+def fetch_tool_entries_by_ids(ids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Entries with the given IDs (missing IDs are skipped)."""
+    ids = list(dict.fromkeys(str(i) for i in ids))
+    out: List[Dict[str, Any]] = []
+    with connect() as conn:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT * FROM tool_entries WHERE id IN ({marks})", chunk).fetchall()
+            out.extend(dict(r) for r in rows)
+    return out
+
+
+def fetch_tool_entries_page(after_id: str = "", limit: int = 1000) -> List[Dict[str, Any]]:
+    """Entries in creation (id) order after after_id: keyset paging over app/ids.py IDs."""
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM tool_entries WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id or "", int(limit)),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+@_publishes(ACTIONS, lambda result, args: [result["action_id"]])
+@retry_on_lock
 def upsert_action(action: Dict[str, Any]) -> Dict[str, Any]:
     action_id = action.get("action_id")
     if not action_id:
-        action_id = f"A-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        action_id = new_id("A")
         action["action_id"] = action_id
     action.setdefault("type", "Action")
     action.setdefault("severity", "Medium")
@@ -1051,6 +1875,118 @@ def list_actions() -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+SEVERITY_RANK = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+
+
+def _severity_rank_sql(column: str = "severity") -> str:
+    return f"CASE {column} WHEN 'Critical' THEN 3 WHEN 'High' THEN 2 WHEN 'Medium' THEN 1 ELSE 0 END"
+
+
+_SEVERITY_RANK_SQL = _severity_rank_sql()
+# Action Center order: open before closed, most severe first, then due date.
+# Every term ascending so a page cursor is one row-value comparison.
+_ACTION_SORT = f"(status='Closed'), -({_SEVERITY_RANK_SQL}), due_date, updated_at, action_id"
+
+
+def _action_filters(
+    min_severity: str = "Low",
+    status: Optional[str] = None,
+    owner: Optional[str] = None,
+    line: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+) -> tuple:
+    where: List[str] = []
+    params: List[Any] = []
+    floor = SEVERITY_RANK.get(min_severity or "Low", 0)
+    if floor > 0:
+        allowed = [s for s, r in SEVERITY_RANK.items() if r >= floor]
+        where.append(f"severity IN ({', '.join('?' * len(allowed))})")
+        params.extend(allowed)
+    if status and status != "All":
+        where.append("status=?")
+        params.append(status)
+    if owner:
+        where.append("owner=?")
+        params.append(owner)
+    if line:
+        where.append("line=?")
+        params.append(line)
+    if due_from:
+        where.append("due_date<>'' AND due_date>=?")
+        params.append(due_from)
+    if due_to:
+        where.append("due_date<>'' AND due_date<=?")
+        params.append(due_to)
+    return where, params
+
+
+def _action_cursor(row: Dict[str, Any]) -> List[Any]:
+    return [
+        int(row["status"] == "Closed"),
+        -SEVERITY_RANK.get(row["severity"], 0),
+        row["due_date"],
+        row["updated_at"],
+        row["action_id"],
+    ]
+
+
+def query_actions(
+    *,
+    min_severity: str = "Low",
+    status: Optional[str] = None,
+    owner: Optional[str] = None,
+    line: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    after: Optional[Sequence[Any]] = None,
+    limit: int = 200,
+) -> Dict[str, Any]:
+    """
+    One page of actions in Action Center order, filtered in SQL.
+    Pass the returned "next" back as after= for the following page (None at the end).
+    """
+    where, params = _action_filters(min_severity, status, owner, line, due_from, due_to)
+    if after:
+        where.append(f"({_ACTION_SORT}) > (?, ?, ?, ?, ?)")
+        params.extend(after)
+    sql = "SELECT * FROM actions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {_ACTION_SORT} LIMIT ?"
+    params.append(int(limit) + 1)
+    with connect() as conn:
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {"rows": rows, "next": _action_cursor(rows[-1]) if more and rows else None}
+
+
+def count_actions(
+    *,
+    min_severity: str = "Low",
+    status: Optional[str] = None,
+    owner: Optional[str] = None,
+    line: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+) -> int:
+    where, params = _action_filters(min_severity, status, owner, line, due_from, due_to)
+    sql = "SELECT COUNT(*) FROM actions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with connect() as conn:
+        return int(conn.execute(sql, params).fetchone()[0])
+
+
+def get_action(action_id: str) -> Optional[Dict[str, Any]]:
+    with connect() as conn:
+        row = conn.execute("SELECT * FROM actions WHERE action_id=?", (action_id,)).fetchone()
+        return dict(row) if row else None
+
+
+@_publishes(ACTIONS, lambda result, args: [args[0]])
+@retry_on_lock
 def set_action_status(action_id: str, status: str, closed_by: str = "") -> None:
     with connect() as conn:
         closed_at = ""
@@ -1072,10 +2008,12 @@ def set_action_status(action_id: str, status: str, closed_by: str = "") -> None:
         )
 
 
+@_publishes(NCRS, lambda result, args: [result["ncr_id"]])
+@retry_on_lock
 def upsert_ncr(ncr: Dict[str, Any]) -> Dict[str, Any]:
     ncr_id = ncr.get("ncr_id")
     if not ncr_id:
-        ncr_id = f"NCR-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        ncr_id = new_id("NCR")
         ncr["ncr_id"] = ncr_id
     ncr.setdefault("status", "Open")
     ncr.setdefault("created_at", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
@@ -1122,6 +2060,8 @@ def list_ncrs() -> List[Dict[str, Any]]:
         return [dict(r) for r in rows]
 
 
+@_publishes(NCRS, lambda result, args: [args[0]])
+@retry_on_lock
 def set_ncr_status(ncr_id: str, status: str) -> None:
     close_date = ""
     if status == "Closed":
@@ -1135,3 +2075,310 @@ def set_ncr_status(ncr_id: str, status: str) -> None:
             """,
             (status, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), close_date, ncr_id),
         )
+
+
+# -----------------------------
+# Alerts (app/alerts.py)
+# -----------------------------
+def alert_queue_since(after_seq: int = 0, limit: int = 2000) -> Dict[str, Any]:
+    """Entry IDs queued after after_seq, oldest first, and the last seq read."""
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT seq, entry_id FROM alert_queue WHERE seq > ? ORDER BY seq LIMIT ?",
+            (int(after_seq), int(limit)),
+        ).fetchall()
+    return {
+        "entry_ids": list(dict.fromkeys(r["entry_id"] for r in rows)),
+        "last_seq": rows[-1]["seq"] if rows else int(after_seq),
+    }
+
+
+def alert_queue_head() -> int:
+    with connect() as conn:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) AS s FROM alert_queue").fetchone()["s"]
+
+
+# A resolved alert that fires again, or an acknowledged one whose severity
+# went up, is open again (ack and snooze cleared).
+_ALERT_REOPEN = (
+    f"(alerts.status = 'Resolved' OR "
+    f"{_severity_rank_sql('excluded.severity')} > {_severity_rank_sql('alerts.severity')})"
+)
+
+
+@retry_on_lock
+def save_alerts(
+    alerts: List[Dict[str, Any]],
+    *,
+    entry_ids: Iterable[str] = (),
+    gages: bool = False,
+    queue_seq: Optional[int] = None,
+    meta: Optional[Dict[str, str]] = None,
+) -> Dict[str, int]:
+    """
+    Upsert evaluated alerts by key, in one transaction.
+
+    entry_ids / gages name what was evaluated: open alerts of those entries
+    (or any open calibration alert) that were not produced again are resolved.
+    queue_seq moves the evaluator's watermark (meta alerts_entry_seq) and drops
+    the queue up to it; meta sets any other evaluator keys alongside.
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    keys = {a["key"] for a in alerts}
+    stale: List[str] = []
+    with connect() as conn:
+        conn.executemany(
+            f"""
+            INSERT INTO alerts(alert_key, type, severity, title, details,
+                               entry_id, gage_id, status, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'Open', ?, ?)
+            ON CONFLICT(alert_key) DO UPDATE SET
+              status = CASE WHEN {_ALERT_REOPEN} THEN 'Open' ELSE alerts.status END,
+              acked_by = CASE WHEN {_ALERT_REOPEN} THEN '' ELSE alerts.acked_by END,
+              acked_at = CASE WHEN {_ALERT_REOPEN} THEN '' ELSE alerts.acked_at END,
+              snoozed_until = CASE WHEN {_ALERT_REOPEN} THEN '' ELSE alerts.snoozed_until END,
+              resolved_at = '',
+              type = excluded.type,
+              severity = excluded.severity,
+              title = excluded.title,
+              details = excluded.details,
+              last_seen = excluded.last_seen
+            """,
+            [
+                (
+                    a["key"], a.get("type", ""), a.get("severity", ""), a.get("title", ""),
+                    a.get("details", ""),
+                    str((a.get("related") or {}).get("entry_id", "")),
+                    str((a.get("related") or {}).get("gage_id", "")),
+                    now, now,
+                )
+                for a in alerts
+            ],
+        )
+
+        ids = list(dict.fromkeys(str(i) for i in entry_ids))
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT alert_key FROM alerts WHERE status != 'Resolved' AND entry_id IN ({marks})",
+                chunk,
+            ).fetchall()
+            stale.extend(r["alert_key"] for r in rows if r["alert_key"] not in keys)
+        if gages:
+            rows = conn.execute(
+                "SELECT alert_key FROM alerts WHERE status != 'Resolved' AND gage_id != ''"
+            ).fetchall()
+            stale.extend(r["alert_key"] for r in rows if r["alert_key"] not in keys)
+        conn.executemany(
+            "UPDATE alerts SET status='Resolved', resolved_at=? WHERE alert_key=?",
+            [(now, k) for k in stale],
+        )
+
+        values = dict(meta or {})
+        if queue_seq is not None:
+            values["alerts_entry_seq"] = str(int(queue_seq))
+            conn.execute("DELETE FROM alert_queue WHERE seq <= ?", (int(queue_seq),))
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            list(values.items()),
+        )
+    return {"upserted": len(alerts), "resolved": len(stale)}
+
+
+def query_alerts(
+    *,
+    min_severity: str = "",
+    include_acked: bool = False,
+    include_snoozed: bool = False,
+    include_resolved: bool = False,
+    now: str = "",
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """Persisted alerts, most severe and most recent first."""
+    where: List[str] = []
+    params: List[Any] = []
+    if not include_resolved:
+        where.append("status != 'Resolved'")
+    if not include_acked:
+        where.append("status != 'Acknowledged'")
+    if not include_snoozed:
+        where.append("(snoozed_until = '' OR snoozed_until <= ?)")
+        params.append(now or datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    if min_severity:
+        where.append(f"{_SEVERITY_RANK_SQL} >= ?")
+        params.append(SEVERITY_RANK.get(min_severity, 0))
+    sql = "SELECT * FROM alerts"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY -({_SEVERITY_RANK_SQL}), last_seen DESC, alert_key LIMIT ?"
+    params.append(int(limit))
+    with connect() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    out = []
+    for r in rows:
+        row = dict(r)
+        row["related"] = {k: row[k] for k in ("entry_id", "gage_id") if row[k]}
+        out.append(row)
+    return out
+
+
+@retry_on_lock
+def ack_alert(alert_key: str, acked_by: str = "") -> bool:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with connect() as conn:
+        cur = conn.execute(
+            "UPDATE alerts SET status='Acknowledged', acked_by=?, acked_at=? "
+            "WHERE alert_key=? AND status != 'Resolved'",
+            (acked_by or "", now, alert_key),
+        )
+        return cur.rowcount > 0
+
+
+@retry_on_lock
+def snooze_alert(alert_key: str, until: str) -> bool:
+    """Hide an alert until the given "YYYY-MM-DD HH:MM:SS" ('' clears the snooze)."""
+    with connect() as conn:
+        cur = conn.execute(
+            "UPDATE alerts SET snoozed_until=? WHERE alert_key=? AND status != 'Resolved'",
+            (until or "", alert_key),
+        )
+        return cur.rowcount > 0
+
+
+# -----------------------------
+# Data-quality issues (app/data_quality.py)
+# -----------------------------
+def data_issue_queue_since(after_seq: int = 0, limit: int = 2000) -> Dict[str, Any]:
+    """Entry IDs queued after after_seq, oldest first, and the last seq read."""
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT seq, entry_id FROM data_issue_queue WHERE seq > ? ORDER BY seq LIMIT ?",
+            (int(after_seq), int(limit)),
+        ).fetchall()
+    return {
+        "entry_ids": list(dict.fromkeys(r["entry_id"] for r in rows)),
+        "last_seq": rows[-1]["seq"] if rows else int(after_seq),
+    }
+
+
+def data_issue_queue_head() -> int:
+    with connect() as conn:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) AS s FROM data_issue_queue").fetchone()["s"]
+
+
+@retry_on_lock
+def save_data_issues(
+    issues: List[Dict[str, Any]],
+    *,
+    entry_ids: Iterable[str] = (),
+    prune: bool = False,
+    queue_seq: Optional[int] = None,
+    meta: Optional[Dict[str, str]] = None,
+) -> Dict[str, int]:
+    """
+    Replace the issues of the evaluated entry_ids with issues, in one
+    transaction. prune drops the issues of entries no longer in tool_entries.
+    queue_seq moves the evaluator's watermark (meta data_issues_seq) and drops
+    the queue up to it; meta sets other keys alongside.
+    """
+    ids = list(dict.fromkeys(str(i) for i in entry_ids))
+    removed = 0
+    with connect() as conn:
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ", ".join("?" * len(chunk))
+            removed += conn.execute(f"DELETE FROM data_issues WHERE entry_id IN ({marks})", chunk).rowcount
+        if prune:
+            removed += conn.execute(
+                "DELETE FROM data_issues WHERE entry_id NOT IN (SELECT id FROM tool_entries)"
+            ).rowcount
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO data_issues(
+                entry_id, rule, entry_date, severity, category, issue, suggestion, active_from
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    str(it["entry_id"]), it["rule"], it.get("entry_date", ""), it.get("severity", ""),
+                    it.get("category", ""), it.get("issue", ""), it.get("suggestion", ""),
+                    it.get("active_from", ""),
+                )
+                for it in issues
+            ],
+        )
+        values = dict(meta or {})
+        if queue_seq is not None:
+            values["data_issues_seq"] = str(int(queue_seq))
+            conn.execute("DELETE FROM data_issue_queue WHERE seq <= ?", (int(queue_seq),))
+        conn.executemany(
+            "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            list(values.items()),
+        )
+    return {"saved": len(issues), "removed": removed}
+
+
+def query_data_issues(
+    start: str,
+    end: str,
+    *,
+    min_severity: str = "",
+    category: str = "",
+    today: str = "",
+    limit: int = 5000,
+) -> List[Dict[str, Any]]:
+    """
+    Stored issues of entries dated start..end (YYYY-MM-DD, inclusive), most
+    severe first. Issues with an active_from after today (an action not yet
+    overdue) are left out.
+    """
+    where = ["entry_date >= ?", "entry_date <= ?", "(active_from = '' OR active_from <= ?)"]
+    params: List[Any] = [start, end, today or datetime.now().strftime("%Y-%m-%d")]
+    if min_severity:
+        where.append(f"{_SEVERITY_RANK_SQL} >= ?")
+        params.append(SEVERITY_RANK.get(min_severity, 0))
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    params.append(int(limit))
+    with connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT entry_id, rule, entry_date, severity, category, issue, suggestion, active_from
+            FROM data_issues
+            WHERE {" AND ".join(where)}
+            ORDER BY -({_SEVERITY_RANK_SQL}), entry_date DESC, entry_id, rule
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def list_entry_gages(start: str, end: str) -> List[Dict[str, Any]]:
+    """Entries dated start..end that name a gage (partial index idx_tool_entries_gage)."""
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT id, date, gage_used FROM tool_entries "
+            "WHERE gage_used != '' AND date >= ? AND date <= ? ORDER BY date DESC, id",
+            (start, end),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+# Thin client: route the served functions to the data service instead of the file.
+if SERVICE_URL:
+    from .service_client import install_remote
+
+    install_remote(globals(), SERVICE_URL)
+
+
+# Hot-path timing (no-op unless TOOLLIFE_PERF=1). Context managers, generators
+# and the retry helpers are left alone: timing them would only time their setup.
+from .perf import instrument_module
+
+instrument_module(globals(), exclude=(
+    "bind_connection", "connect", "iter_query", "retry_on_lock", "is_lock_error", "lock_stats",
+))
@@ -0,0 +1,252 @@
+# app/db_import.py
+"""
+Import another station's toollife.db while the app keeps running.
+
+merge_database(): ATTACH the incoming file and merge tool_entries, actions,
+ncrs and audit_logs with set-based INSERT ... SELECT ... ON CONFLICT statements
+in one transaction (no row-by-row Python).
+
+restore_database(): replace the live contents with the incoming file through
+the SQLite backup API (safe with other connections open), after a safety backup.
+This station keeps its sync identity (station id and watermarks, see
+sync.sync_state), so restoring another station's file does not make the two
+stations look like one to the folder sync.
+
+Both validate the incoming file first: PRAGMA integrity_check must be 'ok' and
+its schema_version must not be newer than ours.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+from typing import Any, Dict, List
+
+from .config import DB_PATH
+from .db import (
+    CENTS_COLUMNS,
+    DIMENSION_ID_COLUMNS,
+    FLAG_COLUMNS,
+    TYPED_ENTRY_COLUMNS,
+    _dimension_ids_sql,
+    connect,
+    get_meta,
+    init_db,
+    typed_entry_values,
+)
+from .sync import restore_sync_state, sync_state, unlogged
+
+# table -> primary key column. Rows are matched on it.
+MERGE_TABLES = {
+    "tool_entries": "id",
+    "actions": "action_id",
+    "ncrs": "ncr_id",
+}
+
+# Columns that are never overwritten on a key match.
+_KEEP_LOCAL = {"id", "action_id", "ncr_id", "created_at", "created_by"}
+
+# Columns not copied at all: they are derived from the merged text columns
+# (typed values) or hold the other station's local ids, and are set again
+# here after the merge, as the station sync does.
+_NOT_MERGED = {"tool_entries": set(TYPED_ENTRY_COLUMNS) | set(DIMENSION_ID_COLUMNS)}
+_TYPED_SOURCE_COLUMNS = ("date", "time") + FLAG_COLUMNS + tuple(CENTS_COLUMNS)
+
+
+class ImportValidationError(Exception):
+    pass
+
+
+def _schema_version(value: Any) -> int:
+    try:
+        return int(str(value or "0").strip())
+    except ValueError:
+        return 0
+
+
+def inspect_incoming(path: str) -> Dict[str, Any]:
+    """Open path read-only and report schema_version, integrity and row counts."""
+    if not os.path.exists(path):
+        raise ImportValidationError(f"File not found: {path}")
+    if os.path.abspath(path) == os.path.abspath(DB_PATH):
+        raise ImportValidationError("That is the live database.")
+
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    except sqlite3.Error as exc:
+        raise ImportValidationError(f"Not a SQLite database: {exc}")
+    try:
+        try:
+            integrity = str(conn.execute("PRAGMA integrity_check").fetchone()[0])
+        except sqlite3.DatabaseError as exc:
+            raise ImportValidationError(f"Not a readable SQLite database: {exc}")
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        version = None
+        if "meta" in tables:
+            row = conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+            version = row[0] if row else None
+        counts = {
+            t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in (*MERGE_TABLES, "audit_logs") if t in tables
+        }
+    finally:
+        conn.close()
+
+    return {
+        "path": path,
+        "integrity": integrity,
+        "schema_version": version,
+        "tables": sorted(tables),
+        "counts": counts,
+    }
+
+
+def validate_incoming(path: str) -> Dict[str, Any]:
+    info = inspect_incoming(path)
+    if info["integrity"] != "ok":
+        raise ImportValidationError(f"Incoming database failed integrity check: {info['integrity']}")
+    if "tool_entries" not in info["tables"]:
+        raise ImportValidationError("Incoming file is not a Tool Life database (no tool_entries table).")
+    local = _schema_version(get_meta("schema_version"))
+    incoming = _schema_version(info["schema_version"])
+    if incoming > local:
+        raise ImportValidationError(
+            f"Incoming database is schema version {incoming}; this app is at {local}. Update this station first."
+        )
+    return info
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [r["name"] for r in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def _merge_table(conn: sqlite3.Connection, table: str, pk: str) -> int:
+    local_cols = _columns(conn, "main", table)
+    incoming_cols = set(_columns(conn, "incoming", table))
+    skip = _NOT_MERGED.get(table, set())
+    cols = [c for c in local_cols if c in incoming_cols and c not in skip]
+    if pk not in cols:
+        return 0
+
+    col_list = ", ".join(cols)
+    if "updated_at" in cols:
+        # Newer edit wins for the whole row.
+        sets = ", ".join(f"{c}=excluded.{c}" for c in cols if c not in _KEEP_LOCAL)
+        conflict = f"DO UPDATE SET {sets} WHERE excluded.updated_at > {table}.updated_at"
+    else:
+        # No edit timestamp: only fill fields that are still blank here
+        # (e.g. a sign-off done on the other station).
+        fill = [c for c in cols if c not in _KEEP_LOCAL]
+        blank = "({t}.{c} IS NULL OR {t}.{c} = '')"
+        sets = ", ".join(
+            f"{c}=CASE WHEN {blank.format(t=table, c=c)} THEN excluded.{c} ELSE {table}.{c} END"
+            for c in fill
+        )
+        # Skip rows with nothing to fill so a repeated import writes nothing.
+        needed = " OR ".join(f"({blank.format(t=table, c=c)} AND excluded.{c} != '')" for c in fill)
+        conflict = f"DO UPDATE SET {sets} WHERE {needed}"
+
+    # "WHERE true" keeps the parser from reading ON CONFLICT as a join constraint.
+    # rowcount counts the rows inserted or updated, not the writes of triggers.
+    cur = conn.execute(
+        f"INSERT INTO main.{table} ({col_list}) "
+        f"SELECT {col_list} FROM incoming.{table} WHERE true "
+        f"ON CONFLICT({pk}) {conflict}"
+    )
+    return cur.rowcount
+
+
+def _derive_typed_columns(conn: sqlite3.Connection) -> None:
+    """Set TYPED_ENTRY_COLUMNS of the merged tool_entries rows from their text columns."""
+    cols = ", ".join(("id",) + _TYPED_SOURCE_COLUMNS + TYPED_ENTRY_COLUMNS)
+    rows = conn.execute(
+        f"SELECT {cols} FROM main.tool_entries WHERE id IN (SELECT id FROM incoming.tool_entries)"
+    ).fetchall()
+    updates = []
+    for r in rows:
+        typed = typed_entry_values(dict(r))
+        if any(typed[c] != r[c] for c in TYPED_ENTRY_COLUMNS):
+            updates.append([typed[c] for c in TYPED_ENTRY_COLUMNS] + [r["id"]])
+    sets = ", ".join(f"{c}=?" for c in TYPED_ENTRY_COLUMNS)
+    conn.executemany(f"UPDATE main.tool_entries SET {sets} WHERE id=?", updates)
+
+
+def _resolve_dimension_ids(conn: sqlite3.Connection) -> None:
+    """Set DIMENSION_ID_COLUMNS of the merged tool_entries rows from this station's master data."""
+    exprs = _dimension_ids_sql("tool_entries")
+    sets = ", ".join(f"{c} = {sql}" for c, sql in exprs.items())
+    stale = " OR ".join(f"{c} IS NOT {sql}" for c, sql in exprs.items())
+    conn.execute(
+        f"UPDATE main.tool_entries SET {sets} "
+        f"WHERE id IN (SELECT id FROM incoming.tool_entries) AND ({stale})"
+    )
+
+
+def _merge_audit(conn: sqlite3.Connection) -> int:
+    # Audit ids are per-station autoincrements; match on the natural key instead.
+    cur = conn.execute(
+        """
+        INSERT INTO main.audit_logs (created_at, username, action)
+        SELECT i.created_at, i.username, i.action
+        FROM incoming.audit_logs i
+        WHERE NOT EXISTS (
+            SELECT 1 FROM main.audit_logs a
+            WHERE a.created_at = i.created_at AND a.username = i.username AND a.action = i.action
+        )
+        """
+    )
+    return cur.rowcount
+
+
+def merge_database(path: str) -> Dict[str, int]:
+    """
+    Merge the incoming database into the live one in a single transaction.
+    Returns {table: rows inserted or updated}.
+    """
+    info = validate_incoming(path)
+    result: Dict[str, int] = {}
+    with connect() as conn:
+        conn.execute("ATTACH DATABASE ? AS incoming", (path,))
+        try:
+            # Imported rows are not new local edits for the station sync.
+            with unlogged(conn):
+                for table, pk in MERGE_TABLES.items():
+                    if table in info["tables"]:
+                        result[table] = _merge_table(conn, table, pk)
+                if "tool_entries" in result:
+                    _derive_typed_columns(conn)
+                    _resolve_dimension_ids(conn)
+                if "audit_logs" in info["tables"]:
+                    result["audit_logs"] = _merge_audit(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE incoming")
+    return result
+
+
+def restore_database(path: str) -> Dict[str, Any]:
+    """
+    Replace the live database with the incoming one, without restarting.
+    A safety backup of the current data is taken first; its path is returned.
+    """
+    from .backup import backup_database
+
+    validate_incoming(path)
+    safety = backup_database()
+    with connect() as conn:
+        state = sync_state(conn)
+
+    src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    dst = sqlite3.connect(DB_PATH)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    # Bring an older incoming schema up to date (new tables/columns).
+    init_db()
+    with connect() as conn:
+        restore_sync_state(conn, state)
+    return {"safety_backup": safety.get("path", ""), "station_id": state["station_id"]}
@@ -0,0 +1,285 @@
+# app/events.py
+"""
+In-process publish/subscribe bus for live screen updates.
+
+Topics: TOOL_ENTRIES, ACTIONS, NCRS and MASTER_DATA.
+
+The db write functions publish once they have written, with the IDs they
+wrote when they have them (see db._publishes). Writes from other processes
+(another station, the data service, an import script) are found by the
+poller: it keeps one read connection open and checks PRAGMA data_version,
+which only moves when some other connection commits. When it moves, the
+per-topic counters in meta (bumped by triggers, db.EVENT_VERSION_KEYS) say
+which topics changed; those events carry ids=None, meaning "reload".
+
+publish() is safe from any thread. Events wait for the event pump, which
+runs on the Tk main thread (start_events schedules it with after()). Events for one topic
+that arrive between two pumps are merged into one: ids is the union, or
+None when any of them was None. The poller also sees this process's own
+commits; a change whose counter moved by exactly the rows published from
+the main thread since the last poll is taken as explained, so the event
+keeps its IDs. Anything else (worker-thread writes, other stations) becomes
+ids=None. Handlers must be idempotent: the worst case is one extra reload.
+
+Screens subscribe with subscribe_widget(): events for a screen that is not
+showing are held until it is, and the subscription ends with the widget.
+"""
+from __future__ import annotations
+
+import itertools
+import sqlite3
+import threading
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .config import EVENTS_POLL_MS, EVENTS_SERVICE_POLL_MS, SERVICE_URL
+
+TOOL_ENTRIES = "tool_entries"
+ACTIONS = "actions"
+NCRS = "ncrs"
+MASTER_DATA = "master_data"
+TOPICS = (TOOL_ENTRIES, ACTIONS, NCRS, MASTER_DATA)
+
+
+@dataclass(frozen=True)
+class Event:
+    topic: str
+    ids: Optional[FrozenSet[str]] = None  # None: unknown rows changed, reload
+    origin: str = "local"                  # "local" (db write here) or "poll"
+
+
+Handler = Callable[[Event], None]
+
+_lock = threading.Lock()
+_subs: Dict[str, Dict[int, Handler]] = {}
+_pending: Dict[str, Event] = {}
+_held: Dict[int, Tuple[object, Handler, Event]] = {}  # widget subscriptions waiting to show
+_local_rows: Dict[str, int] = {}  # rows published from the main thread since the last poll
+_tokens = itertools.count(1)
+
+
+def subscribe(topic: str, handler: Handler) -> int:
+    """Call handler(event) on the main thread when topic changes. Returns a token."""
+    if topic not in TOPICS:
+        raise ValueError(f"Unknown topic: {topic}")
+    token = next(_tokens)
+    with _lock:
+        _subs.setdefault(topic, {})[token] = handler
+    return token
+
+
+def unsubscribe(token: int) -> None:
+    with _lock:
+        for handlers in _subs.values():
+            handlers.pop(token, None)
+        _held.pop(token, None)
+
+
+def subscribe_widget(widget, topic: str, handler: Handler) -> int:
+    """
+    subscribe() for a Tk screen. While the widget is not viewable (another tab,
+    another screen on top) its events are held and merged, and delivered once
+    it shows again. Dropped when the widget is destroyed.
+    """
+    token = None
+
+    def deliver(ev: Event) -> None:
+        try:
+            viewable = widget.winfo_viewable()
+        except Exception:
+            return  # being destroyed
+        if viewable:
+            handler(ev)
+        else:
+            with _lock:
+                held = _held.get(token)
+                _held[token] = (widget, handler, _merge(held[2] if held else None, ev))
+
+    def on_destroy(event):
+        if str(event.widget) == str(widget):
+            unsubscribe(token)
+
+    token = subscribe(topic, deliver)
+    widget.bind("<Destroy>", on_destroy, add="+")
+    return token
+
+
+def _merge(prev: Optional[Event], ev: Event) -> Event:
+    if prev is None:
+        return ev
+    if prev.ids is None or ev.ids is None:
+        ids = None
+    else:
+        ids = prev.ids | ev.ids
+    return Event(ev.topic, ids, ev.origin if prev.origin == ev.origin else "poll")
+
+
+def publish(topic: str, ids: Optional[Iterable[str]] = None, origin: str = "local") -> None:
+    """Queue a change for the next pump tick; a no-op when nobody listens to topic."""
+    with _lock:
+        if not _subs.get(topic):
+            return
+        ev = Event(topic, frozenset(str(i) for i in ids) if ids is not None else None, origin)
+        _pending[topic] = _merge(_pending.get(topic), ev)
+        if ev.ids is not None and origin == "local" and threading.current_thread() is threading.main_thread():
+            _local_rows[topic] = _local_rows.get(topic, 0) + len(ev.ids)
+
+
+def _take_local_rows() -> Dict[str, int]:
+    with _lock:
+        rows = dict(_local_rows)
+        _local_rows.clear()
+    return rows
+
+
+def _call(handler: Handler, ev: Event) -> None:
+    try:
+        handler(ev)
+    except Exception:
+        # One broken screen must not stop the others from updating.
+        traceback.print_exc()
+
+
+def dispatch() -> int:
+    """Deliver queued events, and held ones whose screen is showing again (main thread)."""
+    with _lock:
+        events = list(_pending.values())
+        _pending.clear()
+        calls = [(handler, ev) for ev in events for handler in list(_subs.get(ev.topic, {}).values())]
+        held = list(_held.items())
+    for handler, ev in calls:
+        _call(handler, ev)
+    for token, (widget, handler, ev) in held:
+        try:
+            viewable = widget.winfo_viewable()
+        except Exception:
+            viewable = False
+        if not viewable:
+            continue
+        with _lock:
+            if _held.get(token, (None, None, None))[2] is not ev:
+                continue  # merged with a newer event meanwhile; next pump
+            del _held[token]
+        calls.append((handler, ev))
+        _call(handler, ev)
+    return len(calls)
+
+
+def _as_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class VersionPoller:
+    """Finds topics changed by commits on other connections."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._versions: Optional[Dict[str, str]] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            from . import db
+
+            self._conn = sqlite3.connect(self.path or db.DB_PATH, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+
+    def _read_versions(self) -> Dict[str, str]:
+        from . import db
+
+        if SERVICE_URL:
+            return db.event_versions()
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version and self._versions is not None:
+            return self._versions
+        self._data_version = data_version
+        with db.bind_connection(conn):
+            return db.event_versions()
+
+    def poll(self) -> Dict[str, int]:
+        """Topics whose counter moved since the last poll, with how far."""
+        versions = self._read_versions()
+        previous, self._versions = self._versions, versions
+        if previous is None or versions is previous:
+            return {}
+        return {
+            t: _as_int(versions.get(t)) - _as_int(previous.get(t))
+            for t in TOPICS
+            if versions.get(t) != previous.get(t)
+        }
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class EventPump:
+    """Runs the poller and delivers events from the Tk event loop."""
+
+    def __init__(self, root):
+        self.root = root
+        self.poller = VersionPoller()
+        self.poll_every = max(1, EVENTS_SERVICE_POLL_MS // EVENTS_POLL_MS) if SERVICE_URL else 1
+        self._ticks = 0
+        self._after_id = None
+        self.polls = 0
+        self.changes = 0
+
+    def start(self) -> None:
+        try:
+            self.poller.poll()  # baseline versions
+        except Exception:
+            pass
+        self._after_id = self.root.after(EVENTS_POLL_MS, self._tick)
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self.poller.close()
+
+    def _tick(self) -> None:
+        self._ticks += 1
+        if self._ticks % self.poll_every == 0:
+            try:
+                changed = self.poller.poll()
+            except Exception:
+                changed = {}  # database busy or service away: try again next tick
+            self.polls += 1
+            explained = _take_local_rows()
+            for topic, moved in changed.items():
+                if moved != explained.get(topic, 0):
+                    self.changes += 1
+                    publish(topic, None, origin="poll")
+        dispatch()
+        self._after_id = self.root.after(EVENTS_POLL_MS, self._tick)
+
+
+_pump: Optional[EventPump] = None
+
+
+def start_events(root) -> EventPump:
+    """Start the process-wide pump on this Tk root (call from the main thread)."""
+    global _pump
+    if _pump is None:
+        _pump = EventPump(root)
+        _pump.start()
+    return _pump
+
+
+def stop_events() -> None:
+    global _pump
+    if _pump is not None:
+        _pump.stop()
+        _pump = None
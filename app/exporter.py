@@ -0,0 +1,271 @@
+# app/exporter.py
+from __future__ import annotations
+
+import csv
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from .config import SERVICE_URL
+from .db import connect, fetch_tool_entries_range, iter_query
+from .storage import ENTRY_COLUMNS
+
+# Rows pulled from SQLite per fetchmany() and rows written between progress updates.
+CHUNK_ROWS = 2000
+
+ProgressFn = Callable[[int, Optional[int]], None]
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+@dataclass
+class ExportSheet:
+    """
+    One sheet (xlsx) or one file (csv) of an export.
+    rows is consumed lazily, so it can be a generator over a SQLite cursor.
+    total is optional and only used for progress reporting.
+    """
+    name: str
+    columns: Sequence[str]
+    rows: Iterable[Sequence[Any]]
+    total: Optional[int] = None
+
+
+# -----------------------------
+# Row sources
+# -----------------------------
+def dataframe_sheet(name: str, df, drop: Sequence[str] = ()) -> ExportSheet:
+    """Small, already-aggregated DataFrames (summary tables)."""
+    df = df.drop(columns=list(drop), errors="ignore")
+    return ExportSheet(
+        name=name,
+        columns=[str(c) for c in df.columns],
+        rows=df.itertuples(index=False, name=None),
+        total=len(df),
+    )
+
+
+def tool_entries_sheet(start: date, end: date, name: str = "Entries") -> ExportSheet:
+    """
+    Stream tool_entries from start to end (by Date and Time, both inclusive)
+    straight from SQLite. A plain date means the whole day.
+    DB column names are the lower-cased ENTRY_COLUMNS.
+    """
+    if not isinstance(start, datetime):
+        start = datetime(start.year, start.month, start.day)
+    if not isinstance(end, datetime):
+        end = datetime(end.year, end.month, end.day, 23, 59, 59)
+    cols = ", ".join(c.lower() for c in ENTRY_COLUMNS)
+    params = (
+        start.strftime("%Y-%m-%d"), start.strftime("%H:%M:%S"),
+        end.strftime("%Y-%m-%d"), end.strftime("%H:%M:%S"),
+    )
+    # The outer date range keeps idx_tool_entries_date usable; the rest trims the partial end days.
+    where = (
+        "WHERE date >= ?1 AND date <= ?3 "
+        "AND (date > ?1 OR time >= ?2) AND (date < ?3 OR time <= ?4)"
+    )
+    if SERVICE_URL:
+        return _remote_entries_sheet(start, end, name)
+    with connect() as conn:
+        total = conn.execute(f"SELECT COUNT(*) AS n FROM tool_entries {where}", params).fetchone()["n"]
+    return ExportSheet(
+        name=name,
+        columns=list(ENTRY_COLUMNS),
+        rows=iter_query(
+            f"SELECT {cols} FROM tool_entries {where} ORDER BY date, time, id",
+            params,
+            chunk_rows=CHUNK_ROWS,
+        ),
+        total=total,
+    )
+
+
+def _remote_entries_sheet(start: datetime, end: datetime, name: str) -> ExportSheet:
+    # Thin terminal: the service returns whole days; trim to the times here, same order as above.
+    lo, hi = start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
+    cols = [c.lower() for c in ENTRY_COLUMNS]
+    rows = fetch_tool_entries_range(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), columns=cols)
+    rows = sorted(
+        (r for r in rows if lo <= f"{r['date']} {r['time']}" <= hi),
+        key=lambda r: (r["date"], r["time"], r["id"]),
+    )
+    return ExportSheet(
+        name=name,
+        columns=list(ENTRY_COLUMNS),
+        rows=([r.get(c) for c in cols] for r in rows),
+        total=len(rows),
+    )
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+def _check(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled()
+
+
+def _clean(v: Any) -> Any:
+    # openpyxl rejects numpy scalars / NaN in some versions; keep plain python values.
+    if v is None:
+        return ""
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and v != v:
+        return ""
+    return v
+
+
+def _sheet_total(sheets: Sequence[ExportSheet]) -> Optional[int]:
+    if any(s.total is None for s in sheets):
+        return None
+    return sum(s.total for s in sheets)
+
+
+def write_xlsx(
+    path: str,
+    sheets: Sequence[ExportSheet],
+    progress: Optional[ProgressFn] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    """openpyxl write-only mode: rows are flushed as they are appended, memory stays flat."""
+    from openpyxl import Workbook
+
+    total = _sheet_total(sheets)
+    done = 0
+    wb = Workbook(write_only=True)
+    for sheet in sheets:
+        ws = wb.create_sheet(title=sheet.name[:31])
+        ws.append(list(sheet.columns))
+        for row in sheet.rows:
+            ws.append([_clean(v) for v in row])
+            done += 1
+            if done % CHUNK_ROWS == 0:
+                _check(cancel)
+                if progress:
+                    progress(done, total)
+    _check(cancel)
+    wb.save(path)
+    if progress:
+        progress(done, total)
+    return done
+
+
+def write_csv(
+    path: str,
+    sheets: Sequence[ExportSheet],
+    progress: Optional[ProgressFn] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    """
+    One CSV per sheet. The first sheet goes to path; any extra sheets go to
+    <path stem>_<sheet name>.csv next to it.
+    """
+    total = _sheet_total(sheets)
+    done = 0
+    for idx, sheet in enumerate(sheets):
+        target = path if idx == 0 else _extra_csv_path(path, sheet.name)
+        with open(target, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(list(sheet.columns))
+            for row in sheet.rows:
+                w.writerow([_clean(v) for v in row])
+                done += 1
+                if done % CHUNK_ROWS == 0:
+                    _check(cancel)
+                    if progress:
+                        progress(done, total)
+    if progress:
+        progress(done, total)
+    return done
+
+
+def export(
+    path: str,
+    sheets: Sequence[ExportSheet],
+    progress: Optional[ProgressFn] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    """
+    Write sheets to path (.csv or .xlsx, chosen by extension).
+    Writes to a temp file first so a cancelled/failed export never leaves a half file behind.
+    Returns rows written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    is_csv = path.lower().endswith(".csv")
+    base, ext = os.path.splitext(path)
+    tmp = f"{base}.part{ext}"
+    try:
+        if is_csv:
+            n = write_csv(tmp, sheets, progress, cancel)
+            for sheet in sheets[1:]:
+                os.replace(_extra_csv_path(tmp, sheet.name), _extra_csv_path(path, sheet.name))
+        else:
+            n = write_xlsx(tmp, sheets, progress, cancel)
+        os.replace(tmp, path)
+        return n
+    except BaseException:
+        _remove_quietly(tmp)
+        if is_csv:
+            for sheet in sheets[1:]:
+                _remove_quietly(_extra_csv_path(tmp, sheet.name))
+        raise
+
+
+def _extra_csv_path(path: str, sheet_name: str) -> str:
+    base, ext = os.path.splitext(path)
+    return f"{base}_{sheet_name}{ext or '.csv'}"
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# -----------------------------
+# Background job (keeps exports off the Tk thread)
+# -----------------------------
+class ExportJob(threading.Thread):
+    """
+    Runs export() on a worker thread. The UI polls done/total/finished
+    (Tk widgets must only be touched from the main thread).
+    """
+
+    def __init__(self, path: str, sheets_factory: Callable[[], List[ExportSheet]]):
+        super().__init__(daemon=True)
+        self.path = path
+        self._sheets_factory = sheets_factory
+        self._cancel = threading.Event()
+        self.done = 0
+        self.total: Optional[int] = None
+        self.rows_written = 0
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _progress(self, done: int, total: Optional[int]) -> None:
+        self.done = done
+        self.total = total
+
+    def run(self) -> None:
+        try:
+            # Sheets are built here so their SQLite cursors live on this thread.
+            sheets = self._sheets_factory()
+            self.total = _sheet_total(sheets)
+            self.rows_written = export(self.path, sheets, self._progress, self._cancel)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.finished = True
@@ -0,0 +1,67 @@
+# app/ids.py
+"""
+Unique, time-ordered IDs for tool entries, actions, NCRs and other records.
+
+    20261018-231633-123-0007-3f9a1c07
+    date     time   ms  seq  station+process     (UTC)
+
+IDs from one process are strictly increasing. The sequence number separates
+IDs minted in the same millisecond; if the clock steps back, the last
+timestamp is reused and the sequence keeps counting. The last block is four
+hex digits derived from the station name (STATION_NAME, the host name by
+default) and four random per-process digits, so two stations (or the app and
+the data service on one PC) minting in the same millisecond still differ.
+
+Plain string order is creation order, so new rows append at the end of the
+id index and tables can be paged with "WHERE id > ? ORDER BY id". The time is
+UTC so daylight-saving changes cannot send it backwards; the older
+YYYYMMDD-HHMMSS-XXXX IDs were local time, so they interleave with new ones
+only around the day of the switch.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from .config import STATION_NAME
+
+_MAX_SEQ = 9999
+
+_station = (
+    hashlib.sha1(STATION_NAME.encode("utf-8")).hexdigest()[:4]
+    + os.urandom(2).hex()
+)
+_lock = threading.Lock()
+_last_ms = 0
+_seq = 0
+
+
+def _next_stamp() -> tuple:
+    global _last_ms, _seq
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _last_ms:
+            ms = _last_ms
+            _seq += 1
+            if _seq > _MAX_SEQ:
+                ms += 1
+                _seq = 0
+        else:
+            _seq = 0
+        _last_ms = ms
+        return ms, _seq
+
+
+def new_id(prefix: str = "") -> str:
+    """A new ID, optionally prefixed ("A", "NCR", ...) as PREFIX-<id>."""
+    ms, seq = _next_stamp()
+    stamp = datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).strftime("%Y%m%d-%H%M%S")
+    body = f"{stamp}-{ms % 1000:03d}-{seq:04d}-{_station}"
+    return f"{prefix}-{body}" if prefix else body
+
+
+def station_token() -> str:
+    return _station
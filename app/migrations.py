@@ -0,0 +1,299 @@
+# app/migrations.py
+"""
+Numbered schema migrations, driven by meta.schema_version.
+
+init_db() creates the baseline schema (version 1) and then calls migrate(),
+which applies every MIGRATIONS entry above the stored version, in order, under
+one write lock: the first station to start migrates, the others wait and find
+nothing left to do. Each migration runs in a savepoint and records its version
+with it, so one that fails is rolled back on its own (and retried on the next
+start) while the ones before it stay. A database already past the newest
+version here (migrated by a newer station) is left as it is.
+
+Migrations 2-4 add typed columns to tool_entries next to the text ones they
+are derived from (db.TYPED_ENTRY_COLUMNS): the entry timestamp as integer
+seconds (indexed), the Yes/No/Pending flags as small integers and cost/COPQ as
+integer cents. Migration 5 adds indexed integer keys into lines, parts and
+tools (db.DIMENSION_ID_COLUMNS), set on write from the catalog
+snapshot; names master data does not know stay NULL.
+Migration 6 stores each tool's cost per change on tools (kept by
+db._refresh_change_cost) with its history in tool_cost_history.
+Migration 7 adds the data_issues table kept by app/data_quality.py.
+
+Adding a column is instant; existing tool_entries rows are filled by the
+backfill, which walks the table in rowid order BACKFILL_BATCH rows per short
+transaction with a pause in between, so stations keep writing while it runs.
+Its cursor is kept in meta, so an interrupted backfill resumes, and rows bulk
+inserted without the typed columns (app/synthetic.py) are picked up on the
+next start. New writes fill them in db.upsert_tool_entry. Until a row is
+filled its typed columns are NULL and readers use the text (storage helpers).
+
+Run by hand:  python -m app.migrations
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from . import db
+from .config import BACKFILL_BATCH, BACKFILL_PAUSE_S
+from .sync import unlogged
+
+BACKFILL_CURSOR_KEY = "typed_backfill_rowid"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _restart_backfill(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "INSERT INTO meta(key, value) VALUES(?, '0') ON CONFLICT(key) DO UPDATE SET value='0'",
+        (BACKFILL_CURSOR_KEY,),
+    )
+
+
+def _add_entry_timestamp(conn: sqlite3.Connection) -> None:
+    db._ensure_columns(conn, "tool_entries", {"ts": "INTEGER"})
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tool_entries_ts ON tool_entries(ts)")
+    # Rebuilt to fire only for the entered columns: the backfill is not a change.
+    conn.execute("DROP TRIGGER IF EXISTS events_tool_entries_update")
+    db._install_event_triggers(conn)
+    _restart_backfill(conn)
+
+
+def _add_entry_flag_codes(conn: sqlite3.Connection) -> None:
+    db._ensure_columns(conn, "tool_entries", {f"{c}_code": "INTEGER" for c in db.FLAG_COLUMNS})
+    _restart_backfill(conn)
+
+
+def _add_entry_cents(conn: sqlite3.Connection) -> None:
+    db._ensure_columns(conn, "tool_entries", {c: "INTEGER" for c in db.CENTS_COLUMNS.values()})
+    _restart_backfill(conn)
+
+
+def _add_entry_dimension_keys(conn: sqlite3.Connection) -> None:
+    db._ensure_columns(conn, "tool_entries", {
+        "line_id": "INTEGER REFERENCES lines(id)",
+        "part_id": "INTEGER REFERENCES parts(id)",
+        "tool_id": "INTEGER REFERENCES tools(id)",
+    })
+    for col in db.DIMENSION_ID_COLUMNS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tool_entries_{col} ON tool_entries({col})")
+    _restart_backfill(conn)
+
+
+def _add_tool_change_cost(conn: sqlite3.Connection) -> None:
+    db._ensure_columns(conn, "tools", {"cost_per_change": "REAL NOT NULL DEFAULT 0.0"})
+    # Local wall-clock time, like tool_entries.date/time, so an entry can be priced as of its own time.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tool_cost_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tool_id INTEGER NOT NULL REFERENCES tools(id) ON DELETE CASCADE,
+            cost_per_change REAL NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tool_cost_history_tool ON tool_cost_history(tool_id, changed_at)"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS tool_cost_history_insert AFTER INSERT ON tools BEGIN "
+        "INSERT INTO tool_cost_history(tool_id, cost_per_change) VALUES(NEW.id, NEW.cost_per_change); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER IF NOT EXISTS tool_cost_history_update AFTER UPDATE OF cost_per_change ON tools "
+        "WHEN NEW.cost_per_change IS NOT OLD.cost_per_change BEGIN "
+        "INSERT INTO tool_cost_history(tool_id, cost_per_change) VALUES(NEW.id, NEW.cost_per_change); END"
+    )
+    for row in conn.execute("SELECT id FROM tools").fetchall():
+        db._refresh_change_cost(conn, row["id"])
+    conn.execute(
+        "INSERT INTO tool_cost_history(tool_id, cost_per_change) SELECT id, cost_per_change FROM tools "
+        "WHERE id NOT IN (SELECT tool_id FROM tool_cost_history)"
+    )
+
+
+def _add_data_issues(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_issues (
+            entry_id TEXT NOT NULL,
+            rule TEXT NOT NULL,
+            entry_date TEXT NOT NULL DEFAULT '',
+            severity TEXT NOT NULL DEFAULT '',
+            category TEXT NOT NULL DEFAULT '',
+            issue TEXT NOT NULL DEFAULT '',
+            suggestion TEXT NOT NULL DEFAULT '',
+            active_from TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (entry_id, rule)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_data_issues_date ON data_issues(entry_date)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS data_issue_queue ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, entry_id TEXT NOT NULL)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tool_entries_gage ON tool_entries(date) WHERE gage_used != ''"
+    )
+    db._install_data_issue_triggers(conn)
+
+
+MIGRATIONS = (
+    Migration(2, "tool_entries.ts: entry date and time as integer seconds", _add_entry_timestamp),
+    Migration(3, "tool_entries.*_code: Yes/No/Pending flags as small integers", _add_entry_flag_codes),
+    Migration(4, "tool_entries.*_cents: cost and COPQ as integer cents", _add_entry_cents),
+    Migration(5, "tool_entries.*_id: line, part and tool keys", _add_entry_dimension_keys),
+    Migration(6, "tools.cost_per_change and tool_cost_history", _add_tool_change_cost),
+    Migration(7, "data_issues: data-quality issues per entry and rule", _add_data_issues),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key='schema_version'").fetchone()
+    try:
+        return int(row[0]) if row else 1
+    except (TypeError, ValueError):
+        return 1
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """Apply the pending migrations. Returns the versions applied."""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    applied: List[int] = []
+    try:
+        current = schema_version(conn)
+        for m in MIGRATIONS:
+            if m.version <= current:
+                continue
+            conn.execute("SAVEPOINT migration")
+            try:
+                m.apply(conn)
+                conn.execute(
+                    "INSERT INTO meta(key, value) VALUES('schema_version', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                    (str(m.version),),
+                )
+            except Exception:
+                conn.execute("ROLLBACK TO migration")
+                conn.execute("RELEASE migration")
+                raise
+            conn.execute("RELEASE migration")
+            applied.append(m.version)
+    finally:
+        conn.commit()  # keep the migrations that went through
+    return applied
+
+
+# -----------------------------
+# Typed-column backfill
+# -----------------------------
+_SOURCE_COLUMNS = ("date", "time") + db.FLAG_COLUMNS + tuple(db.CENTS_COLUMNS)
+_SET_TYPED = ", ".join(
+    [f"{c}=?" for c in db.TYPED_ENTRY_COLUMNS]
+    + [f"{c}={sql}" for c, sql in db._dimension_ids_sql("tool_entries").items()]
+)
+
+
+def backfill_step(batch: int = BACKFILL_BATCH) -> int:
+    """Fill the typed columns of the next batch of rows past the cursor. Returns rows done."""
+    with db.connect() as conn:
+        if schema_version(conn) < LATEST_VERSION:
+            return 0
+        # Derived values: not a local change for station sync.
+        with unlogged(conn):
+            row = conn.execute("SELECT value FROM meta WHERE key=?", (BACKFILL_CURSOR_KEY,)).fetchone()
+            cursor = int(row[0]) if row else 0
+            rows = conn.execute(
+                f"SELECT rowid, {', '.join(_SOURCE_COLUMNS)} FROM tool_entries "
+                "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (cursor, int(batch)),
+            ).fetchall()
+            if not rows:
+                return 0
+            updates = []
+            for r in rows:
+                typed = db.typed_entry_values(dict(zip(_SOURCE_COLUMNS, tuple(r)[1:])))
+                updates.append([typed[c] for c in db.TYPED_ENTRY_COLUMNS] + [r[0]])
+            conn.executemany(f"UPDATE tool_entries SET {_SET_TYPED} WHERE rowid=?", updates)
+            conn.execute(
+                "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                (BACKFILL_CURSOR_KEY, str(rows[-1][0])),
+            )
+        return len(rows)
+
+
+def backfill(batch: int = BACKFILL_BATCH) -> int:
+    """Run the backfill to the end of the table in this thread. Returns rows done."""
+    total = 0
+    while True:
+        n = backfill_step(batch)
+        total += n
+        if n < batch:
+            return total
+
+
+class Backfill(threading.Thread):
+    """Runs the backfill in the background, pausing between batches."""
+
+    def __init__(self, batch: int = BACKFILL_BATCH, pause_s: float = BACKFILL_PAUSE_S):
+        super().__init__(daemon=True, name="schema-backfill")
+        self.batch = batch
+        self.pause_s = pause_s
+        self._stopping = threading.Event()
+        self.rows = 0
+        self.done = False
+        self.error = ""
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                n = backfill_step(self.batch)
+            except sqlite3.OperationalError as exc:
+                if not db.is_lock_error(exc):
+                    self.error = str(exc)
+                    return
+                self._stopping.wait(self.pause_s * 10)  # busy station: back off, resume at the cursor
+                continue
+            except Exception as exc:
+                self.error = str(exc)
+                return
+            self.rows += n
+            if n < self.batch:
+                self.done = True
+                return
+            self._stopping.wait(self.pause_s)
+
+
+_backfill: Optional[Backfill] = None
+
+
+def start_backfill() -> Backfill:
+    """Start the process-wide backfill once."""
+    global _backfill
+    if _backfill is None or (not _backfill.is_alive() and not _backfill.done):
+        _backfill = Backfill()
+        _backfill.start()
+    return _backfill
+
+
+if __name__ == "__main__":
+    db.init_db()
+    with db.connect() as _conn:
+        print(f"schema_version {schema_version(_conn)} (latest {LATEST_VERSION})")
+    print(f"backfilled {backfill()} rows")
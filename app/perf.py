@@ -0,0 +1,190 @@
+# app/perf.py
+"""
+Hot-path timing.
+
+Turned on with TOOLLIFE_PERF=1 (config.PERF_ENABLED). When on, the public
+functions of app/db.py, storage.get_df/save_df/get_entries_by_ids,
+app/quality_engine.py and every registered screen's refresh() are wrapped once
+at startup, and each call's duration goes into a per-name ring buffer of the
+last PERF_RING_SIZE samples (count and max cover all calls).
+
+When off nothing is wrapped, so the instrumented code runs exactly as before.
+
+stats() feeds the Performance screen; dump() writes a JSON snapshot to LOGS_DIR.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from .config import LOGS_DIR, PERF_ENABLED, PERF_RING_SIZE
+
+
+class _Series:
+    __slots__ = ("samples", "count", "total", "max")
+
+    def __init__(self, size: int):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+_lock = threading.Lock()
+_series: Dict[str, _Series] = {}
+_started_at = datetime.now()
+
+
+def enabled() -> bool:
+    return PERF_ENABLED
+
+
+def record(name: str, seconds: float) -> None:
+    with _lock:
+        s = _series.get(name)
+        if s is None:
+            s = _series[name] = _Series(PERF_RING_SIZE)
+        s.samples.append(seconds)
+        s.count += 1
+        s.total += seconds
+        if seconds > s.max:
+            s.max = seconds
+
+
+@contextmanager
+def _timing(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def timer(name: str):
+    """with perf.timer("block"): ... (a shared no-op when timing is off)."""
+    if not PERF_ENABLED:
+        return nullcontext()
+    return _timing(name)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator. Returns the function itself when timing is off."""
+
+    def deco(fn: Callable) -> Callable:
+        if not PERF_ENABLED or getattr(fn, "__perf_name__", None):
+            return fn
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - t0)
+
+        wrapper.__perf_name__ = label
+        return wrapper
+
+    return deco
+
+
+def instrument_module(
+    namespace: Dict[str, Any],
+    names: Optional[Iterable[str]] = None,
+    exclude: Iterable[str] = (),
+) -> None:
+    """
+    Wrap functions in a module's globals() in place. Without names, every public
+    function defined in that module is wrapped (imports are left alone).
+    Call at the end of the module, before other modules import from it.
+    """
+    if not PERF_ENABLED:
+        return
+    module = namespace.get("__name__")
+    skip = set(exclude)
+    if names is None:
+        names = [
+            k for k, v in namespace.items()
+            if callable(v) and not k.startswith("_") and not isinstance(v, type)
+            and getattr(v, "__module__", None) == module and k not in skip
+        ]
+    for k in names:
+        fn = namespace.get(k)
+        if callable(fn):
+            namespace[k] = timed(f"{module.rsplit('.', 1)[-1]}.{k}")(fn)
+
+
+def instrument_screens() -> None:
+    """Wrap refresh() on every screen in SCREEN_REGISTRY."""
+    if not PERF_ENABLED:
+        return
+    from .screen_registry import SCREEN_REGISTRY, get_screen_class
+
+    for screen in SCREEN_REGISTRY:
+        try:
+            cls = get_screen_class(screen)
+        except Exception:
+            continue
+        method = cls.__dict__.get("refresh")
+        if callable(method):
+            setattr(cls, "refresh", timed(f"screen.{cls.__name__}.refresh")(method))
+
+
+# -----------------------------
+# Read out
+# -----------------------------
+def _pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100.0 * (len(sorted_vals) - 1))))]
+
+
+def stats() -> List[Dict[str, Any]]:
+    """One row per timed name, slowest total first. Times in milliseconds."""
+    with _lock:
+        snap = [(name, list(s.samples), s.count, s.total, s.max) for name, s in _series.items()]
+    rows = []
+    for name, samples, count, total, mx in snap:
+        samples.sort()
+        rows.append({
+            "name": name,
+            "count": count,
+            "p50_ms": round(_pct(samples, 50) * 1000.0, 2),
+            "p95_ms": round(_pct(samples, 95) * 1000.0, 2),
+            "max_ms": round(mx * 1000.0, 2),
+            "mean_ms": round(total / count * 1000.0, 2) if count else 0.0,
+            "total_s": round(total, 3),
+        })
+    rows.sort(key=lambda r: r["total_s"], reverse=True)
+    return rows
+
+
+def reset() -> None:
+    global _started_at
+    with _lock:
+        _series.clear()
+        _started_at = datetime.now()
+
+
+def dump(path: Optional[str] = None) -> str:
+    """Write the current stats to LOGS_DIR/perf_<timestamp>.json (or path). Returns the path."""
+    now = datetime.now()
+    path = path or os.path.join(LOGS_DIR, f"perf_{now.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {
+        "since": _started_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "dumped_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "ring_size": PERF_RING_SIZE,
+        "stats": stats(),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
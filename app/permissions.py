@@ -41,6 +41,7 @@ ROLE_SCREEN_DEFAULTS = {
         "Master Data": "edit",
         "Admin": "edit",
         "Audit Trail": "view",
+        "Performance": "edit",
     },
 }
 
@@ -73,6 +74,24 @@ def screen_access(role: str, username: str, screen: str) -> str:
     return level
 
 
+def effective_screen_matrix(role: str, username: str) -> Dict[str, str]:
+    """
+    Every screen's level for this user: role defaults with the user's overrides
+    on top, from a single permissions query. Screens not listed are "none".
+    """
+    from .screen_registry import SCREEN_REGISTRY
+
+    defaults = ROLE_SCREEN_DEFAULTS.get(role, {})
+    matrix = {screen: defaults.get(screen, "none") for screen in SCREEN_REGISTRY}
+    matrix.update(defaults)
+    matrix.update(get_user_screen_permissions(username))
+    return matrix
+
+
+def level_at_least(level: str, at_least: str = "view") -> bool:
+    return _level_rank(level) >= _level_rank(at_least)
+
+
 def can_view_screen(role: str, username: str, screen: str) -> bool:
     return _level_rank(screen_access(role, username, screen)) >= _level_rank("view")
 
@@ -0,0 +1,203 @@
+# app/profiler.py
+"""
+On-demand cProfile capture for screen actions.
+
+install() wraps the refresh/submit/save/load methods of every screen class
+(SCREEN_REGISTRY) at startup, before any screen is built, so the callbacks
+the buttons bind (command=self.refresh) are the wrappers. A wrapper just
+calls through until its screen is armed: arm("Dashboard", calls=3) makes the
+next N calls each run under cProfile. Every capture is written to
+LOGS_DIR/profiles as a .prof (open with pstats or snakeviz) plus a .txt of
+the top cumulative functions, headed with the data size the screen had
+loaded. After N captures the screen is disarmed again.
+
+Armed from the Performance screen (Super only).
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import LOGS_DIR, PROFILE_TOP_N
+from .screen_registry import SCREEN_REGISTRY, get_screen_class
+
+PROFILE_DIR = os.path.join(LOGS_DIR, "profiles")
+ACTION_PREFIXES = ("refresh", "submit", "save", "load")
+
+_lock = threading.Lock()
+_armed: Dict[str, Dict[str, Any]] = {}  # screen -> {cls, methods, originals, remaining, captures}
+_last_captures: Dict[str, List[str]] = {}
+_active = threading.local()
+
+
+def profilable_methods(screen: str) -> List[str]:
+    """refresh*/submit*/save*/load* methods defined on the screen's class."""
+    cls = get_screen_class(screen)
+    return sorted(
+        k for k, v in cls.__dict__.items()
+        if callable(v) and k.startswith(ACTION_PREFIXES)
+    )
+
+
+def data_size(view: Any) -> Dict[str, Any]:
+    """Rows the screen has loaded: DataFrame attributes, treeview rows, entry count."""
+    size: Dict[str, Any] = {}
+    for name, value in list(getattr(view, "__dict__", {}).items()):
+        if hasattr(value, "shape") and hasattr(value, "columns"):
+            size[f"{name}_rows"] = int(value.shape[0])
+    try:
+        from tkinter import ttk
+
+        rows = 0
+        stack = list(view.winfo_children())
+        while stack:
+            w = stack.pop()
+            if isinstance(w, ttk.Treeview):
+                rows += len(w.get_children())
+            stack.extend(w.winfo_children())
+        size["tree_rows"] = rows
+    except Exception:
+        pass
+    try:
+        from .db import count_tool_entries
+
+        size["tool_entries"] = count_tool_entries()
+    except Exception:
+        pass
+    return size
+
+
+def _save(screen: str, method: str, prof: cProfile.Profile, elapsed: float, size: Dict[str, Any]) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    slug = "".join(c if c.isalnum() else "_" for c in screen)
+    base = os.path.join(PROFILE_DIR, f"{slug}_{method}_{stamp}")
+    prof.dump_stats(base + ".prof")
+
+    buf = io.StringIO()
+    stats = pstats.Stats(prof, stream=buf)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    header = [
+        f"screen:  {screen}",
+        f"method:  {method}",
+        f"at:      {datetime.now():%Y-%m-%d %H:%M:%S}",
+        f"elapsed: {elapsed * 1000.0:.1f} ms",
+        "data:    " + (", ".join(f"{k}={v}" for k, v in size.items()) or "-"),
+        "",
+    ]
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(header) + buf.getvalue())
+    return base + ".prof"
+
+
+def _wrap(screen: str, method: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        # Nested actions (refresh() calling refresh_tools()) run inside the outer profile.
+        if getattr(_active, "on", False):
+            return fn(self, *args, **kwargs)
+        with _lock:
+            state = _armed.get(screen)
+            take = state is not None and method in state["methods"] and state["remaining"] > 0
+            if take:
+                state["remaining"] -= 1
+        if not take:
+            return fn(self, *args, **kwargs)
+
+        prof = cProfile.Profile()
+        _active.on = True
+        t0 = time.perf_counter()
+        try:
+            return prof.runcall(fn, self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _active.on = False
+            try:
+                path = _save(screen, method, prof, elapsed, data_size(self))
+            except Exception as exc:
+                path = f"(save failed: {exc})"
+            with _lock:
+                state["captures"].append(path)
+                done = state["remaining"] <= 0
+            if done:
+                disarm(screen)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def install() -> None:
+    """Wrap the profilable methods of every screen class. Call once, before screens are built."""
+    for screen in SCREEN_REGISTRY:
+        try:
+            cls = get_screen_class(screen)
+        except Exception:
+            continue
+        for name in profilable_methods(screen):
+            fn = cls.__dict__[name]
+            if not getattr(fn, "__profiled__", False):
+                setattr(cls, name, _wrap(screen, name, fn))
+
+
+def arm(screen: str, calls: int = 1, methods: Optional[List[str]] = None) -> List[str]:
+    """Profile the next `calls` actions of a screen. Returns the wrapped method names."""
+    if screen not in SCREEN_REGISTRY:
+        raise ValueError(f"Unknown screen: {screen}")
+    if calls < 1:
+        raise ValueError("calls must be at least 1")
+    disarm(screen)
+    cls = get_screen_class(screen)
+    names = methods or profilable_methods(screen)
+    originals = {}
+    for name in names:
+        fn = cls.__dict__.get(name)
+        if not callable(fn):
+            raise ValueError(f"{cls.__name__} has no method {name}")
+        if not getattr(fn, "__profiled__", False):
+            # Not installed (another method, or no install()): wrapped until disarmed,
+            # so only screens built from here on call it.
+            originals[name] = fn
+            setattr(cls, name, _wrap(screen, name, fn))
+    with _lock:
+        _armed[screen] = {
+            "cls": cls, "methods": set(names), "originals": originals, "remaining": calls, "captures": [],
+        }
+    return list(names)
+
+
+def disarm(screen: str) -> List[str]:
+    """Restore the screen's methods. Returns the capture paths taken while armed."""
+    with _lock:
+        state = _armed.pop(screen, None)
+    if state is None:
+        return []
+    for name, fn in state["originals"].items():
+        setattr(state["cls"], name, fn)
+    _last_captures[screen] = list(state["captures"])
+    return list(state["captures"])
+
+
+def status() -> List[Dict[str, Any]]:
+    """Armed screens and recently finished ones, for the Performance screen."""
+    out = []
+    with _lock:
+        for screen, st in _armed.items():
+            out.append({
+                "screen": screen,
+                "armed": True,
+                "remaining": st["remaining"],
+                "methods": sorted(st["methods"]),
+                "captures": list(st["captures"]),
+            })
+    armed = {r["screen"] for r in out}
+    for screen, caps in _last_captures.items():
+        if screen not in armed:
+            out.append({"screen": screen, "armed": False, "remaining": 0, "methods": [], "captures": caps})
+    return out
@@ -7,83 +7,55 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 
-from .storage import safe_int, safe_float
+from .storage import entry_dates, flag_mask, safe_int, safe_float
 from .config import current_month_iso
+from .rule_config import (
+    CostRules,
+    Gage,
+    Gages,
+    RepeatRules,
+    RiskRules,
+    as_cost_rules,
+    as_gages,
+    as_repeat_rules,
+    as_risk_rules,
+)
+
+# Rule functions take the compiled objects from app/rule_config.py; a raw
+# config dict is still accepted and compiled on the way in.
 
 
 def _now() -> datetime:
     return datetime.now()
 
 
-def _parse_date(d: str) -> Optional[datetime]:
-    if not d:
-        return None
-    s = str(d).strip()
-    if not s:
-        return None
-    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S"):
-        try:
-            return datetime.strptime(s, fmt)
-        except Exception:
-            pass
-    return None
-
-
-def _days_between(a: datetime, b: datetime) -> int:
-    return (a.date() - b.date()).days
-
-
-def compute_copq_for_row(row: Dict[str, Any], cost_cfg: Dict[str, Any]) -> Tuple[float, float, float]:
+def compute_copq_for_row(row: Dict[str, Any], cost_cfg: CostRules | Dict[str, Any]) -> Tuple[float, float, float]:
     """
     Returns (downtime_cost_est, scrap_cost_est, copq_est).
     """
+    cost = as_cost_rules(cost_cfg)
     line = str(row.get("Line", "") or "").strip()
     part = str(row.get("Part_Number", "") or "").strip()
 
     downtime_mins = safe_float(row.get("Downtime_Mins", 0), 0.0)
     defect_qty = safe_int(row.get("Defect_Qty", 0), 0)
 
-    dt_rate = safe_float(cost_cfg.get("downtime_cost_per_min", {}).get(line, 0.0), 0.0)
-    scrap_default = safe_float(cost_cfg.get("scrap_cost_default", 0.0), 0.0)
-    scrap_by_part = cost_cfg.get("scrap_cost_by_part", {}) or {}
-    scrap_rate = safe_float(scrap_by_part.get(part, scrap_default), scrap_default)
-
-    downtime_cost = downtime_mins * dt_rate
-    scrap_cost = defect_qty * scrap_rate
+    downtime_cost = downtime_mins * cost.downtime_rate(line)
+    scrap_cost = defect_qty * cost.scrap_rate(part)
     copq = downtime_cost + scrap_cost
     return downtime_cost, scrap_cost, copq
 
 
-def gage_due_status(gage: Dict[str, Any], risk_cfg: Dict[str, Any]) -> Dict[str, Any]:
+def gage_due_status(gage: Gage | Dict[str, Any], risk_cfg: RiskRules | Dict[str, Any]) -> Dict[str, Any]:
     """
     Computes due dates + due status.
-    Returns dict with next_due_date, days_until_due, status in {OK, Due Soon, Overdue}.
+    Returns dict with next_due_date, days_until_due, status in {OK, Due Soon, Overdue, Unknown}.
     """
-    rules = (risk_cfg or {}).get("rules", {}) or {}
-    due_soon_days = safe_int(rules.get("gage_calibration_escalation", {}).get("due_soon_days", 14), 14)
-
-    last_cal = _parse_date(str(gage.get("last_calibration_date", "") or ""))
-    freq_days = safe_int(gage.get("calibration_frequency_days", 0), 0)
-
-    if not last_cal or freq_days <= 0:
-        return {
-            "next_due_date": "",
-            "days_until_due": None,
-            "status": "Unknown"
-        }
-
-    next_due = last_cal + timedelta(days=freq_days)
-    days_until = _days_between(next_due, _now())
-
-    if days_until < 0:
-        status = "Overdue"
-    elif days_until <= due_soon_days:
-        status = "Due Soon"
-    else:
-        status = "OK"
-
+    if not isinstance(gage, Gage):
+        gage = Gages.from_dict({"gages": [gage]}).items[0]
+    status, next_due, days_until = gage.due_status(as_risk_rules(risk_cfg).gage_due_soon_days, _now().date())
     return {
-        "next_due_date": next_due.strftime("%Y-%m-%d"),
+        "next_due_date": next_due,
         "days_until_due": days_until,
         "status": status
     }
@@ -91,7 +63,7 @@ def gage_due_status(gage: Dict[str, Any], risk_cfg: Dict[str, Any]) -> Dict[str,
 
 def assign_risk_severity(
     row: Dict[str, Any],
-    risk_cfg: Dict[str, Any],
+    risk_cfg: RiskRules | Dict[str, Any],
     repeat_score: int = 0,
     is_overdue_action: bool = False,
     is_overdue_ncr: bool = False,
@@ -101,7 +73,7 @@ def assign_risk_severity(
     Returns (severity, reasons).
     Severity in {Low, Medium, High, Critical}
     """
-    rules = (risk_cfg or {}).get("rules", {}) or {}
+    rules = as_risk_rules(risk_cfg)
     reasons: List[str] = []
 
     # Base
@@ -116,44 +88,30 @@ def assign_risk_severity(
 
     # Andon
     andon = str(row.get("Andon_Flag", "") or "").strip().lower()
-    if rules.get("andon_always_critical", True) and andon == "yes":
+    if rules.andon_always_critical and andon == "yes":
         bump("Critical", "Andon flagged")
 
     # Customer risk (if operator/QC set it)
     cust = str(row.get("Customer_Risk", "") or "").strip()
     if cust:
-        mapped = (rules.get("customer_risk_map", {}) or {}).get(cust, cust)
+        mapped = rules.customer_risk_map.get(cust, cust)
         if mapped in severity_rank:
             bump(mapped, f"Customer risk = {cust}")
 
     # COPQ thresholds
-    copq = safe_float(row.get("COPQ_Est", 0.0), 0.0)
-    copq_thr = rules.get("copq_thresholds", {}) or {}
-    if copq >= safe_float(copq_thr.get("critical", 1e18), 1e18):
-        bump("Critical", f"COPQ >= {copq_thr.get('critical')}")
-    elif copq >= safe_float(copq_thr.get("high", 1e18), 1e18):
-        bump("High", f"COPQ >= {copq_thr.get('high')}")
-    elif copq >= safe_float(copq_thr.get("medium", 1e18), 1e18):
-        bump("Medium", f"COPQ >= {copq_thr.get('medium')}")
+    hit = rules.copq.level(safe_float(row.get("COPQ_Est", 0.0), 0.0))
+    if hit:
+        bump(hit[1], f"COPQ >= {hit[0]}")
 
     # Defect qty thresholds
-    dq = safe_int(row.get("Defect_Qty", 0), 0)
-    dq_thr = rules.get("defect_qty_thresholds", {}) or {}
-    if dq >= safe_int(dq_thr.get("critical", 10**9), 10**9):
-        bump("Critical", f"Defect qty >= {dq_thr.get('critical')}")
-    elif dq >= safe_int(dq_thr.get("high", 10**9), 10**9):
-        bump("High", f"Defect qty >= {dq_thr.get('high')}")
-    elif dq >= safe_int(dq_thr.get("medium", 10**9), 10**9):
-        bump("Medium", f"Defect qty >= {dq_thr.get('medium')}")
+    hit = rules.defect_qty.level(safe_int(row.get("Defect_Qty", 0), 0))
+    if hit:
+        bump(hit[1], f"Defect qty >= {hit[0]}")
 
     # Repeat score escalation
-    rep = rules.get("repeat_offender_escalation", {}) or {}
-    if repeat_score >= safe_int(rep.get("critical_score", 10**9), 10**9):
-        bump("Critical", f"Repeat score >= {rep.get('critical_score')}")
-    elif repeat_score >= safe_int(rep.get("high_score", 10**9), 10**9):
-        bump("High", f"Repeat score >= {rep.get('high_score')}")
-    elif repeat_score >= safe_int(rep.get("watch_score", 10**9), 10**9):
-        bump("Medium", f"Repeat score >= {rep.get('watch_score')}")
+    hit = rules.repeat_score.level(repeat_score)
+    if hit:
+        bump(hit[1], f"Repeat score >= {hit[0]}")
 
     # Overdue action/NCR
     if is_overdue_action:
@@ -168,7 +126,7 @@ def assign_risk_severity(
     return current, reasons
 
 
-def detect_repeat_offenders(df: pd.DataFrame, repeat_rules: Dict[str, Any]) -> pd.DataFrame:
+def detect_repeat_offenders(df: pd.DataFrame, repeat_rules: RepeatRules | Dict[str, Any]) -> pd.DataFrame:
     """
     Adds Repeat_Flag / Repeat_Score / Repeat_Reason (best-effort).
     Uses window_days and thresholds from repeat_rules.json.
@@ -176,24 +134,18 @@ def detect_repeat_offenders(df: pd.DataFrame, repeat_rules: Dict[str, Any]) -> p
     if df.empty:
         return df
 
-    window_days = safe_int(repeat_rules.get("window_days", 7), 7)
-    part_thr = safe_int(repeat_rules.get("part_defect_repeat_threshold", 3), 3)
-    mach_thr = safe_int(repeat_rules.get("machine_defect_repeat_threshold", 5), 5)
-
-    weights = repeat_rules.get("weights", {}) or {}
-    w_part = safe_int(weights.get("part_defect_repeat", 40), 40)
-    w_mach = safe_int(weights.get("machine_repeat", 25), 25)
-
-    score_bands = repeat_rules.get("score_bands", {}) or {}
-    watch_min = safe_int(score_bands.get("watch_min", 40), 40)
-    repeat_min = safe_int(score_bands.get("repeat_min", 80), 80)
+    rules = as_repeat_rules(repeat_rules)
+    window_days = rules.window_days
+    part_thr = rules.part_defect_repeat_threshold
+    mach_thr = rules.machine_defect_repeat_threshold
+    w_part = rules.weight("part_defect_repeat", 40)
+    w_mach = rules.weight("machine_repeat", 25)
+    watch_min = rules.watch_min
+    repeat_min = rules.repeat_min
 
     # Build a date column
     temp = df.copy()
-    if "Date" in temp.columns:
-        temp["_dt"] = pd.to_datetime(temp["Date"], errors="coerce")
-    else:
-        temp["_dt"] = pd.NaT
+    temp["_dt"] = entry_dates(temp)
 
     cutoff = pd.Timestamp(_now().date() - timedelta(days=window_days))
     recent = temp[temp["_dt"].notna() & (temp["_dt"] >= cutoff)].copy()
@@ -204,7 +156,7 @@ def detect_repeat_offenders(df: pd.DataFrame, repeat_rules: Dict[str, Any]) -> p
             temp[col] = ""
 
     # Count repeats by (Part_Number, Defect_Code) where defects present
-    recent_def = recent[recent.get("Defects_Present", "").astype(str).str.lower().eq("yes")].copy()
+    recent_def = recent[flag_mask(recent, "Defects_Present")].copy()
     if not recent_def.empty:
         part_counts = recent_def.groupby(["Part_Number", "Defect_Code"]).size().reset_index(name="cnt")
     else:
@@ -265,87 +217,95 @@ def detect_repeat_offenders(df: pd.DataFrame, repeat_rules: Dict[str, Any]) -> p
     return temp
 
 
-def generate_notifications(
-    df: pd.DataFrame,
-    gages_store: Dict[str, Any],
-    risk_cfg: Dict[str, Any]
-) -> List[Dict[str, Any]]:
+def entry_notifications(r: Dict[str, Any], risk_cfg: RiskRules | Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Generates a list of alerts (dicts) for Super/Admin.
-    Does not persist ack here; UI can persist elsewhere.
+    Alerts raised by one tool entry (Andon / customer risk / COPQ).
+    Each carries a stable "key" (rule + entry ID), so re-evaluating an entry
+    yields the same keys.
     """
     alerts: List[Dict[str, Any]] = []
+    entry_id = str(r.get("ID", "") or "")
+    sev = str(r.get("Customer_Risk", "") or "").strip()
+    andon = str(r.get("Andon_Flag", "") or "").strip().lower()
+    copq = safe_float(r.get("COPQ_Est", 0.0), 0.0)
+
+    if andon == "yes":
+        alerts.append({
+            "key": f"andon:{entry_id}",
+            "severity": "Critical",
+            "type": "Andon",
+            "title": "Andon event",
+            "details": f"{r.get('Line','')} {r.get('Machine','')} Tool {r.get('Tool_Num','')} Part {r.get('Part_Number','')}",
+            "related": {"entry_id": entry_id}
+        })
+        return alerts
+
+    if sev in ("High", "Critical"):
+        alerts.append({
+            "key": f"risk:{entry_id}",
+            "severity": sev,
+            "type": "Risk",
+            "title": f"{sev} customer risk entry",
+            "details": f"{r.get('Line','')} {r.get('Machine','')} Part {r.get('Part_Number','')} Defect {r.get('Defect_Code','')}",
+            "related": {"entry_id": entry_id}
+        })
+
+    # COPQ high/critical based on config
+    hit = as_risk_rules(risk_cfg).copq.level(copq)
+    if hit and hit[1] in ("High", "Critical"):
+        alerts.append({
+            "key": f"copq:{entry_id}",
+            "severity": hit[1],
+            "type": "COPQ",
+            "title": f"{hit[1]} COPQ event",
+            "details": f"Entry {entry_id} COPQ ${copq:,.2f}",
+            "related": {"entry_id": entry_id}
+        })
+    return alerts
 
-    # 1) High/Critical entries by Customer_Risk / Andon / COPQ
-    if not df.empty:
-        temp = df.copy()
-        # ensure COPQ exists if possible
-        # (we won't compute here to avoid config dependency; UI can compute before)
-        for _, r in temp.iterrows():
-            sev = str(r.get("Customer_Risk", "") or "").strip()
-            andon = str(r.get("Andon_Flag", "") or "").strip().lower()
-            copq = safe_float(r.get("COPQ_Est", 0.0), 0.0)
-
-            if andon == "yes":
-                alerts.append({
-                    "severity": "Critical",
-                    "type": "Andon",
-                    "title": "Andon event",
-                    "details": f"{r.get('Line','')} {r.get('Machine','')} Tool {r.get('Tool_Num','')} Part {r.get('Part_Number','')}",
-                    "related": {"entry_id": str(r.get("ID",""))}
-                })
-                continue
-
-            if sev in ("High", "Critical"):
-                alerts.append({
-                    "severity": sev,
-                    "type": "Risk",
-                    "title": f"{sev} customer risk entry",
-                    "details": f"{r.get('Line','')} {r.get('Machine','')} Part {r.get('Part_Number','')} Defect {r.get('Defect_Code','')}",
-                    "related": {"entry_id": str(r.get("ID",""))}
-                })
-
-            # COPQ high/critical based on config
-            rules = (risk_cfg or {}).get("rules", {}) or {}
-            thr = rules.get("copq_thresholds", {}) or {}
-            if copq >= safe_float(thr.get("critical", 1e18), 1e18):
-                alerts.append({
-                    "severity": "Critical",
-                    "type": "COPQ",
-                    "title": "Critical COPQ event",
-                    "details": f"Entry {r.get('ID','')} COPQ ${copq:,.2f}",
-                    "related": {"entry_id": str(r.get("ID",""))}
-                })
-            elif copq >= safe_float(thr.get("high", 1e18), 1e18):
-                alerts.append({
-                    "severity": "High",
-                    "type": "COPQ",
-                    "title": "High COPQ event",
-                    "details": f"Entry {r.get('ID','')} COPQ ${copq:,.2f}",
-                    "related": {"entry_id": str(r.get("ID",""))}
-                })
-
-    # 2) Gage calibration due/overdue
-    gages = (gages_store or {}).get("gages", []) or []
-    for g in gages:
-        ds = gage_due_status(g, risk_cfg)
-        if ds["status"] in ("Overdue", "Due Soon"):
-            crit = str(g.get("criticality", "Medium") or "Medium")
-            severity = "High" if ds["status"] == "Overdue" else "Medium"
 
+def gage_notifications(gages_store: Gages | Dict[str, Any], risk_cfg: RiskRules | Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Calibration due/overdue alerts, keyed by gage ID."""
+    alerts: List[Dict[str, Any]] = []
+    rules = as_risk_rules(risk_cfg)
+    today = _now().date()
+    for g in as_gages(gages_store).items:
+        status, next_due, _ = g.due_status(rules.gage_due_soon_days, today)
+        if status in ("Overdue", "Due Soon"):
+            crit = g.criticality
             # escalate overdue based on criticality map if provided
-            rules = (risk_cfg or {}).get("rules", {}) or {}
-            gmap = (rules.get("gage_calibration_escalation", {}) or {}).get("overdue_criticality_map", {}) or {}
-            if ds["status"] == "Overdue":
-                severity = gmap.get(crit, "High")
+            severity = rules.gage_overdue_severity.get(crit, "High") if status == "Overdue" else "Medium"
 
             alerts.append({
+                "key": f"gage:{g.gage_id}",
                 "severity": severity,
                 "type": "Calibration",
-                "title": f"Gage {ds['status']}",
-                "details": f"{g.get('gage_id','')} {g.get('name','')} ({crit}) due {ds['next_due_date']}",
-                "related": {"gage_id": str(g.get("gage_id",""))}
+                "title": f"Gage {status}",
+                "details": f"{g.gage_id} {g.name} ({crit}) due {next_due}",
+                "related": {"gage_id": g.gage_id}
             })
+    return alerts
+
+
+def generate_notifications(
+    df: pd.DataFrame,
+    gages_store: Gages | Dict[str, Any],
+    risk_cfg: RiskRules | Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Generates a list of alerts (dicts) for Super/Admin, recomputed from scratch.
+    app/alerts.py runs the same rules incrementally and persists ack/snooze.
+    """
+    alerts: List[Dict[str, Any]] = []
+    risk_cfg = as_risk_rules(risk_cfg)
+
+    # 1) High/Critical entries by Customer_Risk / Andon / COPQ
+    if not df.empty:
+        for _, r in df.iterrows():
+            alerts.extend(entry_notifications(r, risk_cfg))
+
+    # 2) Gage calibration due/overdue
+    alerts.extend(gage_notifications(gages_store, risk_cfg))
 
     return alerts
 
@@ -374,3 +334,9 @@ def health_check(df: pd.DataFrame) -> List[Dict[str, Any]]:
             issues.append({"severity":"Medium", "entry_id": entry_id, "issue":"Defects=No but Defect_Qty>0"})
 
     return issues
+
+
+# Hot-path timing (no-op unless TOOLLIFE_PERF=1)
+from .perf import instrument_module
+
+instrument_module(globals())
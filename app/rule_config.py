@@ -0,0 +1,381 @@
+# app/rule_config.py
+"""
+Cached, validated rule configuration.
+
+risk_config.json, repeat_rules.json, cost_config.json, gages.json and
+reasons.json are read once and compiled into frozen objects (RiskRules,
+RepeatRules, CostRules, Gages, the reasons tuple): numbers coerced, dates
+parsed, thresholds as ordered steps and lookups as read-only maps, so the
+rule code no longer walks nested dicts. Values that are present but unusable
+fall back to the default and are listed in the object's problems.
+
+Each accessor checks the file's mtime and recompiles only when it moved.
+Screens that write one of the files call invalidate(path) right after, so a
+save within the same mtime tick is still seen.
+
+quality_engine's functions accept either the compiled object or the raw
+dict (as_risk_rules() and friends), for callers that hold a dict.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .config import COST_CONFIG_FILE, GAGES_FILE, REASONS_FILE, REPEAT_RULES_FILE, RISK_CONFIG_FILE
+from .storage import load_json
+
+SEVERITIES = ("Low", "Medium", "High", "Critical")
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def _number(value: Any) -> float:
+    """float(value), keeping a JSON int an int so messages read as configured."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return float(value)
+
+
+class _Reader:
+    """Coerces values out of one raw section, noting the ones that are unusable."""
+
+    def __init__(self, raw: Any, where: str, problems: List[str]):
+        self.raw = raw if isinstance(raw, dict) else {}
+        self.where = where
+        self.problems = problems
+        if raw is not None and not isinstance(raw, dict):
+            problems.append(f"{where}: expected an object")
+
+    def section(self, key: str) -> "_Reader":
+        return _Reader(self.raw.get(key), f"{self.where}.{key}", self.problems)
+
+    def number(self, key: str, default, cast=float):
+        value = self.raw.get(key)
+        if value is None or str(value).strip() == "":
+            return default
+        try:
+            return cast(float(value)) if cast is int else cast(value)
+        except (TypeError, ValueError):
+            self.problems.append(f"{self.where}.{key}: not a number ({value!r})")
+            return default
+
+    def optional_number(self, key: str, cast=float):
+        return self.number(key, None, cast)
+
+    def flag(self, key: str, default: bool) -> bool:
+        value = self.raw.get(key, default)
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes")
+        return bool(value)
+
+    def mapping(self, key: str, value_cast: Callable[[Any], Any] = str) -> Mapping[str, Any]:
+        raw = self.raw.get(key)
+        if raw is None:
+            return _EMPTY
+        if not isinstance(raw, dict):
+            self.problems.append(f"{self.where}.{key}: expected an object")
+            return _EMPTY
+        out = {}
+        for k, v in raw.items():
+            try:
+                out[str(k)] = value_cast(v)
+            except (TypeError, ValueError):
+                self.problems.append(f"{self.where}.{key}.{k}: unusable value ({v!r})")
+        return MappingProxyType(out)
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """Severity steps, most severe first: level() is the first step value reaches."""
+
+    steps: Tuple[Tuple[Any, str], ...] = ()
+
+    @classmethod
+    def read(cls, r: _Reader, keys: Tuple[Tuple[str, str], ...], cast=_number) -> "Thresholds":
+        """keys: (config key, severity), most severe first; missing keys never fire."""
+        steps = []
+        for key, severity in keys:
+            value = r.optional_number(key, cast)
+            if value is not None:
+                steps.append((value, severity))
+        values = [v for v, _ in steps]
+        if len(values) == len(keys) and values != sorted(values, reverse=True):
+            r.problems.append(f"{r.where}: thresholds should increase with severity")
+        return cls(tuple(steps))
+
+    def level(self, value: float) -> Optional[Tuple[Any, str]]:
+        """(threshold, severity) of the first step value reaches, or None."""
+        for threshold, severity in self.steps:
+            if value >= threshold:
+                return threshold, severity
+        return None
+
+
+@dataclass(frozen=True)
+class RiskRules:
+    andon_always_critical: bool = True
+    customer_risk_map: Mapping[str, str] = field(default_factory=lambda: _EMPTY)
+    copq: Thresholds = Thresholds()
+    defect_qty: Thresholds = Thresholds()
+    repeat_score: Thresholds = Thresholds()
+    overdue_action_days: Thresholds = Thresholds()
+    ncr_age_days: Thresholds = Thresholds()
+    gage_due_soon_days: int = 14
+    gage_overdue_severity: Mapping[str, str] = field(default_factory=lambda: _EMPTY)
+    problems: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: Any) -> "RiskRules":
+        problems: List[str] = []
+        rules = _Reader(raw, "risk_config", problems).section("rules")
+        gcal = rules.section("gage_calibration_escalation")
+        out = cls(
+            andon_always_critical=rules.flag("andon_always_critical", True),
+            customer_risk_map=rules.mapping("customer_risk_map"),
+            copq=Thresholds.read(
+                rules.section("copq_thresholds"),
+                (("critical", "Critical"), ("high", "High"), ("medium", "Medium")),
+            ),
+            defect_qty=Thresholds.read(
+                rules.section("defect_qty_thresholds"),
+                (("critical", "Critical"), ("high", "High"), ("medium", "Medium")),
+                int,
+            ),
+            repeat_score=Thresholds.read(
+                rules.section("repeat_offender_escalation"),
+                (("critical_score", "Critical"), ("high_score", "High"), ("watch_score", "Medium")),
+                int,
+            ),
+            overdue_action_days=Thresholds.read(
+                rules.section("overdue_action_escalation"),
+                (("critical_after_days_overdue", "Critical"), ("high_after_days_overdue", "High")),
+                int,
+            ),
+            ncr_age_days=Thresholds.read(
+                rules.section("ncr_age_escalation"),
+                (("critical_after_days_open", "Critical"), ("high_after_days_open", "High")),
+                int,
+            ),
+            gage_due_soon_days=gcal.number("due_soon_days", 14, int),
+            gage_overdue_severity=gcal.mapping("overdue_criticality_map"),
+        )
+        for name, sev in list(out.customer_risk_map.items()) + list(out.gage_overdue_severity.items()):
+            if sev not in SEVERITIES:
+                problems.append(f"risk_config: {name} maps to unknown severity {sev!r}")
+        return _with_problems(out, problems)
+
+
+@dataclass(frozen=True)
+class RepeatRules:
+    window_days: int = 7
+    part_defect_repeat_threshold: int = 3
+    machine_defect_repeat_threshold: int = 5
+    tool_copq_repeat_threshold: int = 3
+    weights: Mapping[str, int] = field(default_factory=lambda: _EMPTY)
+    watch_min: int = 40
+    repeat_min: int = 80
+    copq_event_min: float = 0.0
+    problems: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: Any) -> "RepeatRules":
+        problems: List[str] = []
+        r = _Reader(raw, "repeat_rules", problems)
+        bands = r.section("score_bands")
+        out = cls(
+            window_days=r.number("window_days", 7, int),
+            part_defect_repeat_threshold=r.number("part_defect_repeat_threshold", 3, int),
+            machine_defect_repeat_threshold=r.number("machine_defect_repeat_threshold", 5, int),
+            tool_copq_repeat_threshold=r.number("tool_copq_repeat_threshold", 3, int),
+            weights=r.mapping("weights", lambda v: int(float(v))),
+            watch_min=bands.number("watch_min", 40, int),
+            repeat_min=bands.number("repeat_min", 80, int),
+            copq_event_min=r.number("copq_event_min", 0.0),
+        )
+        if out.watch_min > out.repeat_min:
+            problems.append("repeat_rules.score_bands: watch_min is above repeat_min")
+        return _with_problems(out, problems)
+
+    def weight(self, key: str, default: int) -> int:
+        return self.weights.get(key, default)
+
+
+@dataclass(frozen=True)
+class CostRules:
+    downtime_cost_per_min: Mapping[str, float] = field(default_factory=lambda: _EMPTY)
+    scrap_cost_default: float = 0.0
+    scrap_cost_by_part: Mapping[str, float] = field(default_factory=lambda: _EMPTY)
+    sort_labor_cost_per_hour: float = 0.0
+    enable_sort_labor_cost: bool = False
+    problems: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: Any) -> "CostRules":
+        problems: List[str] = []
+        r = _Reader(raw, "cost_config", problems)
+        out = cls(
+            downtime_cost_per_min=r.mapping("downtime_cost_per_min", float),
+            scrap_cost_default=r.number("scrap_cost_default", 0.0),
+            scrap_cost_by_part=r.mapping("scrap_cost_by_part", float),
+            sort_labor_cost_per_hour=r.number("sort_labor_cost_per_hour", 0.0),
+            enable_sort_labor_cost=r.flag("enable_sort_labor_cost", False),
+        )
+        return _with_problems(out, problems)
+
+    def downtime_rate(self, line: str) -> float:
+        return self.downtime_cost_per_min.get(line, 0.0)
+
+    def scrap_rate(self, part: str) -> float:
+        return self.scrap_cost_by_part.get(part, self.scrap_cost_default)
+
+
+def parse_date(s: Any) -> Optional[datetime]:
+    s = str(s or "").strip()
+    if not s:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+@dataclass(frozen=True)
+class Gage:
+    gage_id: str
+    name: str = ""
+    criticality: str = "Medium"
+    last_calibration: Optional[datetime] = None
+    frequency_days: int = 0
+    raw: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    @property
+    def next_due(self) -> Optional[datetime]:
+        if not self.last_calibration or self.frequency_days <= 0:
+            return None
+        return self.last_calibration + timedelta(days=self.frequency_days)
+
+    def due_status(self, due_soon_days: int, today: Optional[date] = None) -> Tuple[str, str, Optional[int]]:
+        """(status, next due YYYY-MM-DD, days until due); status OK / Due Soon / Overdue / Unknown."""
+        next_due = self.next_due
+        if next_due is None:
+            return "Unknown", "", None
+        days_until = (next_due.date() - (today or datetime.now().date())).days
+        if days_until < 0:
+            status = "Overdue"
+        elif days_until <= due_soon_days:
+            status = "Due Soon"
+        else:
+            status = "OK"
+        return status, next_due.strftime("%Y-%m-%d"), days_until
+
+
+@dataclass(frozen=True)
+class Gages:
+    items: Tuple[Gage, ...] = ()
+    by_id: Mapping[str, Gage] = field(default_factory=lambda: _EMPTY)
+    problems: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, raw: Any) -> "Gages":
+        problems: List[str] = []
+        store = raw if isinstance(raw, dict) else {}
+        items = []
+        for i, g in enumerate(store.get("gages", []) or []):
+            if not isinstance(g, dict):
+                problems.append(f"gages[{i}]: expected an object")
+                continue
+            r = _Reader(g, f"gages[{i}]", problems)
+            last = parse_date(g.get("last_calibration_date", ""))
+            if last is None and str(g.get("last_calibration_date", "") or "").strip():
+                problems.append(f"gages[{i}].last_calibration_date: not a date")
+            items.append(Gage(
+                gage_id=str(g.get("gage_id", "") or ""),
+                name=str(g.get("name", "") or ""),
+                criticality=str(g.get("criticality", "Medium") or "Medium"),
+                last_calibration=last,
+                frequency_days=r.number("calibration_frequency_days", 0, int),
+                raw=MappingProxyType(dict(g)),
+            ))
+        by_id = MappingProxyType({g.gage_id: g for g in items if g.gage_id})
+        return cls(tuple(items), by_id, tuple(problems))
+
+
+def _with_problems(obj, problems: List[str]):
+    return replace(obj, problems=tuple(problems)) if problems else obj
+
+
+def as_risk_rules(cfg: Any) -> RiskRules:
+    return cfg if isinstance(cfg, RiskRules) else RiskRules.from_dict(cfg or {})
+
+
+def as_repeat_rules(cfg: Any) -> RepeatRules:
+    return cfg if isinstance(cfg, RepeatRules) else RepeatRules.from_dict(cfg or {})
+
+
+def as_cost_rules(cfg: Any) -> CostRules:
+    return cfg if isinstance(cfg, CostRules) else CostRules.from_dict(cfg or {})
+
+
+def as_gages(store: Any) -> Gages:
+    return store if isinstance(store, Gages) else Gages.from_dict(store or {})
+
+
+# -----------------------------
+# mtime cache
+# -----------------------------
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[float, Any]] = {}
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _cached(path: str, default: Any, compile: Callable[[Any], Any]) -> Any:
+    mtime = _mtime(path)
+    with _lock:
+        hit = _cache.get(path)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    value = compile(load_json(path, default))
+    with _lock:
+        _cache[path] = (mtime, value)
+    return value
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    """Drop the compiled copy of path (all files when None); the next read reloads."""
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(path, None)
+
+
+def risk_rules() -> RiskRules:
+    return _cached(RISK_CONFIG_FILE, {}, RiskRules.from_dict)
+
+
+def repeat_rules() -> RepeatRules:
+    return _cached(REPEAT_RULES_FILE, {}, RepeatRules.from_dict)
+
+
+def cost_rules() -> CostRules:
+    return _cached(COST_CONFIG_FILE, {}, CostRules.from_dict)
+
+
+def gages() -> Gages:
+    return _cached(GAGES_FILE, {"gages": []}, Gages.from_dict)
+
+
+def reasons() -> Tuple[str, ...]:
+    return _cached(REASONS_FILE, [], lambda raw: tuple(str(r) for r in raw) if isinstance(raw, list) else ())
@@ -20,6 +20,7 @@ SCREEN_REGISTRY: Dict[str, Tuple[str, str]] = {
     "Master Data": ("app.ui_master_data", "MasterDataUI"),
     "Admin": ("app.ui_admin", "AdminUI"),
     "Audit Trail": ("app.ui_audit", "AuditTrailUI"),
+    "Performance": ("app.ui_performance", "PerformanceUI"),
 }
 
 
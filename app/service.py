@@ -0,0 +1,309 @@
+# app/service.py
+"""
+Headless data service: the functions of app/db.py over local HTTP/JSON.
+
+Shop-floor terminals set TOOLLIFE_SERVICE_URL and talk to this process instead
+of opening toollife.db over a share (see app/service_client.py), so only one
+process ever holds the database file.
+
+- Writes go to a single writer thread with one connection. Calls that arrive
+  while a transaction is in flight are queued and committed together in the
+  next one (group commit); each call runs in its own SAVEPOINT so a failing
+  call only rolls back itself.
+- Reads use a small pool of connections, one per in-flight request.
+- With SERVICE_TOKEN set, /api and /stats answer 401 unless the request
+  carries it in the X-Toollife-Token header (compared in constant time). The
+  API includes the user and permission functions, so make_server() refuses a
+  non-loopback host without a token.
+
+API:
+    POST /api/<function>   {"args": [...], "kwargs": {...}} -> {"ok": true, "result": ...}
+    GET  /api              served function names
+    GET  /health           {"ok": true}
+    GET  /stats            group-commit counters
+
+Run:  TOOLLIFE_SERVICE_TOKEN=<secret> python server.py [--host 127.0.0.1] [--port 8765] [--db PATH]
+"""
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import json
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import db
+from .config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_PATH,
+    SERVICE_HOST,
+    SERVICE_MAX_BATCH,
+    SERVICE_PORT,
+    SERVICE_READ_POOL,
+    SERVICE_TOKEN,
+)
+from .service_client import READ_FUNCTIONS, TOKEN_HEADER, WRITE_FUNCTIONS
+from .sqltrace import connect_kwargs
+
+
+def _open(path: str) -> sqlite3.Connection:
+    # isolation_level=None: transactions are opened explicitly by the writer.
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, **connect_kwargs())
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS};")
+    return conn
+
+
+# -----------------------------
+# Writer (group commit)
+# -----------------------------
+class Writer(threading.Thread):
+    def __init__(self, path: str = DB_PATH, max_batch: int = SERVICE_MAX_BATCH):
+        super().__init__(daemon=True, name="db-writer")
+        self.path = path
+        self.max_batch = max(1, int(max_batch))
+        self._queue: "queue.Queue[Optional[Tuple[str, list, dict, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.ops = 0
+        self.largest_batch = 0
+        self.commit_s = 0.0
+
+    def submit(self, fn: str, args: list, kwargs: dict) -> Future:
+        fut: Future = Future()
+        self._queue.put((fn, args, kwargs, fut))
+        return fut
+
+    def stop(self) -> None:
+        self._queue.put(None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "ops": self.ops,
+                "avg_batch": round(self.ops / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "commit_s": round(self.commit_s, 3),
+                "queued": self._queue.qsize(),
+            }
+
+    def _drain(self, first) -> Tuple[List[Tuple[str, list, dict, Future]], bool]:
+        batch = [first]
+        stopping = False
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    def run(self) -> None:
+        conn = _open(self.path)
+        try:
+            with db.bind_connection(conn):
+                while True:
+                    first = self._queue.get()
+                    if first is None:
+                        return
+                    batch, stopping = self._drain(first)
+                    self._commit(conn, batch)
+                    if stopping:
+                        return
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch) -> None:
+        t0 = time.perf_counter()
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, args, kwargs, fut in batch:
+                conn.execute("SAVEPOINT op")
+                try:
+                    result = getattr(db, fn)(*args, **kwargs)
+                    conn.execute("RELEASE op")
+                    outcomes.append((fut, True, result))
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    outcomes.append((fut, False, exc))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _fn, _a, _k, fut in batch:
+                fut.set_exception(exc)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.ops += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.commit_s += time.perf_counter() - t0
+        # Callers only hear back once their write is durable.
+        for fut, ok, value in outcomes:
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
+
+
+# -----------------------------
+# Read pool
+# -----------------------------
+class ReadPool:
+    def __init__(self, path: str = DB_PATH, size: int = SERVICE_READ_POOL):
+        self._conns: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, int(size))):
+            self._conns.put(_open(path))
+
+    def call(self, fn: str, args: list, kwargs: dict) -> Any:
+        conn = self._conns.get()
+        try:
+            with db.bind_connection(conn):
+                return getattr(db, fn)(*args, **kwargs)
+        finally:
+            self._conns.put(conn)
+
+    def close(self) -> None:
+        while not self._conns.empty():
+            self._conns.get_nowait().close()
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+class DataService:
+    def __init__(self, path: str = DB_PATH, *, read_pool: int = SERVICE_READ_POOL, max_batch: int = SERVICE_MAX_BATCH):
+        self.writer = Writer(path, max_batch)
+        self.reads = ReadPool(path, read_pool)
+        self.writer.start()
+
+    def call(self, fn: str, args: list, kwargs: dict) -> Any:
+        if fn in WRITE_FUNCTIONS:
+            return self.writer.submit(fn, args, kwargs).result()
+        if fn in READ_FUNCTIONS:
+            return self.reads.call(fn, args, kwargs)
+        raise KeyError(f"Unknown function: {fn}")
+
+    def close(self) -> None:
+        self.writer.stop()
+        self.writer.join(timeout=10)
+        self.reads.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: DataService
+    token: str = ""
+
+    def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+        pass
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if not self.token:
+            return True
+        supplied = self.headers.get(TOKEN_HEADER, "")
+        if hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8")):
+            return True
+        self._send(401, {"ok": False, "error": "unauthorized"})
+        return False
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"ok": True})
+        elif not self._authorized():
+            return
+        elif self.path == "/api":
+            self._send(200, {"ok": True, "result": {"write": WRITE_FUNCTIONS, "read": READ_FUNCTIONS}})
+        elif self.path == "/stats":
+            self._send(200, {"ok": True, "result": self.service.writer.stats()})
+        else:
+            self._send(404, {"ok": False, "error": "not found"})
+
+    def do_POST(self):
+        if not self.path.startswith("/api/"):
+            self._send(404, {"ok": False, "error": "not found"})
+            return
+        if not self._authorized():
+            return
+        fn = self.path[len("/api/"):]
+        if fn not in WRITE_FUNCTIONS and fn not in READ_FUNCTIONS:
+            self._send(404, {"ok": False, "error": f"unknown function: {fn}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length).decode("utf-8") or "{}") if length else {}
+            args = list(body.get("args") or [])
+            kwargs = dict(body.get("kwargs") or {})
+        except (ValueError, TypeError) as exc:
+            self._send(400, {"ok": False, "error": f"bad request: {exc}"})
+            return
+        try:
+            result = self.service.call(fn, args, kwargs)
+        except Exception as exc:
+            self._send(500, {"ok": False, "error": f"{type(exc).__name__}: {exc}"})
+            return
+        self._send(200, {"ok": True, "result": result})
+
+
+class _Server(ThreadingHTTPServer):
+    # The stdlib default backlog (5) drops connects under a burst of terminals.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def make_server(
+    host: str = SERVICE_HOST,
+    port: int = SERVICE_PORT,
+    path: str = DB_PATH,
+    *,
+    token: str = SERVICE_TOKEN,
+    **options: Any,
+) -> Tuple[ThreadingHTTPServer, DataService]:
+    if not token and not is_loopback(host):
+        raise ValueError(f"Set TOOLLIFE_SERVICE_TOKEN before serving on {host}")
+    service = DataService(path, **options)
+    handler = type("Handler", (_Handler,), {"service": service, "token": token})
+    server = _Server((host, port), handler)
+    return server, service
+
+
+def serve(host: str = SERVICE_HOST, port: int = SERVICE_PORT, path: str = DB_PATH) -> None:
+    server, service = make_server(host, port, path)
+    print(f"Tool Life data service on http://{host}:{server.server_port} ({path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,155 @@
+# app/service_client.py
+"""
+Client side of the data service (app/service.py).
+
+When TOOLLIFE_SERVICE_URL is set, app/db.py swaps the functions listed here for
+wrappers that POST to the service instead of opening toollife.db, so the Tk
+screens run unchanged on a thin terminal.
+
+Only these functions go over the wire. Bulk/maintenance helpers (connect,
+iter_query, archive, backup, import, sync) stay local and belong on the server;
+on a terminal connect() raises db.NoLocalDatabase instead of opening a file.
+Every call carries SERVICE_TOKEN (TOOLLIFE_SERVICE_TOKEN) in TOKEN_HEADER.
+"""
+from __future__ import annotations
+
+import json
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict
+
+from .config import SERVICE_TOKEN
+
+# Served by the single writer connection (group committed).
+WRITE_FUNCTIONS = (
+    "log_audit",
+    "set_meta",
+    "ensure_lines",
+    "upsert_production_goal",
+    "upsert_part",
+    "deactivate_part",
+    "upsert_tool",
+    "upsert_tool_inventory",
+    "update_tool_stock",
+    "deactivate_tool",
+    "set_tool_lines",
+    "set_tool_parts",
+    "replace_tool_inserts",
+    "set_scrap_cost",
+    "upsert_downtime_code",
+    "deactivate_downtime_code",
+    "upsert_operator_entry",
+    "upsert_user",
+    "update_user_fields",
+    "set_screen_permission",
+    "delete_screen_permission",
+    "upsert_tool_entry",
+    "record_tool_change",
+    "upsert_action",
+    "set_action_status",
+    "upsert_ncr",
+    "set_ncr_status",
+    "save_alerts",
+    "ack_alert",
+    "snooze_alert",
+    "save_data_issues",
+)
+
+# Served by the read pool.
+READ_FUNCTIONS = (
+    "get_meta",
+    "list_audit_logs",
+    "list_backup_log",
+    "list_lines",
+    "list_production_goals",
+    "get_production_goal",
+    "get_tool",
+    "tool_cost_at",
+    "list_tool_cost_history",
+    "get_tool_lines",
+    "get_tool_parts",
+    "list_tool_inserts",
+    "list_tools_for_line",
+    "list_parts_with_lines",
+    "list_parts_for_line",
+    "list_tools_with_mappings",
+    "list_tools_simple",
+    "get_scrap_costs_simple",
+    "dimension_rows",
+    "dimension_ids",
+    "list_downtime_codes",
+    "get_user",
+    "list_users",
+    "list_screen_permissions",
+    "list_entry_months",
+    "count_tool_entries",
+    "fetch_archived_entries",
+    "fetch_tool_entries",
+    "fetch_tool_entries_range",
+    "fetch_tool_entries_page",
+    "query_shift_reports",
+    "list_shift_operators",
+    "list_actions",
+    "query_actions",
+    "count_actions",
+    "get_action",
+    "list_ncrs",
+    "alert_queue_since",
+    "alert_queue_head",
+    "fetch_tool_entries_by_ids",
+    "query_alerts",
+    "event_versions",
+    "data_issue_queue_since",
+    "data_issue_queue_head",
+    "query_data_issues",
+    "list_entry_gages",
+)
+
+TIMEOUT_S = 30.0
+TOKEN_HEADER = "X-Toollife-Token"
+
+
+class ServiceError(Exception):
+    """The service answered, but the call raised on the server."""
+
+
+def call(url: str, fn: str, *args: Any, timeout: float = TIMEOUT_S, **kwargs: Any) -> Any:
+    body = json.dumps({"args": list(args), "kwargs": kwargs}, default=str).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if SERVICE_TOKEN:
+        headers[TOKEN_HEADER] = SERVICE_TOKEN
+    req = urllib.request.Request(
+        f"{url.rstrip('/')}/api/{fn}",
+        data=body,
+        headers=headers,
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = json.loads(resp.read().decode("utf-8"))
+    except urllib.error.HTTPError as exc:
+        try:
+            payload = json.loads(exc.read().decode("utf-8"))
+        except Exception:
+            raise ServiceError(f"{fn}: HTTP {exc.code}") from exc
+    if not payload.get("ok"):
+        raise ServiceError(f"{fn}: {payload.get('error', 'unknown error')}")
+    return payload.get("result")
+
+
+def remote(url: str, fn: str) -> Callable[..., Any]:
+    def _call(*args: Any, **kwargs: Any) -> Any:
+        return call(url, fn, *args, **kwargs)
+
+    _call.__name__ = fn
+    _call.__qualname__ = fn
+    return _call
+
+
+def install_remote(namespace: Dict[str, Any], url: str) -> None:
+    """Replace the served functions in namespace (app.db's globals) with remote calls."""
+    for fn in (*WRITE_FUNCTIONS, *READ_FUNCTIONS):
+        if fn in namespace:
+            namespace[fn] = remote(url, fn)
+            # Stands in for the module's own function (perf timing, tracebacks).
+            namespace[fn].__module__ = namespace.get("__name__", __name__)
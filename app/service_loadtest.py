@@ -0,0 +1,221 @@
+# app/service_loadtest.py
+"""
+Load test for the data service with a local HTTP client.
+
+By default starts the service in-process on a scratch copy of toollife.db, then
+runs N client threads issuing a mix of tool-change submits, sign-offs,
+action/NCR writes and list queries. Reports throughput, latency percentiles and
+how many writes each group commit carried.
+
+    python -m app.service_loadtest [--clients 16] [--seconds 10] [--write-ratio 0.5]
+    python -m app.service_loadtest --url http://host:8765   # against a running server
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import json
+import urllib.request
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+from .config import DB_PATH
+from .service_client import call
+
+LINES = ["U725", "JL"]
+
+
+def _tool_change(url: str, rnd: random.Random, client: int) -> None:
+    now = datetime.now()
+    call(url, "upsert_tool_entry", {
+        "ID": uuid.uuid4().hex,
+        "Date": now.strftime("%Y-%m-%d"),
+        "Time": now.strftime("%H:%M:%S"),
+        "Line": rnd.choice(LINES),
+        "Machine": f"M{rnd.randint(1, 12)}",
+        "Tool_Num": str(rnd.randint(1, 23)),
+        "Reason": "Load test",
+        "Downtime_Mins": rnd.randint(0, 30),
+        "Production_Qty": rnd.randint(0, 500),
+        "Tool_Changer": f"loadtest{client}",
+    })
+
+
+def _action(url: str, rnd: random.Random, client: int) -> None:
+    act = call(url, "upsert_action", {
+        "action_id": f"ACT-LT-{uuid.uuid4().hex[:12]}",
+        "title": "Load test action",
+        "owner": f"loadtest{client}",
+        "status": "Open",
+    })
+    if act and act.get("action_id") and rnd.random() < 0.5:
+        call(url, "set_action_status", act["action_id"], "Closed", f"loadtest{client}")
+
+
+def _ncr(url: str, rnd: random.Random, client: int) -> None:
+    ncr = call(url, "upsert_ncr", {
+        "ncr_id": f"NCR-LT-{uuid.uuid4().hex[:12]}",
+        "part_number": "LOADTEST", "description": "Load test",
+        "status": "Open",
+    })
+    if ncr and ncr.get("ncr_id") and rnd.random() < 0.5:
+        call(url, "set_ncr_status", ncr["ncr_id"], "Closed")
+
+
+def _read(url: str, rnd: random.Random, client: int) -> None:
+    pick = rnd.random()
+    if pick < 0.4:
+        call(url, "fetch_tool_entries", datetime.now().strftime("%Y-%m"))
+    elif pick < 0.6:
+        call(url, "list_tools_for_line", rnd.choice(LINES))
+    elif pick < 0.8:
+        call(url, "list_actions")
+    else:
+        call(url, "list_ncrs")
+
+
+WRITES = [(_tool_change, 0.7), (_action, 0.2), (_ncr, 0.1)]
+
+
+def _client(url: str, idx: int, deadline: float, write_ratio: float, out: Dict[str, List[float]], errors: List[str]) -> None:
+    rnd = random.Random(idx)
+    while time.perf_counter() < deadline:
+        if rnd.random() < write_ratio:
+            fn = rnd.choices([w for w, _ in WRITES], weights=[p for _, p in WRITES])[0]
+            kind = "write"
+        else:
+            fn, kind = _read, "read"
+        t0 = time.perf_counter()
+        try:
+            fn(url, rnd, idx)
+        except Exception as exc:
+            errors.append(str(exc))
+            continue
+        out[kind].append(time.perf_counter() - t0)
+
+
+def _stats(url: str) -> Dict[str, float]:
+    with urllib.request.urlopen(f"{url.rstrip('/')}/stats", timeout=10) as resp:
+        return json.loads(resp.read().decode("utf-8")).get("result", {})
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))] * 1000.0
+
+
+def run(url: str, clients: int, seconds: float, write_ratio: float) -> Dict[str, object]:
+    out: Dict[str, List[float]] = {"write": [], "read": []}
+    errors: List[str] = []
+    before = _stats(url)
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_client, args=(url, i, deadline, write_ratio, out, errors), daemon=True)
+        for i in range(clients)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    after = _stats(url)
+    batches = after.get("batches", 0) - before.get("batches", 0)
+    committed = after.get("ops", 0) - before.get("ops", 0)
+
+    report: Dict[str, object] = {
+        "clients": clients,
+        "seconds": round(elapsed, 2),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else "",
+        "group_commits": batches,
+        "writes_per_commit": round(committed / batches, 2) if batches else 0.0,
+        "largest_batch": after.get("largest_batch", 0),
+    }
+    for kind, values in out.items():
+        report[kind] = {
+            "ops": len(values),
+            "ops_per_s": round(len(values) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(_pct(values, 50), 2),
+            "p95_ms": round(_pct(values, 95), 2),
+            "p99_ms": round(_pct(values, 99), 2),
+            "mean_ms": round(statistics.fmean(values) * 1000.0, 2) if values else 0.0,
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Tool Life data service")
+    parser.add_argument("--url", default="", help="running service; default starts one on a scratch DB copy")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.5)
+    parser.add_argument("--db", default=DB_PATH, help="database to copy for the in-process service")
+    args = parser.parse_args(argv)
+
+    server = service = None
+    scratch = ""
+    url = args.url
+    if not url:
+        from .db import bind_connection, init_db
+        from .service import _open, make_server
+        from .sync import install_sync
+
+        scratch = tempfile.mkdtemp(prefix="toollife_load_")
+        path = os.path.join(scratch, "toollife.db")
+        src = sqlite3.connect(args.db)
+        dst = sqlite3.connect(path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        conn = _open(path)
+        try:
+            with bind_connection(conn):
+                init_db()
+                install_sync()
+        finally:
+            conn.close()
+        server, service = make_server("127.0.0.1", 0, path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        report = run(url, args.clients, args.seconds, args.write_ratio)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            service.close()
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{report['clients']} clients, {report['seconds']}s, {report['errors']} errors")
+    for kind in ("write", "read"):
+        r = report[kind]
+        print(
+            f"  {kind:5s} {r['ops']:7d} ops  {r['ops_per_s']:8.1f}/s  "
+            f"p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  p99 {r['p99_ms']:.1f} ms"
+        )
+    print(
+        f"  group commits: {report['group_commits']}, "
+        f"{report['writes_per_commit']} writes/commit (largest {report['largest_batch']})"
+    )
+    if report["first_error"]:
+        print(f"  first error: {report['first_error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
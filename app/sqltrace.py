@@ -0,0 +1,297 @@
+# app/sqltrace.py
+"""
+Opt-in SQL tracer (TOOLLIFE_SQLTRACE=1, config.SQLTRACE_ENABLED).
+
+db.connect() opens TracedConnection when tracing is on. Every statement is
+timed from execute() until its cursor is exhausted (fetch time included) and
+aggregated under its normalized text. set_trace_callback counts the extra
+sub-statements SQLite traces while running one (the station-sync change_log
+triggers, for example), so a slow write can be told apart from a slow trigger.
+
+Statements over SQLTRACE_THRESHOLD_MS are appended to SQLTRACE_LOG_FILE with
+their bound-parameter shape (types, not values). The first time a statement
+is slow, its EXPLAIN QUERY PLAN is captured and logged with it.
+
+report() ranks statements by total time; write_report() saves it to LOGS_DIR
+and runs automatically at exit while tracing is on:
+
+    TOOLLIFE_SQLTRACE=1 python -m app.bench --scale small
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import LOGS_DIR, SQLTRACE_ENABLED, SQLTRACE_LOG_FILE, SQLTRACE_THRESHOLD_MS
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {}
+
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def normalize(sql: str) -> str:
+    """One line, IN (?, ?, ...) lists folded so chunked deletes group together."""
+    text = _WS.sub(" ", sql or "").strip()
+    return _IN_LIST.sub("(?,...)", text)
+
+
+def param_shape(params: Any) -> str:
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    try:
+        items = list(params)
+    except TypeError:
+        return type(params).__name__
+    names = [type(v).__name__ for v in items]
+    if len(names) > 8:
+        kinds = sorted(set(names))
+        return f"({len(names)} x {'/'.join(kinds)})"
+    return "(" + ", ".join(names) + ")"
+
+
+def _log(lines: List[str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(SQLTRACE_LOG_FILE)), exist_ok=True)
+        with open(SQLTRACE_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError:
+        pass
+
+
+def _record(conn: "TracedConnection", sql: str, params: Any, seconds: float, triggers: int) -> None:
+    key = normalize(sql)
+    shape = param_shape(params)
+    slow = seconds * 1000.0 >= SQLTRACE_THRESHOLD_MS
+    explain = False
+    with _lock:
+        st = _stats.get(key)
+        if st is None:
+            st = _stats[key] = {
+                "sql": key, "shapes": [], "count": 0, "total_s": 0.0, "max_s": 0.0,
+                "slow": 0, "trigger_stmts": 0, "plan": None,
+            }
+        st["count"] += 1
+        st["total_s"] += seconds
+        st["max_s"] = max(st["max_s"], seconds)
+        st["trigger_stmts"] += triggers
+        if shape not in st["shapes"] and len(st["shapes"]) < 5:
+            st["shapes"].append(shape)
+        if slow:
+            st["slow"] += 1
+            if st["plan"] is None:
+                st["plan"] = []  # claimed; filled below outside the lock
+                explain = True
+
+    if not slow:
+        return
+    lines = [f"{datetime.now():%Y-%m-%d %H:%M:%S} {seconds * 1000.0:9.1f} ms  {shape}  {key}"]
+    if triggers:
+        lines[0] += f"  [+{triggers} trigger stmts]"
+    if explain:
+        plan = conn.explain(sql, params)
+        with _lock:
+            st["plan"] = plan
+        lines.extend(f"    PLAN {p}" for p in plan)
+    _log(lines)
+
+
+# -----------------------------
+# Connection / cursor
+# -----------------------------
+class TracedCursor(sqlite3.Cursor):
+    def __init__(self, conn: "TracedConnection"):
+        super().__init__(conn)
+        self._tconn = conn
+        self._pending: Optional[list] = None  # [sql, params, seconds, triggers]
+
+    def _finish(self) -> None:
+        if self._pending is not None:
+            sql, params, seconds, triggers = self._pending
+            self._pending = None
+            _record(self._tconn, sql, params, seconds, triggers)
+
+    def _timed(self, fn, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - t0
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._tconn._traced = 0
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - t0, max(0, self._tconn._traced - 1)]
+            if self.description is None:
+                # No result rows (DML/DDL): done now.
+                self._finish()
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        seq = list(seq_of_parameters)
+        self._tconn._traced = 0
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, seq)
+        finally:
+            shape_params = seq[0] if seq else ()
+            _record(self._tconn, f"{sql} -- executemany", shape_params,
+                    time.perf_counter() - t0, max(0, self._tconn._traced - len(seq)))
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, size if size is not None else self.arraysize)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._traced = 0
+        self.set_trace_callback(self._on_trace)
+
+    def _on_trace(self, statement: str) -> None:
+        # One callback per statement, plus more for each trigger program it
+        # fires (the text of those varies by Python version, so only count).
+        self._traced += 1
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            _record(self, "-- executescript " + normalize(script)[:120], None, time.perf_counter() - t0, 0)
+
+    def explain(self, sql: str, params: Any) -> List[str]:
+        if not normalize(sql).upper().startswith(_EXPLAINABLE):
+            return []
+        try:
+            cur = sqlite3.Cursor(self)
+            rows = cur.execute(f"EXPLAIN QUERY PLAN {sql}", params if params is not None else ()).fetchall()
+            cur.close()
+        except sqlite3.Error as exc:
+            return [f"(EXPLAIN failed: {exc})"]
+        return [str(r[-1]) for r in rows]
+
+
+def enabled() -> bool:
+    return SQLTRACE_ENABLED
+
+
+def connect_kwargs() -> Dict[str, Any]:
+    """Extra sqlite3.connect() arguments: the traced factory when tracing is on."""
+    return {"factory": TracedConnection} if SQLTRACE_ENABLED else {}
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def report(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Statements ranked by total time (ms values rounded)."""
+    with _lock:
+        rows = [dict(st, shapes=list(st["shapes"]), plan=list(st["plan"] or [])) for st in _stats.values()]
+    rows.sort(key=lambda r: r["total_s"], reverse=True)
+    out = []
+    for r in rows[:limit]:
+        out.append({
+            "sql": r["sql"],
+            "count": r["count"],
+            "total_ms": round(r["total_s"] * 1000.0, 2),
+            "mean_ms": round(r["total_s"] / r["count"] * 1000.0, 3) if r["count"] else 0.0,
+            "max_ms": round(r["max_s"] * 1000.0, 2),
+            "slow": r["slow"],
+            "trigger_stmts": r["trigger_stmts"],
+            "shapes": r["shapes"],
+            "plan": r["plan"],
+            "full_scan": any(p.startswith("SCAN") for p in r["plan"]),
+        })
+    return out
+
+
+def format_report(limit: int = 30) -> str:
+    lines = [f"{'total ms':>10} {'count':>7} {'mean ms':>9} {'max ms':>9} {'slow':>5} {'sub':>6}  statement"]
+    for r in report(limit):
+        flag = " [SCAN]" if r["full_scan"] else ""
+        lines.append(
+            f"{r['total_ms']:10.1f} {r['count']:7d} {r['mean_ms']:9.2f} {r['max_ms']:9.1f} {r['slow']:5d} "
+            f"{r['trigger_stmts']:6d}  {r['sql'][:160]}{flag}"
+        )
+        for p in r["plan"]:
+            lines.append(f"{'':51s}PLAN {p}")
+    return "\n".join(lines)
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def write_report(path: Optional[str] = None) -> Optional[str]:
+    """Save the ranked report as JSON (and .txt) under LOGS_DIR. Returns the JSON path."""
+    if not _stats:
+        return None
+    path = path or os.path.join(LOGS_DIR, f"sqltrace_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"threshold_ms": SQLTRACE_THRESHOLD_MS, "statements": report()}, f, indent=2)
+    with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+        f.write(format_report(limit=100) + "\n")
+    return path
+
+
+if SQLTRACE_ENABLED:
+    atexit.register(write_report)
@@ -2,15 +2,30 @@
 import os
 import json
 from datetime import datetime
-from typing import Any, Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
 
 import pandas as pd
 
 from .config import (
     DATA_DIR,
     COLUMNS,
+    SERVICE_URL,
+)
+from .ids import new_id
+from .perf import timed
+from .db import (
+    CENTS_COLUMNS,
+    DIMENSION_ID_COLUMNS,
+    FLAG_CODES,
+    TYPED_ENTRY_COLUMNS,
+    fetch_archived_entries,
+    fetch_tool_entries,
+    fetch_tool_entries_by_ids,
+    fetch_tool_entries_range,
+    list_entry_months,
+    dimension_rows,
+    upsert_tool_entry,
 )
-from .db import fetch_tool_entries, list_entry_months, upsert_tool_entry
 
 # -----------------------------
 # JSON helpers (safe writes)
@@ -23,13 +38,8 @@ def load_json(path: str, default: Any):
         return default
         
 def parts_for_line(selected_line: str):
-    from .db import list_parts_with_lines
-    out = []
-    for p in list_parts_with_lines():
-        lines = p.get("lines", []) or []
-        if not selected_line or selected_line in lines:
-            out.append(p.get("part_number", ""))
-    return sorted([x for x in out if x])
+    from .db import list_parts_for_line
+    return list_parts_for_line(selected_line or "")
 
 def save_json(path: str, obj: Any) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -95,7 +105,8 @@ def ensure_df_schema(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def list_month_files() -> list[str]:
-    months = list_entry_months()
+    from .archive import archived_months
+    months = sorted(set(list_entry_months()) | set(archived_months()), reverse=True)
     if not months:
         months = [datetime.now().strftime("%Y-%m")]
     return months
@@ -107,12 +118,16 @@ def _normalize_month(value: Optional[str]) -> str:
     return datetime.now().strftime("%Y-%m")
 
 
+@timed()
 def get_df(filename: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
     """
     Load a month of entries from SQLite into DataFrame.
     Returns (df, month_key).
     """
     month = _normalize_month(filename)
+    from .archive import archived_months
+    if month in archived_months():
+        return load_entries_range(f"{month}-01", f"{month}-31"), month
     rows = fetch_tool_entries(month)
     if rows:
         df = pd.DataFrame(rows)
@@ -160,6 +175,67 @@ def get_df(filename: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
     return df, month
 
 
+@timed()
+def load_entries_range(start: str, end: str, columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Entries with start <= Date <= end (YYYY-MM-DD), merged from the closed-month
+    archive and the live table (live wins on a duplicate ID).
+    columns projects both reads to those ENTRY_COLUMNS; ID and Date are always kept.
+    TYPED_COLUMNS asked for come from the live table only (blank for archive rows).
+    """
+    from .archive import archived_months, months_between, read_archive
+
+    wanted = None
+    typed = []
+    if columns:
+        wanted = [c for c in ENTRY_COLUMNS if c in set(columns) | {"ID", "Date"}]
+        typed = [c for c in TYPED_COLUMNS if c in set(columns)]
+
+    frames = []
+    if SERVICE_URL:
+        # Thin terminal: the archive files are on the service host.
+        archived_rows = fetch_archived_entries(start, end, columns=wanted)
+        if archived_rows:
+            frames.append(pd.DataFrame(archived_rows))
+    else:
+        on_file = set(archived_months())
+        archived = [m for m in months_between(start, end) if m in on_file]
+        if archived:
+            frames.append(read_archive(archived, columns=wanted, start=start, end=end))
+
+    rows = fetch_tool_entries_range(start, end, columns=[c.lower() for c in wanted] + typed if wanted else None)
+    if rows:
+        frames.append(pd.DataFrame(rows).rename(columns={c.lower(): c for c in ENTRY_COLUMNS}))
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        df = pd.DataFrame(columns=wanted or ENTRY_COLUMNS)
+    else:
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        df = df.drop_duplicates(subset="ID", keep="last").reset_index(drop=True)
+
+    if wanted:
+        for c in wanted:
+            if c not in df.columns:
+                df[c] = ""
+        for c in typed:
+            if c not in df.columns:
+                df[c] = None
+        return df[wanted + typed]
+    return ensure_df_schema(df)
+
+
+@timed()
+def get_entries_by_ids(ids) -> pd.DataFrame:
+    """Live entries with these IDs, in ENTRY_COLUMNS (IDs no longer in the table are absent)."""
+    rows = fetch_tool_entries_by_ids(ids)
+    if not rows:
+        return pd.DataFrame(columns=ENTRY_COLUMNS)
+    df = pd.DataFrame(rows).rename(columns={c.lower(): c for c in ENTRY_COLUMNS})
+    return ensure_df_schema(df)
+
+
+@timed()
 def save_df(df: pd.DataFrame, filename: str) -> None:
     """
     Save DataFrame rows back to SQLite.
@@ -196,15 +272,129 @@ def safe_float(val: Any, default: float = 0.0) -> float:
         return default
 
 
+# -----------------------------
+# Typed entry columns (app/migrations.py)
+# -----------------------------
+# Live rows carry these next to ENTRY_COLUMNS (db names). They are blank for
+# archive rows and rows the backfill has not reached; the helpers below read
+# the typed value where there is one and convert the text only for the rest.
+TYPED_COLUMNS = list(TYPED_ENTRY_COLUMNS) + list(DIMENSION_ID_COLUMNS)
+_FLAG_CODE_COLUMNS = {
+    "Defects_Present": "defects_present_code",
+    "Sort_Done": "sort_done_code",
+    "Quality_Verified": "quality_verified_code",
+    "Leader_Sign": "leader_sign_code",
+    "Andon_Flag": "andon_flag_code",
+}
+_CENTS_COLUMNS = {"Cost": CENTS_COLUMNS["cost"], "COPQ_Est": CENTS_COLUMNS["copq_est"]}
+_DIMENSION_COLUMNS = {
+    "Line": "line_id",
+    "Part_Number": "part_id",
+    "Tool_Num": "tool_id",
+}
+
+
+def entry_dates(df: pd.DataFrame) -> pd.Series:
+    """Entry date (midnight) per row, NaT where Date does not parse."""
+    if "ts" in df.columns:
+        ts = pd.to_numeric(df["ts"], errors="coerce")
+        out = pd.to_datetime(ts, unit="s").dt.normalize().astype("datetime64[ns]")
+    else:
+        out = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    missing = out.isna()
+    if missing.any() and "Date" in df.columns:
+        out[missing] = pd.to_datetime(df.loc[missing, "Date"], errors="coerce")
+    return out
+
+
+def entry_times(df: pd.DataFrame) -> pd.Series:
+    """Entry date and time per row (the wall clock as entered), NaT where Date does not parse."""
+    if "ts" in df.columns:
+        ts = pd.to_numeric(df["ts"], errors="coerce")
+        out = pd.to_datetime(ts, unit="s").astype("datetime64[ns]")
+    else:
+        out = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    missing = out.isna()
+    if missing.any() and "Date" in df.columns:
+        stamp = df.loc[missing, "Date"].astype(str)
+        if "Time" in df.columns:
+            stamp = stamp + " " + df.loc[missing, "Time"].astype(str)
+        out[missing] = pd.to_datetime(stamp, errors="coerce")
+        still = out.isna() & missing
+        if still.any():
+            out[still] = pd.to_datetime(df.loc[still, "Date"], errors="coerce")
+    return out
+
+
+def flag_mask(df: pd.DataFrame, column: str, value: str = "Yes") -> pd.Series:
+    """Rows whose Yes/No/Pending column equals value (case-insensitive)."""
+    if column not in df.columns:
+        return pd.Series(False, index=df.index)
+    code_col = _FLAG_CODE_COLUMNS.get(column)
+    if code_col not in df.columns:
+        return df[column].astype(str).str.lower().eq(value.lower())
+    codes = pd.to_numeric(df[code_col], errors="coerce")
+    out = codes.eq(FLAG_CODES[value.lower()])
+    missing = codes.isna()
+    if missing.any():
+        out[missing] = df.loc[missing, column].astype(str).str.lower().eq(value.lower())
+    return out
+
+
+def entry_numbers(df: pd.DataFrame, column: str, *, integer: bool = False) -> pd.Series:
+    """
+    A numeric entry column as numbers (0 where blank or unreadable), vectorized:
+    the same values as safe_float / safe_int row by row. Cost and COPQ_Est come
+    from their cents columns where filled.
+    """
+    if column not in df.columns:
+        out = pd.Series(0.0, index=df.index)
+    else:
+        out = pd.to_numeric(df[column], errors="coerce")
+        cents_col = _CENTS_COLUMNS.get(column)
+        if cents_col in df.columns:
+            cents = pd.to_numeric(df[cents_col], errors="coerce")
+            out = (cents / 100.0).where(cents.notna(), out)
+        out = out.fillna(0.0)
+    if integer:
+        return out.where(out.abs() != float("inf"), 0.0).astype("int64")
+    return out.astype(float)
+
+
+def dimension_keys(df: pd.DataFrame, column: str) -> Tuple[pd.Series, Dict[int, str]]:
+    """
+    Integer group key per row for Line / Machine / Part_Number / Tool_Num, and
+    key -> display name. Keys are the tool_entries dimension ids; rows without
+    one (archive, not yet backfilled) are matched to an id by name, and names
+    with no id get negative keys of their own; Machine has no id column, so all
+    its keys are of that kind. Group on the keys, then map the names in for
+    display.
+    """
+    text = df[column].fillna("").astype(str) if column in df.columns else pd.Series("", index=df.index)
+    id_col = _DIMENSION_COLUMNS.get(column)
+    keys = pd.to_numeric(df[id_col], errors="coerce") if id_col in df.columns else pd.Series(float("nan"), index=df.index)
+    rows = dimension_rows(id_col) if id_col else []
+    labels = {int(r["id"]): str(r["name"]) for r in rows}
+    missing = keys.isna()
+    if missing.any():
+        names = pd.Series([r["name"] for r in rows], dtype=object)
+        unique = names[~names.duplicated(keep=False)]
+        by_name = {str(n): int(rows[i]["id"]) for i, n in unique.items()}
+        keys[missing] = text[missing].map(by_name)
+        missing = keys.isna()
+        if missing.any():
+            codes, uniques = pd.factorize(text[missing])
+            keys[missing] = -(codes + 1)
+            labels.update({-(i + 1): str(name) for i, name in enumerate(uniques)})
+    return keys.astype("int64"), labels
+
+
 # -----------------------------
 # ID helper
 # -----------------------------
 def next_id(df: Optional[pd.DataFrame] = None) -> str:
     """
-    Generates a reasonably unique ID for a new row.
-    Format: YYYYMMDD-HHMMSS-XXXX
+    Unique, time-ordered ID for a new entry row (see app/ids.py).
+    df is accepted for older callers and ignored.
     """
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    count = len(df) if df is not None else 0
-    suffix = str(count % 10000).zfill(4)
-    return f"{ts}-{suffix}"
+    return new_id()
@@ -0,0 +1,337 @@
+# app/submit_queue.py
+"""
+Durable local submit queue for shop-floor entries.
+
+submit_*() appends the entry to SUBMIT_QUEUE_FILE (one JSON line, fsynced)
+before touching SQLite, then makes one inline write attempt: a single batch,
+SUBMIT_INLINE_BUSY_MS of busy wait, no retries, and skipped altogether while
+the drainer is writing. If that does not get through, the entry waits on disk
+and the background drainer writes it once the lock clears, so a busy database
+never loses a tool change and never holds up the screen.
+
+Two locks: _lock guards the file and is only held to append, read or rewrite
+it; _drain_lock lets one drain run at a time and is never waited on by submit.
+
+- Order: entries are applied in the order they were appended.
+- Idempotent: every kind is an upsert keyed on the entry ID, and repeated
+  submits of the same ID collapse to the latest one, so replaying the file
+  after a crash is harmless. A tool_change's stock decrement and audit line
+  are only written with a new entry.
+- Entries that fail for another reason (bad data) move to
+  SUBMIT_QUEUE_FAILED_FILE instead of blocking the queue.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import db
+from .config import (
+    SUBMIT_INLINE_BUSY_MS,
+    SUBMIT_QUEUE_BATCH,
+    SUBMIT_QUEUE_DRAIN_SECONDS,
+    SUBMIT_QUEUE_FAILED_FILE,
+    SUBMIT_QUEUE_FILE,
+)
+
+# kind -> (db function name, key field)
+KINDS: Dict[str, Tuple[str, str]] = {
+    "tool_entry": ("upsert_tool_entry", "ID"),
+    "tool_change": ("record_tool_change", "ID"),  # entry + stock + audit (db.record_tool_change)
+    "operator_entry": ("upsert_operator_entry", "id"),
+}
+
+_lock = threading.RLock()        # the queue file
+_drain_lock = threading.Lock()   # one drain at a time
+_stats: Dict[str, Any] = {
+    "submitted": 0,
+    "drained": 0,
+    "failed": 0,
+    "last_drain_at": "",
+    "last_error": "",
+}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # Locked database, or the data service / share not reachable right now.
+    return db.is_lock_error(exc) or isinstance(exc, OSError)
+
+
+# -----------------------------
+# File
+# -----------------------------
+def _read_all(path: str = SUBMIT_QUEUE_FILE) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # Torn last line from a crash mid-append; everything before it is intact.
+                continue
+    return items
+
+
+def _append(path: str, records: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _rewrite(path: str, records: List[Dict[str, Any]]) -> None:
+    if not records:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# -----------------------------
+# Submit
+# -----------------------------
+def enqueue(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown submit kind: {kind}")
+    key_field = KINDS[kind][1]
+    key = str(payload.get(key_field) or "")
+    if not key:
+        raise ValueError(f"{kind} must include {key_field}")
+    rec = {
+        "kind": kind,
+        "key": key,
+        "queued_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "t": time.time(),
+        "payload": payload,
+    }
+    with _lock:
+        _append(SUBMIT_QUEUE_FILE, [rec])
+        _stats["submitted"] += 1
+    return rec
+
+
+def submit(kind: str, payload: Dict[str, Any]) -> bool:
+    """
+    Queue the entry durably, then try once to write it (and anything queued before it).
+    Returns True if it reached the database now, False if it is waiting in the queue.
+    """
+    rec = enqueue(kind, payload)
+    result = _drain(max_batches=1, inline=True)
+    if result is None:
+        return False  # the drainer is writing; it picks this entry up
+    _, poisoned = result
+    for failed in poisoned:
+        if failed["kind"] == kind and failed["key"] == rec["key"]:
+            raise ValueError(f"Entry {rec['key']} could not be saved: {failed['error']}")
+    return depth() == 0
+
+
+def submit_tool_entry(entry: Dict[str, Any], user: str = "", audit: str = "", take_tool: bool = False) -> bool:
+    """
+    Queue a tool_entries row. The audit line and the stock decrement (take_tool)
+    are written with it by the same queued write, never on the caller's thread.
+    """
+    if not (user or audit or take_tool):
+        return submit("tool_entry", entry)
+    change = {"ID": entry.get("ID"), "entry": entry, "user": user, "audit": audit, "take_tool": take_tool}
+    return submit("tool_change", change)
+
+
+def submit_operator_entry(entry: Dict[str, Any]) -> bool:
+    return submit("operator_entry", entry)
+
+
+# -----------------------------
+# Drain
+# -----------------------------
+def _collapse(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the last submit per (kind, key), at the position of that last submit."""
+    last = {}
+    for idx, rec in enumerate(items):
+        last[(rec.get("kind"), rec.get("key"))] = idx
+    return [rec for idx, rec in enumerate(items) if last[(rec.get("kind"), rec.get("key"))] == idx]
+
+
+def _apply(rec: Dict[str, Any]) -> None:
+    fn_name = KINDS[rec["kind"]][0]
+    getattr(db, fn_name)(rec["payload"])
+
+
+def _apply_batch(
+    batch: List[Dict[str, Any]],
+    busy_timeout_ms: Optional[int] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Write batch in one transaction. Returns (written, poisoned).
+    A lock error aborts the whole batch (nothing written) and is re-raised.
+    """
+    poisoned: List[Dict[str, Any]] = []
+    if db.SERVICE_URL:
+        # Thin client: the service group-commits; send one by one, in order.
+        for rec in batch:
+            try:
+                _apply(rec)
+            except Exception as exc:
+                if _is_retryable(exc):
+                    raise
+                poisoned.append({**rec, "error": str(exc)})
+        return len(batch) - len(poisoned), poisoned
+
+    with db.connect(busy_timeout_ms) as conn, db.bind_connection(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        for rec in batch:
+            conn.execute("SAVEPOINT entry")
+            try:
+                _apply(rec)
+                conn.execute("RELEASE entry")
+            except sqlite3.OperationalError as exc:
+                if db.is_lock_error(exc):
+                    raise
+                conn.execute("ROLLBACK TO entry")
+                conn.execute("RELEASE entry")
+                poisoned.append({**rec, "error": str(exc)})
+            except Exception as exc:
+                conn.execute("ROLLBACK TO entry")
+                conn.execute("RELEASE entry")
+                poisoned.append({**rec, "error": str(exc)})
+    return len(batch) - len(poisoned), poisoned
+
+
+def _drain(
+    max_batches: Optional[int] = None,
+    inline: bool = False,
+) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    drain(), returning (written, poisoned). inline: one attempt per batch with
+    SUBMIT_INLINE_BUSY_MS of busy wait, and None at once if a drain is running.
+    """
+    if not _drain_lock.acquire(blocking=not inline):
+        return None
+    written = 0
+    batches = 0
+    failed: List[Dict[str, Any]] = []
+    try:
+        with _lock:
+            items = _read_all()
+        if not items:
+            return 0, failed
+        pending = _collapse(items)
+        if inline:
+            apply = lambda batch: _apply_batch(batch, SUBMIT_INLINE_BUSY_MS)
+        else:
+            apply = db.retry_on_lock(_apply_batch)
+        try:
+            while pending and (max_batches is None or batches < max_batches):
+                batch = pending[:SUBMIT_QUEUE_BATCH]
+                n, poisoned = apply(batch)
+                pending = pending[len(batch):]
+                written += n
+                batches += 1
+                if poisoned:
+                    with _lock:
+                        _append(SUBMIT_QUEUE_FAILED_FILE, poisoned)
+                        _stats["failed"] += len(poisoned)
+                    failed.extend(poisoned)
+            _stats["last_error"] = ""
+        except Exception as exc:
+            if not _is_retryable(exc):
+                raise
+            _stats["last_error"] = str(exc)
+        finally:
+            with _lock:
+                # Only drains rewrite the file, so whatever follows the lines read
+                # above was appended meanwhile and stays queued after pending.
+                _rewrite(SUBMIT_QUEUE_FILE, pending + _read_all()[len(items):])
+                _stats["drained"] += written
+                _stats["last_drain_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    finally:
+        _drain_lock.release()
+    return written, failed
+
+
+def drain(max_batches: Optional[int] = None) -> int:
+    """
+    Write queued entries to the database in batches of SUBMIT_QUEUE_BATCH.
+    Stops at the first batch that hits a lock (retried on the next drain).
+    Waits for a drain already running. Returns entries written.
+    """
+    return _drain(max_batches)[0]
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+def depth() -> int:
+    with _lock:
+        return len(_read_all())
+
+
+def queue_stats() -> Dict[str, Any]:
+    """Queue depth and age plus the db lock-wait counters."""
+    with _lock:
+        items = _read_all()
+        out = dict(_stats)
+    out["depth"] = len(items)
+    out["oldest_age_s"] = round(time.time() - float(items[0].get("t", time.time())), 1) if items else 0.0
+    out["failed_file_exists"] = os.path.exists(SUBMIT_QUEUE_FAILED_FILE)
+    out.update({f"lock_{k}": v for k, v in db.lock_stats().items()})
+    return out
+
+
+# -----------------------------
+# Background drainer
+# -----------------------------
+class Drainer(threading.Thread):
+    def __init__(self, interval_s: float = SUBMIT_QUEUE_DRAIN_SECONDS, on_drained: Optional[Callable[[int], None]] = None):
+        super().__init__(daemon=True, name="submit-queue")
+        self.interval_s = max(0.5, float(interval_s))
+        self.on_drained = on_drained
+        self._stopping = threading.Event()  # not _stop: that name is Thread's own method
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run(self) -> None:
+        while not self._stopping.wait(self.interval_s):
+            try:
+                n = drain()
+            except Exception as exc:
+                _stats["last_error"] = str(exc)
+                continue
+            if n and self.on_drained:
+                self.on_drained(n)
+
+
+_drainer: Optional[Drainer] = None
+
+
+def start_drainer() -> Drainer:
+    """Start the process-wide drainer once (also flushes anything left from the last run)."""
+    global _drainer
+    if _drainer is None or not _drainer.is_alive():
+        _drainer = Drainer()
+        _drainer.start()
+    return _drainer
+
+
+def stop_drainer() -> None:
+    if _drainer is not None:
+        _drainer.stop()
@@ -0,0 +1,529 @@
+# app/sync.py
+"""
+Delta sync between workstations through a shared folder.
+
+Triggers on the synced tables write to change_log with a UTC timestamp and this
+station's id: one 'I' row per insert (field '*', the row as a JSON object), one
+'U' row per changed field on update, one 'D' row per delete. field_clock keeps
+the current (ts, station) version of each field ('*' = the whole inserted row).
+
+export: local changes since the last exported seq -> one gzip JSON bundle
+        <station>_<to_seq>.json.gz in the shared folder (compacted per field).
+import: peer bundles newer than that peer's watermark (sync_peers) are applied
+        field by field, last writer wins on (ts, station). Re-importing a bundle
+        is a no-op.
+
+Rows are matched on their natural key, so autoincrement ids never travel.
+Join tables keyed by local integer ids (tool_lines, tool_parts, part_lines,
+tool_inserts, part_costs) are not synced.
+
+Two files can be synced locally:
+    python -m app.sync --db a.db sync /tmp/shared
+    python -m app.sync --db b.db sync /tmp/shared
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .db import DIMENSION_ID_COLUMNS, _dimension_ids_sql, connect
+
+# table -> natural key column
+SYNC_TABLES = {
+    "tool_entries": "id",
+    "operator_entries": "id",
+    "actions": "action_id",
+    "ncrs": "ncr_id",
+    "tools": "tool_num",
+    "parts": "part_number",
+    "lines": "name",
+    "downtime_codes": "code",
+    "production_goals": "line",
+}
+
+# tool_entries columns its dimension keys are looked up from
+_ENTRY_NAME_COLUMNS = {"line", "cell", "machine", "part_number", "tool_num"}
+
+BUNDLE_FORMAT = 1
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f','now')"
+_STATION = "(SELECT value FROM meta WHERE key='station_id')"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tbl TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    field TEXT NOT NULL DEFAULT '',
+    value,
+    ts TEXT NOT NULL,
+    station TEXT NOT NULL,
+    op TEXT NOT NULL DEFAULT 'U'
+);
+
+CREATE TABLE IF NOT EXISTS field_clock (
+    tbl TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    station TEXT NOT NULL,
+    PRIMARY KEY(tbl, row_key, field)
+);
+
+CREATE TABLE IF NOT EXISTS sync_peers (
+    station TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS change_log_clock AFTER INSERT ON change_log
+BEGIN
+    INSERT INTO field_clock(tbl, row_key, field, ts, station)
+    VALUES (NEW.tbl, NEW.row_key, NEW.field, NEW.ts, NEW.station)
+    ON CONFLICT(tbl, row_key, field) DO UPDATE SET ts=excluded.ts, station=excluded.station;
+END;
+"""
+
+
+# -----------------------------
+# Install
+# -----------------------------
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL;")
+    return conn
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _synced_columns(conn: sqlite3.Connection, table: str, key: str) -> List[str]:
+    # Local autoincrement ids (and tool_entries' dimension keys) are meaningless on another station.
+    return [
+        c for c in _table_columns(conn, table)
+        if c != key and c != "id" and c not in DIMENSION_ID_COLUMNS
+    ]
+
+
+def _trigger_sql(table: str, key: str, cols: List[str]) -> List[str]:
+    ins_json = ", ".join(f"'{c}', NEW.{c}" for c in cols)
+    upd_select = "\n                UNION ALL ".join(
+        f"SELECT '{c}' AS f, NEW.{c} AS v WHERE OLD.{c} IS NOT NEW.{c}" for c in cols
+    )
+    sql = [
+        f"DROP TRIGGER IF EXISTS sync_{table}_ins",
+        f"DROP TRIGGER IF EXISTS sync_{table}_upd",
+        f"DROP TRIGGER IF EXISTS sync_{table}_del",
+        f"""
+        CREATE TRIGGER sync_{table}_ins AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO change_log(tbl, row_key, field, value, ts, station, op)
+            VALUES ('{table}', NEW.{key}, '*', json_object({ins_json}), {_NOW}, {_STATION}, 'I');
+        END
+        """,
+        f"""
+        CREATE TRIGGER sync_{table}_del AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO change_log(tbl, row_key, field, value, ts, station, op)
+            VALUES ('{table}', OLD.{key}, '', NULL, {_NOW}, {_STATION}, 'D');
+        END
+        """,
+    ]
+    if cols:
+        # Key-only tables (lines) have nothing to update.
+        sql.append(f"""
+        CREATE TRIGGER sync_{table}_upd AFTER UPDATE ON {table}
+        BEGIN
+            INSERT INTO change_log(tbl, row_key, field, value, ts, station, op)
+            SELECT '{table}', NEW.{key}, f, v, {_NOW}, {_STATION}, 'U' FROM (
+                {upd_select}
+            );
+        END
+        """)
+    return sql
+
+
+def install(conn: sqlite3.Connection) -> str:
+    """
+    Create the sync tables, give this database a station id and (re)build the
+    triggers from the current columns. Safe to call on every start.
+    Returns the station id.
+    """
+    conn.executescript(SCHEMA)
+    station = station_id(conn)
+    for table, key in SYNC_TABLES.items():
+        if not _table_columns(conn, table):
+            continue
+        for sql in _trigger_sql(table, key, _synced_columns(conn, table, key)):
+            conn.execute(sql)
+    conn.commit()
+    return station
+
+
+def station_id(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key='station_id'").fetchone()
+    if row and row["value"]:
+        return row["value"]
+    sid = uuid.uuid4().hex[:12]
+    conn.execute("INSERT INTO meta(key, value) VALUES('station_id', ?)", (sid,))
+    return sid
+
+
+def _meta(conn: sqlite3.Connection, key: str, default: str = "") -> str:
+    row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    return row["value"] if row else default
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute(
+        "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, value),
+    )
+
+
+def sync_state(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """This station's sync identity: station id, export watermark and peer watermarks."""
+    peers = []
+    if _table_columns(conn, "sync_peers"):
+        peers = [dict(r) for r in conn.execute("SELECT station, last_seq, updated_at FROM sync_peers")]
+    return {
+        "station_id": _meta(conn, "station_id"),
+        "sync_export_seq": int(_meta(conn, "sync_export_seq", "0") or 0),
+        "peers": peers,
+    }
+
+
+def restore_sync_state(conn: sqlite3.Connection, state: Dict[str, Any]) -> None:
+    """
+    Put sync_state() back after the database file was replaced (a restore).
+    The replaced file's change_log counts as exported and new local changes are
+    numbered above both watermarks, so peers neither receive the restored rows
+    as ours nor skip the changes made after the restore.
+    """
+    if not state.get("station_id"):
+        return
+    conn.executescript(SCHEMA)
+    top = conn.execute(
+        "SELECT MAX(COALESCE((SELECT MAX(seq) FROM change_log), 0), "
+        "COALESCE((SELECT seq FROM sqlite_sequence WHERE name='change_log'), 0), ?) AS s",
+        (int(state.get("sync_export_seq") or 0),),
+    ).fetchone()["s"]
+    if conn.execute("UPDATE sqlite_sequence SET seq=? WHERE name='change_log'", (top,)).rowcount == 0:
+        conn.execute("INSERT INTO sqlite_sequence(name, seq) VALUES('change_log', ?)", (top,))
+    _set_meta(conn, "station_id", state["station_id"])
+    _set_meta(conn, "sync_export_seq", str(top))
+    conn.execute("DELETE FROM sync_peers")
+    conn.executemany(
+        "INSERT INTO sync_peers(station, last_seq, updated_at) VALUES (?, ?, ?)",
+        [(p["station"], p["last_seq"], p["updated_at"]) for p in state.get("peers", [])],
+    )
+    conn.commit()
+
+
+@contextmanager
+def unlogged(conn: sqlite3.Connection):
+    """
+    Writes made inside are not recorded as local changes (applied peer bundles,
+    archive purges, file imports). Holds the write lock for the block.
+
+    A temp trigger keeps the clock each touched field had before its first
+    write in the block (NULL ts: none), so the clocks are put back as they were.
+    """
+    if not _table_columns(conn, "change_log"):
+        yield
+        return
+    if conn.execute("SELECT 1 FROM sqlite_temp_master WHERE name='unlogged_clock'").fetchone():
+        # Nested: the outer block puts the clocks back.
+        yield
+        return
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    before = conn.execute("SELECT COALESCE(MAX(seq), 0) AS s FROM change_log").fetchone()["s"]
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS unlogged_clocks ("
+        "tbl TEXT, row_key TEXT, field TEXT, ts TEXT, station TEXT, PRIMARY KEY(tbl, row_key, field))"
+    )
+    conn.execute(
+        """
+        CREATE TEMP TRIGGER unlogged_clock BEFORE INSERT ON main.change_log
+        BEGIN
+            INSERT OR IGNORE INTO unlogged_clocks(tbl, row_key, field, ts, station)
+            SELECT NEW.tbl, NEW.row_key, NEW.field, c.ts, c.station
+            FROM (SELECT 1) LEFT JOIN main.field_clock c
+              ON c.tbl = NEW.tbl AND c.row_key = NEW.row_key AND c.field = NEW.field;
+        END
+        """
+    )
+    try:
+        yield
+    finally:
+        conn.execute("DROP TRIGGER IF EXISTS temp.unlogged_clock")
+        conn.execute(
+            "DELETE FROM main.field_clock WHERE (tbl, row_key, field) IN "
+            "(SELECT tbl, row_key, field FROM unlogged_clocks)"
+        )
+        conn.execute(
+            "INSERT INTO main.field_clock(tbl, row_key, field, ts, station) "
+            "SELECT tbl, row_key, field, ts, station FROM unlogged_clocks WHERE ts IS NOT NULL"
+        )
+        conn.execute("DELETE FROM change_log WHERE seq > ?", (before,))
+        conn.execute("DROP TABLE IF EXISTS temp.unlogged_clocks")
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def export_bundle(conn: sqlite3.Connection, folder: str) -> Optional[str]:
+    """Write local changes since the last export to folder. Returns the bundle path or None."""
+    station = station_id(conn)
+    since = int(_meta(conn, "sync_export_seq", "0") or 0)
+    rows = conn.execute(
+        "SELECT seq, tbl, row_key, field, value, ts, op FROM change_log "
+        "WHERE seq > ? AND station = ? ORDER BY seq",
+        (since, station),
+    ).fetchall()
+    if not rows:
+        return None
+
+    # Only the last write of each field (or the delete) matters to a peer.
+    seen = set()
+    changes = []
+    for r in reversed(rows):
+        k = (r["tbl"], r["row_key"], r["field"])
+        if k in seen:
+            continue
+        seen.add(k)
+        changes.append([r["seq"], r["tbl"], r["row_key"], r["field"], r["value"], r["ts"], r["op"]])
+    changes.reverse()
+
+    to_seq = rows[-1]["seq"]
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "station": station,
+        "from_seq": since,
+        "to_seq": to_seq,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "changes": changes,
+    }
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{station}_{to_seq:012d}.json.gz")
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(bundle, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+    _set_meta(conn, "sync_export_seq", str(to_seq))
+    conn.commit()
+    return path
+
+
+# -----------------------------
+# Import
+# -----------------------------
+Clock = Tuple[str, str]
+
+
+def _load_clock(conn, cache: Dict, tbl: str, key: str, field: str) -> Clock:
+    k = (tbl, key, field)
+    if k not in cache:
+        row = conn.execute(
+            "SELECT ts, station FROM field_clock WHERE tbl=? AND row_key=? AND field=?", k
+        ).fetchone()
+        cache[k] = (row["ts"], row["station"]) if row else ("", "")
+    return cache[k]
+
+
+def _field_clock(conn, cache: Dict, tbl: str, key: str, field: str) -> Clock:
+    """Version of one field: its own write, the row insert or the row delete, whichever is newest."""
+    return max(
+        _load_clock(conn, cache, tbl, key, field),
+        _load_clock(conn, cache, tbl, key, "*"),
+        _load_clock(conn, cache, tbl, key, ""),
+    )
+
+
+def _row_clock(conn, cache: Dict, tbl: str, key: str) -> Clock:
+    row = conn.execute(
+        "SELECT MAX(ts || '|' || station) AS v FROM field_clock WHERE tbl=? AND row_key=?",
+        (tbl, key),
+    ).fetchone()
+    best: Clock = tuple(row["v"].split("|", 1)) if row and row["v"] else ("", "")
+    for (t, k, _), clock in cache.items():
+        if t == tbl and k == key and clock > best:
+            best = clock
+    return best
+
+
+def _write_row(conn, tbl: str, key: str, deleted: bool, fields: Dict[str, Any]) -> None:
+    key_col = SYNC_TABLES[tbl]
+    if deleted:
+        conn.execute(f"DELETE FROM {tbl} WHERE {key_col}=?", (key,))
+    if not fields:
+        return
+    known = set(_table_columns(conn, tbl))
+    fields = {c: v for c, v in fields.items() if c in known}
+    exists = conn.execute(f"SELECT 1 FROM {tbl} WHERE {key_col}=?", (key,)).fetchone()
+    if exists:
+        if fields:
+            sets = ", ".join(f"{c}=?" for c in fields)
+            conn.execute(f"UPDATE {tbl} SET {sets} WHERE {key_col}=?", [*fields.values(), key])
+    else:
+        cols = [key_col, *fields]
+        marks = ", ".join(["?"] * len(cols))
+        try:
+            conn.execute(
+                f"INSERT INTO {tbl} ({', '.join(cols)}) VALUES ({marks})",
+                [key, *fields.values()],
+            )
+        except sqlite3.IntegrityError:
+            # Partial row (created before sync was installed on the peer); nothing to anchor it to.
+            return
+    if tbl == "tool_entries" and _ENTRY_NAME_COLUMNS & set(fields):
+        # Dimension keys are local ids, not synced: look them up here, on this
+        # connection, so master data applied earlier in the bundle is seen.
+        sets = ", ".join(f"{c} = {sql}" for c, sql in _dimension_ids_sql("tool_entries").items())
+        conn.execute(f"UPDATE tool_entries SET {sets} WHERE {key_col}=?", (key,))
+
+
+def apply_bundle(conn: sqlite3.Connection, bundle: Dict[str, Any]) -> int:
+    """Apply one peer bundle. Returns the number of field changes that won."""
+    peer = bundle.get("station", "")
+    if not peer or peer == station_id(conn) or bundle.get("format") != BUNDLE_FORMAT:
+        return 0
+    row = conn.execute("SELECT last_seq FROM sync_peers WHERE station=?", (peer,)).fetchone()
+    last = row["last_seq"] if row else 0
+    changes = [c for c in bundle.get("changes", []) if c[0] > last]
+    if not changes:
+        return 0
+
+    cache: Dict[Tuple[str, str, str], Clock] = {}
+    pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    won: List[Tuple[str, str, str, str]] = []
+
+    for seq, tbl, key, field, value, ts, op in changes:
+        if tbl not in SYNC_TABLES:
+            continue
+        incoming: Clock = (ts, peer)
+        state = pending.setdefault((tbl, key), {"deleted": False, "fields": {}})
+        if op == "D":
+            if incoming > _row_clock(conn, cache, tbl, key):
+                state["deleted"] = True
+                state["fields"] = {}
+                cache[(tbl, key, "")] = incoming
+                won.append((tbl, key, "", ts))
+            continue
+        if op == "I":
+            values = json.loads(value) if isinstance(value, str) else (value or {})
+            for f, v in values.items():
+                if incoming > _field_clock(conn, cache, tbl, key, f):
+                    state["fields"][f] = v
+            if incoming > _load_clock(conn, cache, tbl, key, "*"):
+                cache[(tbl, key, "*")] = incoming
+                won.append((tbl, key, "*", ts))
+            continue
+        if incoming > _field_clock(conn, cache, tbl, key, field):
+            state["fields"][field] = value
+            cache[(tbl, key, field)] = incoming
+            won.append((tbl, key, field, ts))
+
+    with unlogged(conn):
+        for (tbl, key), state in pending.items():
+            _write_row(conn, tbl, key, state["deleted"], state["fields"])
+
+    conn.executemany(
+        "INSERT INTO field_clock(tbl, row_key, field, ts, station) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(tbl, row_key, field) DO UPDATE SET ts=excluded.ts, station=excluded.station",
+        [(t, k, f, ts, peer) for t, k, f, ts in won],
+    )
+    conn.execute(
+        "INSERT INTO sync_peers(station, last_seq, updated_at) VALUES (?, ?, datetime('now')) "
+        "ON CONFLICT(station) DO UPDATE SET last_seq=excluded.last_seq, updated_at=excluded.updated_at",
+        (peer, max(last, int(bundle.get("to_seq", 0) or 0))),
+    )
+    conn.commit()
+    return len(won)
+
+
+def import_folder(conn: sqlite3.Connection, folder: str) -> Dict[str, int]:
+    """Apply every peer bundle in folder, oldest first. Returns {bundle file: changes applied}."""
+    if not os.path.isdir(folder):
+        return {}
+    own = station_id(conn)
+    out = {}
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".json.gz") or name.startswith(own + "_"):
+            continue
+        try:
+            with gzip.open(os.path.join(folder, name), "rt", encoding="utf-8") as f:
+                bundle = json.load(f)
+        except (OSError, ValueError):
+            continue
+        n = apply_bundle(conn, bundle)
+        if n:
+            out[name] = n
+    return out
+
+
+def prune_change_log(conn: sqlite3.Connection, keep_days: int = 30) -> int:
+    """Drop exported change_log rows older than keep_days (field_clock keeps the versions)."""
+    exported = int(_meta(conn, "sync_export_seq", "0") or 0)
+    cur = conn.execute(
+        "DELETE FROM change_log WHERE seq <= ? AND ts < strftime('%Y-%m-%dT%H:%M:%f','now', ?)",
+        (exported, f"-{int(keep_days)} days"),
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def sync_folder_conn(conn: sqlite3.Connection, folder: str) -> Dict[str, Any]:
+    imported = import_folder(conn, folder)
+    exported = export_bundle(conn, folder)
+    prune_change_log(conn)
+    return {"exported": exported, "imported": imported}
+
+
+# -----------------------------
+# App entry points (live database)
+# -----------------------------
+def install_sync() -> str:
+    with connect() as conn:
+        return install(conn)
+
+
+def sync_folder(folder: str) -> Dict[str, Any]:
+    """Import peer bundles from folder, then export ours into it."""
+    with connect() as conn:
+        return sync_folder_conn(conn, folder)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .config import DB_PATH
+
+    ap = argparse.ArgumentParser(description="Delta sync through a shared folder")
+    ap.add_argument("--db", default=DB_PATH, help="database file (default: the app database)")
+    ap.add_argument("command", choices=["install", "export", "import", "sync"])
+    ap.add_argument("folder", nargs="?", default="")
+    args = ap.parse_args()
+
+    c = _open(args.db)
+    try:
+        sid = install(c)
+        if args.command == "install":
+            print(f"station {sid}")
+        elif args.command == "export":
+            print(export_bundle(c, args.folder) or "nothing to export")
+        elif args.command == "import":
+            print(import_folder(c, args.folder))
+        else:
+            print(sync_folder_conn(c, args.folder))
+    finally:
+        c.close()
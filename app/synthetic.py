@@ -0,0 +1,319 @@
+# app/synthetic.py
+"""
+Deterministic synthetic data for load and benchmark runs.
+
+generate(spec) fills tool_entries (typed columns included, via the
+app/migrations.py backfill), actions, ncrs and audit_logs (plus the
+lines/parts/tools master data they refer to) and returns a gages store in the
+gages.json shape. The same spec (seed and end date included) always produces
+the same rows, so benchmark numbers are comparable across commits.
+
+Rows are inserted with INSERT OR REPLACE on their IDs; audit_logs has no
+natural key, so run this against a scratch database, not a station's live one.
+
+Run:  python -m app.synthetic --db scratch.db [--lines 3 --machines 20 --years 3]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from .db import (
+    connect,
+    ensure_lines,
+    init_db,
+    replace_tool_inserts,
+    set_tool_lines,
+    set_tool_parts,
+    upsert_part,
+    upsert_tool,
+)
+from .migrations import backfill
+from .storage import ENTRY_COLUMNS
+from .sync import unlogged
+
+CHUNK_ROWS = 5000
+
+REASONS = ["Worn", "Broken", "Chipped", "Scheduled", "Size Adjustment", "Finish", "Setup"]
+DEFECT_REASONS = ["Oversize", "Undersize", "Burr", "Chatter", "Scratch", "Porosity"]
+SHIFTS = [("3rd", 0), ("1st", 7), ("2nd", 15), ("3rd", 23)]
+
+
+@dataclass
+class SyntheticSpec:
+    lines: int = 3
+    machines_per_line: int = 20
+    years: float = 3.0
+    # Average tool changes per machine per day.
+    entries_per_machine_day: float = 2.0
+    tools_per_line: int = 24
+    parts_per_line: int = 8
+    gages: int = 60
+    defect_rate: float = 0.12
+    andon_rate: float = 0.01
+    action_rate: float = 0.15   # of defect entries
+    ncr_rate: float = 0.05      # of defect entries
+    seed: int = 42
+    end: Optional[date] = None  # default: today
+    line_names: List[str] = field(default_factory=list)
+
+    def names(self) -> List[str]:
+        if self.line_names:
+            return list(self.line_names)[: self.lines]
+        return [f"L{i + 1}" for i in range(self.lines)]
+
+    def end_date(self) -> date:
+        return self.end or date.today()
+
+    def start_date(self) -> date:
+        return self.end_date() - timedelta(days=int(round(self.years * 365)) - 1)
+
+
+def _shift(hour: int) -> str:
+    name = SHIFTS[0][0]
+    for label, starts in SHIFTS:
+        if hour >= starts:
+            name = label
+    return name
+
+
+def _insert(conn, table: str, columns: List[str], rows: Iterator[tuple]) -> int:
+    sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+    n = 0
+    chunk: List[tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_ROWS:
+            conn.executemany(sql, chunk)
+            n += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(sql, chunk)
+        n += len(chunk)
+    return n
+
+
+def gages_store(spec: SyntheticSpec) -> Dict[str, Any]:
+    rnd = random.Random(spec.seed + 1)
+    end = spec.end_date()
+    gages = []
+    for i in range(spec.gages):
+        freq = rnd.choice([90, 180, 365])
+        # Roughly 10% overdue, 10% due soon.
+        age = int(freq * rnd.choice([0.2, 0.4, 0.6, 0.8, 0.95, 0.97, 0.99, 1.05, 1.2, 0.5]))
+        gages.append({
+            "gage_id": f"G{i + 1:04d}",
+            "name": f"Gage {i + 1}",
+            "type": rnd.choice(["Caliper", "Micrometer", "Bore Gage", "Height Gage", "Other"]),
+            "criticality": rnd.choice(["Low", "Medium", "Medium", "High", "Critical"]),
+            "calibration_frequency_days": freq,
+            "last_calibration_date": (end - timedelta(days=age)).strftime("%Y-%m-%d"),
+        })
+    return {"gages": gages}
+
+
+def _master_data(spec: SyntheticSpec) -> Dict[str, Any]:
+    lines = spec.names()
+    ensure_lines(lines)
+    parts: Dict[str, List[str]] = {}
+    tools: Dict[str, List[str]] = {}
+    rnd = random.Random(spec.seed + 2)
+    for ln in lines:
+        parts[ln] = [f"P{ln}-{k + 1:03d}" for k in range(spec.parts_per_line)]
+        for pn in parts[ln]:
+            upsert_part(pn, name=f"Part {pn}", lines=[ln])
+        tools[ln] = [str(t + 1) for t in range(spec.tools_per_line)]
+    for tool in sorted({t for ts in tools.values() for t in ts}, key=int):
+        upsert_tool(tool, name=f"Tool {tool}", unit_cost=round(rnd.uniform(8, 120), 2))
+        tool_lines = [ln for ln in lines if tool in tools[ln]]
+        set_tool_lines(tool, tool_lines)
+        set_tool_parts(tool, [rnd.choice(parts[ln]) for ln in tool_lines for _ in range(2)])
+        replace_tool_inserts(tool, [{
+            "insert_name": f"INS-{tool}",
+            "insert_count": rnd.choice([1, 2, 4]),
+            "price_per_insert": round(rnd.uniform(4, 40), 2),
+            "sides_per_insert": rnd.choice([1, 2, 3]),
+            "tool_life": rnd.choice([200, 400, 800]),
+        }])
+    return {"lines": lines, "parts": parts, "tools": tools}
+
+
+def _entries(spec: SyntheticSpec, master: Dict[str, Any], gage_ids: List[str], out: Dict[str, list]) -> Iterator[tuple]:
+    """Yields tool_entries rows in ENTRY_COLUMNS order; collects defect entries for actions/NCRs in out."""
+    rnd = random.Random(spec.seed)
+    day = spec.start_date()
+    end = spec.end_date()
+    seq = 0
+    users = [f"tc{i + 1:02d}" for i in range(12)]
+    while day <= end:
+        for ln in master["lines"]:
+            for m in range(spec.machines_per_line):
+                machine = f"{ln}-M{m + 1:02d}"
+                count = rnd.randint(0, int(round(spec.entries_per_machine_day * 2)))
+                for _ in range(count):
+                    seq += 1
+                    hour, minute = rnd.randrange(24), rnd.randrange(60)
+                    defects = rnd.random() < spec.defect_rate
+                    qty = rnd.randint(1, 40) if defects else 0
+                    andon = rnd.random() < spec.andon_rate
+                    risk = rnd.choices(["", "Low", "Medium", "High", "Critical"], [70, 12, 10, 6, 2])[0] if defects else ""
+                    entry_id = f"SYN-{day.strftime('%Y%m%d')}-{seq:08d}"
+                    d = day.strftime("%Y-%m-%d")
+                    t = f"{hour:02d}:{minute:02d}:00"
+                    verified = "Yes" if defects and rnd.random() < 0.8 else ("Pending" if defects else "N/A")
+                    row = {
+                        "ID": entry_id,
+                        "Date": d,
+                        "Time": t,
+                        "Shift": _shift(hour),
+                        "Line": ln,
+                        "Cell": f"C{m // 5 + 1}",
+                        "Machine": machine,
+                        "Part_Number": rnd.choice(master["parts"][ln]),
+                        "Tool_Num": rnd.choice(master["tools"][ln]),
+                        "Reason": rnd.choice(REASONS),
+                        "Downtime_Mins": float(rnd.randint(0, 45)),
+                        "Production_Qty": float(rnd.randint(50, 800)),
+                        "Cost": round(rnd.uniform(8, 120), 2),
+                        "Tool_Life": float(rnd.randint(200, 5000)),
+                        "Tool_Changer": rnd.choice(users),
+                        "Defects_Present": "Yes" if defects else "No",
+                        "Defect_Qty": float(qty),
+                        "Sort_Done": "Yes" if defects and rnd.random() < 0.6 else "No",
+                        "Defect_Reason": rnd.choice(DEFECT_REASONS) if defects else "",
+                        "Quality_Verified": verified,
+                        "Quality_User": "qa01" if verified == "Yes" else "",
+                        "Quality_Time": f"{d} {t}" if verified == "Yes" else "",
+                        "Leader_Sign": "Yes" if rnd.random() < 0.9 else "Pending",
+                        "Leader_User": "lead01",
+                        "Leader_Time": f"{d} {t}",
+                        "Serial_Numbers": "",
+                        "Andon_Flag": "Yes" if andon else "No",
+                        "Customer_Risk": risk,
+                        "QC_Status": "Verified" if verified == "Yes" else "",
+                        "NCR_ID": "",
+                        "NCR_Status": "",
+                        "NCR_Close_Date": "",
+                        "Action_Status": "",
+                        "Action_Due_Date": "",
+                        "Gage_Used": rnd.choice(gage_ids) if gage_ids and rnd.random() < 0.3 else "",
+                        "COPQ_Est": round(qty * rnd.uniform(5, 150), 2),
+                    }
+                    if defects:
+                        if rnd.random() < spec.ncr_rate:
+                            row["NCR_ID"] = f"NCR-SYN-{seq:08d}"
+                            closed = day < end - timedelta(days=30) and rnd.random() < 0.85
+                            row["NCR_Status"] = "Closed" if closed else "Open"
+                            row["NCR_Close_Date"] = (day + timedelta(days=rnd.randint(1, 30))).strftime("%Y-%m-%d") if closed else ""
+                            out["ncrs"].append(row)
+                        if rnd.random() < spec.action_rate:
+                            due = day + timedelta(days=rnd.randint(3, 30))
+                            row["Action_Status"] = "Closed" if due < end and rnd.random() < 0.8 else "Open"
+                            row["Action_Due_Date"] = due.strftime("%Y-%m-%d")
+                            out["actions"].append(row)
+                    out["audit"].append((f"{d} {t}", row["Tool_Changer"], f"Tool change entry {entry_id} saved"))
+                    yield tuple(row[c] for c in ENTRY_COLUMNS)
+        day += timedelta(days=1)
+
+
+def _actions(rows: List[Dict[str, Any]]) -> Iterator[tuple]:
+    for r in rows:
+        created = f"{r['Date']} {r['Time']}"
+        closed = r["Action_Status"] == "Closed"
+        yield (
+            f"ACT-SYN-{r['ID'][-8:]}", "Action", f"Contain {r['Defect_Reason']} on {r['Part_Number']}",
+            "High" if r["Customer_Risk"] in ("High", "Critical") else "Medium",
+            r["Action_Status"], "lead01", r["Tool_Changer"], created, created,
+            r["Action_Due_Date"], r["Line"], r["Part_Number"], r["NCR_ID"], r["ID"],
+            "", r["Action_Due_Date"] + " 12:00:00" if closed else "", "lead01" if closed else "",
+        )
+
+
+def _ncrs(rows: List[Dict[str, Any]]) -> Iterator[tuple]:
+    for r in rows:
+        created = f"{r['Date']} {r['Time']}"
+        yield (
+            r["NCR_ID"], r["NCR_Status"], r["Part_Number"], r["Line"], "qa01",
+            f"{r['Defect_Reason']} x{int(r['Defect_Qty'])} on {r['Machine']}",
+            created, created, r["Tool_Changer"], r["NCR_Close_Date"], r["ID"], "",
+        )
+
+
+ACTION_COLUMNS = [
+    "action_id", "type", "title", "severity", "status", "owner", "created_by", "created_at",
+    "updated_at", "due_date", "line", "part_number", "related_ncr_id", "related_entry_id",
+    "notes", "closed_at", "closed_by",
+]
+NCR_COLUMNS = [
+    "ncr_id", "status", "part_number", "line", "owner", "description", "created_at",
+    "updated_at", "created_by", "close_date", "related_entry_id", "action_id",
+]
+
+
+def generate(spec: Optional[SyntheticSpec] = None) -> Dict[str, Any]:
+    """Fill the current database (app.db DB_PATH). Returns row counts and the gages store."""
+    spec = spec or SyntheticSpec()
+    init_db()
+    master = _master_data(spec)
+    gages = gages_store(spec)
+    gage_ids = [g["gage_id"] for g in gages["gages"]]
+    collected: Dict[str, list] = {"actions": [], "ncrs": [], "audit": []}
+
+    with connect() as conn, unlogged(conn):
+        n_entries = _insert(
+            conn, "tool_entries", [c.lower() for c in ENTRY_COLUMNS],
+            _entries(spec, master, gage_ids, collected),
+        )
+        n_actions = _insert(conn, "actions", ACTION_COLUMNS, _actions(collected["actions"]))
+        n_ncrs = _insert(conn, "ncrs", NCR_COLUMNS, _ncrs(collected["ncrs"]))
+        conn.executemany(
+            "INSERT INTO audit_logs(created_at, username, action) VALUES(?, ?, ?)",
+            collected["audit"],
+        )
+    backfill()
+
+    return {
+        "tool_entries": n_entries,
+        "actions": n_actions,
+        "ncrs": n_ncrs,
+        "audit_logs": len(collected["audit"]),
+        "gages": len(gage_ids),
+        "start": spec.start_date().strftime("%Y-%m-%d"),
+        "end": spec.end_date().strftime("%Y-%m-%d"),
+        "gages_store": gages,
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    from . import db
+
+    parser = argparse.ArgumentParser(description="Fill a scratch database with synthetic data")
+    parser.add_argument("--db", required=True, help="target SQLite file (created if missing)")
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--years", type=float, default=3.0)
+    parser.add_argument("--rate", type=float, default=2.0, help="tool changes per machine per day")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", default="", help="last day (YYYY-MM-DD), default today")
+    parser.add_argument("--gages-file", default="", help="also write the gages store here")
+    args = parser.parse_args()
+
+    db.DB_PATH = args.db
+    result = generate(SyntheticSpec(
+        lines=args.lines,
+        machines_per_line=args.machines,
+        years=args.years,
+        entries_per_machine_day=args.rate,
+        seed=args.seed,
+        end=datetime.strptime(args.end, "%Y-%m-%d").date() if args.end else None,
+    ))
+    store = result.pop("gages_store")
+    if args.gages_file:
+        with open(args.gages_file, "w", encoding="utf-8") as f:
+            json.dump(store, f, indent=2)
+    print(json.dumps(result, indent=2))
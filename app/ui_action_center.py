@@ -3,8 +3,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 
 from .ui_common import HeaderFrame
+from .catalog import get_catalog
+from .config import ACTIONS_PAGE_SIZE
+from .events import ACTIONS, NCRS, subscribe_widget
 from .action_store import (
-    load_actions_store,
+    load_actions_page,
+    find_action,
     create_ncr_and_action,
     upsert_action,
     set_action_status,
@@ -14,10 +18,6 @@ from .action_store import (
 )
 
 
-def _rank(sev: str) -> int:
-    return {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}.get(sev, 0)
-
-
 class ActionCenterUI(tk.Frame):
     """
     Shared Action Center for Leader/Quality/Admin/Super.
@@ -77,6 +77,21 @@ class ActionCenterUI(tk.Frame):
         self.status_filter.pack(side="left", padx=8)
         self.status_filter.bind("<<ComboboxSelected>>", lambda e: self.refresh())
 
+        tk.Label(filt, text="Line:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left", padx=(18, 6))
+        self.line_filter = ttk.Combobox(filt, state="readonly", width=10, values=["All"] + list(get_catalog().lines))
+        self.line_filter.set("All")
+        self.line_filter.pack(side="left", padx=8)
+        self.line_filter.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+
+        tk.Label(filt, text="Due from:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left", padx=(18, 6))
+        self.due_from = tk.Entry(filt, width=11)
+        self.due_from.pack(side="left")
+        tk.Label(filt, text="to:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left", padx=6)
+        self.due_to = tk.Entry(filt, width=11)
+        self.due_to.pack(side="left")
+        self.due_from.bind("<Return>", lambda e: self.refresh())
+        self.due_to.bind("<Return>", lambda e: self.refresh())
+
         # Table
         cols = ("id", "type", "title", "severity", "status", "owner", "due", "line", "part", "related")
         self.tree = ttk.Treeview(self, columns=cols, show="headings", height=18)
@@ -98,45 +113,63 @@ class ActionCenterUI(tk.Frame):
         tk.Button(btn, text="Set In Progress", command=lambda: self.set_status_selected("In Progress")).pack(side="left", padx=(8, 0))
         tk.Button(btn, text="Set Blocked", command=lambda: self.set_status_selected("Blocked")).pack(side="left", padx=(8, 0))
         tk.Button(btn, text="Close", command=lambda: self.set_status_selected("Closed")).pack(side="left", padx=(8, 0))
+        self.next_btn = tk.Button(btn, text="Next >", command=self.next_page)
+        self.next_btn.pack(side="right")
+        self.prev_btn = tk.Button(btn, text="< Prev", command=self.prev_page)
+        self.prev_btn.pack(side="right", padx=(0, 8))
+
+        # Keyset paging: cursors of the pages before the current one.
+        self._page_cursors = []
+        self._cursor = None
+        self._next_cursor = None
 
         self.status_lbl = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"])
         self.status_lbl.pack(anchor="w", padx=12, pady=(0, 10))
 
         self.refresh()
+        # Edits from other screens or stations: reload the page being shown.
+        subscribe_widget(self, ACTIONS, lambda e: self._load_page())
+        subscribe_widget(self, NCRS, lambda e: self._load_page())
 
     # -------------------------
-    def _all_actions(self):
-        store = load_actions_store()
-        return store.get("actions", []) or []
+    def _filters(self):
+        line = self.line_filter.get()
+        return {
+            "min_severity": self.min_sev.get(),
+            "status": self.status_filter.get(),
+            "owner": self.username if self.view_mode.get() == "My Items" and self.username else None,
+            "line": None if line in ("", "All") else line,
+            "due_from": self.due_from.get().strip() or None,
+            "due_to": self.due_to.get().strip() or None,
+        }
 
     def refresh(self):
+        """Reload from the first page (filters changed or data edited)."""
+        self._page_cursors = []
+        self._cursor = None
+        self._load_page()
+
+    def next_page(self):
+        if self._next_cursor is None:
+            return
+        self._page_cursors.append(self._cursor)
+        self._cursor = self._next_cursor
+        self._load_page()
+
+    def prev_page(self):
+        if not self._page_cursors:
+            return
+        self._cursor = self._page_cursors.pop()
+        self._load_page()
+
+    def _load_page(self):
+        selected = set(self.tree.selection())
         for i in self.tree.get_children():
             self.tree.delete(i)
 
-        actions = self._all_actions()
-
-        # Filters
-        min_rank = _rank(self.min_sev.get())
-        stat = self.status_filter.get()
-        view = self.view_mode.get()
-
-        out = []
-        for a in actions:
-            sev = a.get("severity", "Low")
-            if _rank(sev) < min_rank:
-                continue
-            if stat != "All" and a.get("status") != stat:
-                continue
-            if view == "My Items" and self.username and a.get("owner") != self.username:
-                continue
-            out.append(a)
-
-        # Sort: open first, then severity
-        def sort_key(a):
-            closed = (a.get("status") == "Closed")
-            return (closed, -_rank(a.get("severity", "Low")), a.get("due_date") or "", a.get("updated_at") or "")
-
-        out.sort(key=sort_key)
+        page = load_actions_page(self._filters(), after=self._cursor, limit=ACTIONS_PAGE_SIZE)
+        out = page["actions"]
+        self._next_cursor = page["next"]
 
         for a in out:
             rel = a.get("related") or {}
@@ -148,7 +181,7 @@ class ActionCenterUI(tk.Frame):
                     rel_txt += f"Entry:{rel.get('entry_id')}"
                 rel_txt = rel_txt.strip()
 
-            self.tree.insert("", "end", values=(
+            self.tree.insert("", "end", iid=a.get("action_id"), values=(
                 a.get("action_id", ""),
                 a.get("type", ""),
                 a.get("title", ""),
@@ -161,7 +194,16 @@ class ActionCenterUI(tk.Frame):
                 rel_txt
             ))
 
-        self.status_lbl.config(text=f"Showing {len(out)} items")
+        keep = [i for i in selected if self.tree.exists(i)]
+        if keep:
+            self.tree.selection_set(keep)
+
+        first = len(self._page_cursors) * ACTIONS_PAGE_SIZE
+        self.status_lbl.config(
+            text=f"Showing {first + 1 if out else 0}-{first + len(out)} of {page['total']} items"
+        )
+        self.prev_btn.configure(state="normal" if self._page_cursors else "disabled")
+        self.next_btn.configure(state="normal" if self._next_cursor is not None else "disabled")
 
     def _selected_action_id(self):
         sel = self.tree.selection()
@@ -171,10 +213,7 @@ class ActionCenterUI(tk.Frame):
         return vals[0] if vals else None
 
     def _find_action(self, action_id):
-        for a in self._all_actions():
-            if a.get("action_id") == action_id:
-                return a
-        return None
+        return find_action(action_id)
 
     # -------------------------
     def _can_edit_action(self, a):
@@ -209,7 +248,7 @@ class ActionCenterUI(tk.Frame):
                 # keep NCR open unless closed
                 set_ncr_status(rel["ncr_id"], "Open", actor=self.username)
 
-        self.refresh()
+        self._load_page()  # stay on this page
 
     # -------------------------
     def edit_selected(self):
@@ -303,7 +342,7 @@ class ActionCenterUI(tk.Frame):
 
             upsert_action(payload, actor=self.username)
             win.destroy()
-            self.refresh()
+            self._load_page()  # stay on this page
 
         btn = tk.Frame(win, padx=10, pady=10); btn.pack(fill="x")
         tk.Button(btn, text="Cancel", command=win.destroy).pack(side="right")
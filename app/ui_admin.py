@@ -16,8 +16,8 @@ from .db import (
     set_screen_permission,
     delete_screen_permission,
     list_lines,
-    get_production_goal,
-    fetch_tool_entries,
+    query_shift_reports,
+    list_shift_operators,
 )
 from .permissions import ROLE_SCREEN_DEFAULTS
 from .screen_registry import SCREEN_REGISTRY
@@ -423,6 +423,7 @@ class AdminUI(tk.Frame):
         else:
             set_screen_permission(username, screen, level)
             log_audit(self.controller.user, f"Set access {screen}={level} for {username}")
+        self.controller.invalidate_permissions()
         self.refresh_access()
 
     def remove_access(self):
@@ -433,6 +434,7 @@ class AdminUI(tk.Frame):
             return
         delete_screen_permission(username, screen)
         log_audit(self.controller.user, f"Removed access {screen} for {username}")
+        self.controller.invalidate_permissions()
         self.refresh_access()
 
     # -------------------------
@@ -558,10 +560,7 @@ class AdminUI(tk.Frame):
         for i in self.shift_tree.get_children():
             self.shift_tree.delete(i)
 
-        entries = fetch_tool_entries()
-        shift_entries = [e for e in entries if str(e.get("reason", "")).strip() == "Shift Production"]
-
-        operators = sorted({e.get("tool_changer", "") for e in shift_entries if e.get("tool_changer")})
+        operators = list_shift_operators()
         self.shift_operator_combo.configure(values=["All"] + operators)
 
         try:
@@ -571,72 +570,39 @@ class AdminUI(tk.Frame):
             messagebox.showerror("Invalid Date", "Use YYYY-MM-DD format for dates.")
             return
 
-        line_filter = self.shift_line_var.get()
-        shift_filter = self.shift_var.get()
-        operator_filter = self.shift_operator_var.get()
-
-        filtered = []
-        for entry in shift_entries:
-            entry_date = entry.get("date", "")
-            entry_time = entry.get("time", "00:00:00")
-            try:
-                entry_dt = datetime.strptime(f"{entry_date} {entry_time}", "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                entry_dt = None
-
-            if line_filter != "All" and entry.get("line") != line_filter:
-                continue
-            if shift_filter != "All" and entry.get("shift") != shift_filter:
-                continue
-            if operator_filter != "All" and entry.get("tool_changer") != operator_filter:
-                continue
-            if start and entry_dt and entry_dt.date() < start.date():
-                continue
-            if end and entry_dt and entry_dt.date() > end.date():
-                continue
-            filtered.append((entry, entry_dt))
-
-        sort_key = self.shift_sort_var.get()
-        if sort_key == "Line":
-            filtered.sort(key=lambda x: (x[0].get("line", ""), x[1] or datetime.min))
-        elif sort_key == "Shift":
-            filtered.sort(key=lambda x: (x[0].get("shift", ""), x[1] or datetime.min))
-        elif sort_key == "Operator":
-            filtered.sort(key=lambda x: (x[0].get("tool_changer", ""), x[1] or datetime.min))
-        else:
-            filtered.sort(key=lambda x: x[1] or datetime.min, reverse=True)
-
-        self.shift_report_cache = {}
-        for entry, entry_dt in filtered:
-            line = entry.get("line", "")
-            target = get_production_goal(line)
-            production_qty = float(entry.get("production_qty", 0.0) or 0.0)
-            downtime = float(entry.get("downtime_mins", 0.0) or 0.0)
+        def picked(value):
+            return None if value == "All" else value
 
-            pct_goal = (production_qty / target * 100.0) if target > 0 else 0.0
-            shift_minutes = 480.0
-            adjusted_target = target * max(0.0, 1.0 - (downtime / shift_minutes)) if target > 0 else 0.0
-            pct_goal_adj = (production_qty / adjusted_target * 100.0) if adjusted_target > 0 else 0.0
+        reports = query_shift_reports(
+            line=picked(self.shift_line_var.get()),
+            shift=picked(self.shift_var.get()),
+            operator=picked(self.shift_operator_var.get()),
+            start=start.strftime("%Y-%m-%d") if start else None,
+            end=end.strftime("%Y-%m-%d") if end else None,
+            sort=self.shift_sort_var.get(),
+        )
 
+        self.shift_report_cache = {}
+        for entry in reports:
             row = (
-                entry.get("id", ""),
-                entry.get("date", ""),
-                entry.get("time", ""),
-                line,
-                entry.get("shift", ""),
-                entry.get("tool_changer", ""),
-                f"{production_qty:.0f}",
-                f"{downtime:.1f}",
-                f"{target:.0f}",
-                f"{pct_goal:.1f}%",
-                f"{pct_goal_adj:.1f}%",
+                entry["id"],
+                entry["date"],
+                entry["time"],
+                entry["line"],
+                entry["shift"],
+                entry["tool_changer"],
+                f"{entry['production_qty']:.0f}",
+                f"{entry['downtime_mins']:.1f}",
+                f"{entry['target']:.0f}",
+                f"{entry['pct_goal']:.1f}%",
+                f"{entry['pct_goal_adj']:.1f}%",
             )
             self.shift_tree.insert("", "end", values=row)
-            self.shift_report_cache[str(entry.get("id", ""))] = {
+            self.shift_report_cache[str(entry["id"])] = {
                 "entry": entry,
-                "target": target,
-                "pct_goal": pct_goal,
-                "pct_goal_adj": pct_goal_adj,
+                "target": entry["target"],
+                "pct_goal": entry["pct_goal"],
+                "pct_goal_adj": entry["pct_goal_adj"],
             }
 
     def review_shift_report(self):
@@ -1,6 +1,7 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from .storage import list_month_files
+from .exporter import ExportJob
 
 LIGHT = {"bg": "#f0f0f0", "fg": "black", "header_bg": "#cccccc"}
 DARK  = {"bg": "#2e2e2e", "fg": "white", "header_bg": "#1a1a1a"}
@@ -56,8 +57,32 @@ class DataTable(tk.Frame):
     def load(self, df):
         for i in self.tree.get_children():
             self.tree.delete(i)
+        self._items = {}
         for _, row in df.iterrows():
-            self.tree.insert("", "end", values=[row.get(c, "") for c in self.columns])
+            values = [row.get(c, "") for c in self.columns]
+            self._items[str(values[0])] = self.tree.insert("", "end", values=values)
+
+    def update_rows(self, df, ids):
+        """
+        Apply a change to the rows keyed (first column) by ids: rows in df are
+        updated in place or appended, ids missing from df are removed.
+        """
+        items = getattr(self, "_items", {})
+        seen = set()
+        for _, row in df.iterrows():
+            values = [row.get(c, "") for c in self.columns]
+            key = str(values[0])
+            seen.add(key)
+            item = items.get(key)
+            if item is not None and self.tree.exists(item):
+                self.tree.item(item, values=values)
+            else:
+                items[key] = self.tree.insert("", "end", values=values)
+        for key in set(str(i) for i in ids) - seen:
+            item = items.pop(key, None)
+            if item is not None and self.tree.exists(item):
+                self.tree.delete(item)
+        self._items = items
 
     def selected_id(self):
         sel = self.tree.selection()
@@ -65,3 +90,77 @@ class DataTable(tk.Frame):
             return None
         vals = self.tree.item(sel[0], "values")
         return vals[0] if vals else None
+
+class JobProgress(tk.Toplevel):
+    """
+    Progress window for a background job (ExportJob, BackupJob).
+    The job runs on a worker thread and exposes done/total/finished/error/cancelled;
+    this polls it with after() so the UI stays responsive. on_success(job) runs
+    once the job has finished without error, before success_text(job) is shown.
+    """
+    POLL_MS = 150
+
+    def __init__(self, parent, job, title="Working", unit="rows", success_text=None, on_success=None):
+        super().__init__(parent)
+        self.job = job
+        self.unit = unit
+        self.success_text = success_text
+        self.on_success = on_success
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(parent.winfo_toplevel())
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.status = tk.StringVar(value="Starting...")
+        tk.Label(self, textvariable=self.status, padx=12, pady=8).pack(fill="x")
+        self.bar = ttk.Progressbar(self, length=320, mode="indeterminate")
+        self.bar.pack(padx=12, pady=4)
+        self.cancel_btn = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(pady=(4, 10))
+
+        self.bar.start(12)
+        self.job.start()
+        self.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        self.job.cancel()
+        self.status.set("Cancelling...")
+        self.cancel_btn.configure(state="disabled")
+
+    def _poll(self):
+        job = self.job
+        if job.total:
+            if str(self.bar.cget("mode")) != "determinate":
+                self.bar.stop()
+                self.bar.configure(mode="determinate", maximum=job.total)
+            self.bar["value"] = job.done
+            self.status.set(f"{job.done:,} / {job.total:,} {self.unit}")
+        else:
+            self.status.set(f"{job.done:,} {self.unit}")
+
+        if not job.finished:
+            self.after(self.POLL_MS, self._poll)
+            return
+
+        self.bar.stop()
+        title = self.title()
+        self.destroy()
+        if job.cancelled:
+            messagebox.showinfo(f"{title} cancelled", "Cancelled. No file was written.")
+        elif job.error is not None:
+            messagebox.showerror(f"{title} failed", str(job.error))
+        else:
+            if self.on_success:
+                self.on_success(job)
+            if self.success_text:
+                messagebox.showinfo("Done", self.success_text(job))
+
+
+def run_export(parent, path, sheets_factory, title="Exporting"):
+    """Start a background export of sheets_factory() to path and show its progress."""
+    return JobProgress(
+        parent,
+        ExportJob(path, sheets_factory),
+        title=title,
+        success_text=lambda job: f"Exported {job.rows_written:,} rows:\n{job.path}",
+    )
@@ -6,7 +6,122 @@ from datetime import datetime, timedelta
 import pandas as pd
 
 from .ui_common import HeaderFrame
-from .storage import get_df, safe_int, safe_float
+from .config import EVENTS_DEBOUNCE_MS
+from .events import TOOL_ENTRIES, subscribe_widget
+from .storage import dimension_keys, entry_dates, entry_numbers, flag_mask, load_entries_range, safe_int
+
+# Only these columns are read for the Pareto/trend tables (archive reads are column-projected).
+DASHBOARD_COLUMNS = [
+    "ID", "Date", "Machine", "Tool_Num", "Part_Number", "Defect_Code",
+    "Defect_Qty", "Downtime_Mins", "COPQ_Est", "Andon_Flag", "Customer_Risk",
+    "ts", "copq_cents", "andon_flag_code", "tool_id", "part_id",
+]
+
+PARETO_KEYS = [("Defect_Code", "Defect"), ("Machine", "Machine"), ("Tool_Num", "Tool"), ("Part_Number", "Part")]
+# Grouped on their integer keys (storage.dimension_keys), named after grouping.
+DIMENSION_KEYS = {"Machine", "Tool_Num", "Part_Number"}
+
+
+# -------------------------
+# Aggregation (no Tk; also used by app/bench.py)
+# -------------------------
+def load_window(start, end):
+    """Rows with Date in [start, end] (live + archive), numeric/flag helper columns added."""
+    df = load_entries_range(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), columns=DASHBOARD_COLUMNS)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    return prepare_window(df, start, end)
+
+
+def prepare_window(df, start, end):
+    df = df.copy()
+    df["_dt"] = entry_dates(df)
+    sub = df[df["_dt"].notna() & (df["_dt"] >= pd.Timestamp(start)) & (df["_dt"] <= pd.Timestamp(end))].copy()
+    if sub.empty:
+        return sub
+
+    # Normalize numeric columns
+    sub["_defect_qty"] = entry_numbers(sub, "Defect_Qty", integer=True)
+    sub["_dtmins"] = entry_numbers(sub, "Downtime_Mins")
+    sub["_copq"] = entry_numbers(sub, "COPQ_Est")
+
+    # Useful flags
+    sub["_andon"] = flag_mask(sub, "Andon_Flag")
+    sub["_highrisk"] = sub.get("Customer_Risk", "").isin(["High", "Critical"]) if "Customer_Risk" in sub.columns else False
+    return sub
+
+
+def pareto_table(df, key: str, topn: int, prior=None):
+    """
+    Top topn values of key by defect qty, downtime, entries.
+    prev_yr_defects is filled from prior (same window one year earlier) when given.
+    """
+    if key not in df.columns:
+        return None
+
+    # If you want defect pareto to focus only on defects, uncomment below:
+    # if key == "Defect_Code" and "Defects_Present" in df.columns:
+    #     df = df[df["Defects_Present"].astype(str).str.lower().eq("yes")].copy()
+
+    labels = None
+    if key in DIMENSION_KEYS:
+        by, labels = dimension_keys(df, key)
+    else:
+        by = df[key]
+    grp = df.groupby(by.rename(key), dropna=False)
+
+    out = grp.agg(
+        entries=("ID", "count"),
+        defect_qty=("_defect_qty", "sum"),
+        downtime_mins=("_dtmins", "sum"),
+        copq_est=("_copq", "sum")
+    ).reset_index()
+    if labels is not None:
+        out[key] = out[key].map(labels)
+
+    # Clean blanks
+    out[key] = out[key].astype(str)
+    out.loc[out[key].str.strip() == "", key] = "(blank)"
+
+    # Percent of defects share (based on defect_qty)
+    total_defects = float(out["defect_qty"].sum()) if len(out) else 0.0
+    if total_defects > 0:
+        out["pct_defects"] = (out["defect_qty"] / total_defects) * 100.0
+    else:
+        out["pct_defects"] = 0.0
+
+    # Sort primarily by defect_qty then downtime then entries
+    out = out.sort_values(["defect_qty", "downtime_mins", "entries"], ascending=False).head(topn).reset_index(drop=True)
+
+    # Same window one year earlier, matched on the grouping key
+    prev = {}
+    if prior is not None and not prior.empty and key in prior.columns:
+        p = prior.copy()
+        if key in DIMENSION_KEYS:
+            pkeys, plabels = dimension_keys(p, key)
+            p[key] = pkeys.map(plabels)
+        p[key] = p[key].astype(str)
+        p.loc[p[key].str.strip() == "", key] = "(blank)"
+        prev = p.groupby(key)["_defect_qty"].sum().to_dict()
+    out["prev_yr_defects"] = out[key].map(lambda k: int(prev.get(k, 0)))
+    return out
+
+
+def trend_table(df, days: int = 60):
+    """Per-day totals, newest first."""
+    df = df.copy()
+    df["_day"] = df["_dt"].dt.strftime("%Y-%m-%d")
+
+    out = df.groupby("_day", dropna=False).agg(
+        entries=("ID", "count"),
+        defect_qty=("_defect_qty", "sum"),
+        downtime_mins=("_dtmins", "sum"),
+        copq_est=("_copq", "sum"),
+        andon_ct=("_andon", "sum"),
+        high_risk_ct=("_highrisk", "sum"),
+    ).reset_index()
+
+    return out.sort_values("_day", ascending=False).head(days).reset_index(drop=True)
 
 
 class DashboardUI(tk.Frame):
@@ -14,7 +129,8 @@ class DashboardUI(tk.Frame):
     Dashboard (Super/Admin):
     - Pareto tables: Defect Code, Machine, Tool, Part
     - Trend table by Day: entries, downtime, defects, COPQ
-    - Date window selector (last X days)
+    - Date window selector (last X days up to 12 months; older months come from the archive)
+    - Optional prior-year comparison on the Pareto tables
     """
 
     def __init__(self, parent, controller, show_header=True):
@@ -44,7 +160,8 @@ class DashboardUI(tk.Frame):
 
         tk.Label(ctrl, text="Window:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
         self.window_var = ttk.Combobox(ctrl, state="readonly", width=16, values=[
-            "Today", "Last 3 Days", "Last 7 Days", "Last 14 Days", "Last 30 Days", "This Month"
+            "Today", "Last 3 Days", "Last 7 Days", "Last 14 Days", "Last 30 Days", "This Month",
+            "Last 90 Days", "Year to Date", "Last 12 Months"
         ])
         self.window_var.set("Last 7 Days")
         self.window_var.pack(side="left", padx=8)
@@ -54,6 +171,12 @@ class DashboardUI(tk.Frame):
         self.topn_var = tk.StringVar(value="15")
         tk.Entry(ctrl, textvariable=self.topn_var, width=6).pack(side="left", padx=8)
 
+        self.yoy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            ctrl, text="Compare prior year", variable=self.yoy_var, command=self.refresh,
+            bg=controller.colors["bg"], fg=controller.colors["fg"], selectcolor=controller.colors["bg"]
+        ).pack(side="left", padx=(18, 0))
+
         self.status = tk.Label(ctrl, text="", bg=controller.colors["bg"], fg=controller.colors["fg"])
         self.status.pack(side="left", padx=(18, 0))
 
@@ -80,11 +203,22 @@ class DashboardUI(tk.Frame):
 
         self.tree_trend = self._make_trend_tree(self.tab_trend)
 
+        self._refresh_after = None
+        self.refresh()
+        subscribe_widget(self, TOOL_ENTRIES, self._on_entries_changed)
+
+    def _on_entries_changed(self, event):
+        # A burst of entries (a shift's worth of imports) costs one reload.
+        if self._refresh_after is None:
+            self._refresh_after = self.after(EVENTS_DEBOUNCE_MS, self._live_refresh)
+
+    def _live_refresh(self):
+        self._refresh_after = None
         self.refresh()
 
     # -------------------------
     def _make_pareto_tree(self, parent, key_label: str):
-        cols = ("rank", "key", "entries", "defect_qty", "downtime_mins", "copq_est", "pct_defects")
+        cols = ("rank", "key", "entries", "defect_qty", "downtime_mins", "copq_est", "pct_defects", "prev_yr_defects")
         tree = ttk.Treeview(parent, columns=cols, show="headings", height=18)
         for c in cols:
             tree.heading(c, text=c.upper())
@@ -133,6 +267,12 @@ class DashboardUI(tk.Frame):
             return today - timedelta(days=13), now
         if mode == "Last 30 Days":
             return today - timedelta(days=29), now
+        if mode == "Last 90 Days":
+            return today - timedelta(days=89), now
+        if mode == "Year to Date":
+            return datetime(now.year, 1, 1), now
+        if mode == "Last 12 Months":
+            return (pd.Timestamp(today) - pd.DateOffset(years=1) + timedelta(days=1)).to_pydatetime(), now
         # This Month
         start = datetime(now.year, now.month, 1)
         return start, now
@@ -145,74 +285,38 @@ class DashboardUI(tk.Frame):
         for t in (self.tree_defect, self.tree_machine, self.tree_tool, self.tree_part, self.tree_trend):
             self._clear_tree(t)
 
-        df, fname = get_df()
-        if df is None or df.empty:
-            self.status.config(text="No data.")
-            return
-
-        # Date filter
-        df = df.copy()
-        df["_dt"] = pd.to_datetime(df.get("Date", ""), errors="coerce")
-
         start, end = self._get_window()
-        sub = df[df["_dt"].notna() & (df["_dt"] >= pd.Timestamp(start)) & (df["_dt"] <= pd.Timestamp(end))].copy()
+        sub = self._load_window(start, end)
 
         if sub.empty:
             self.status.config(text=f"No rows in window ({start.date()} → {end.date()}).")
             return
 
-        # Normalize numeric columns
-        sub["_defect_qty"] = sub.get("Defect_Qty", 0).apply(lambda x: safe_int(x, 0))
-        sub["_dtmins"] = sub.get("Downtime_Mins", 0).apply(lambda x: safe_float(x, 0.0))
-        sub["_copq"] = sub.get("COPQ_Est", 0).apply(lambda x: safe_float(x, 0.0)) if "COPQ_Est" in sub.columns else 0.0
-
-        # Useful flags
-        sub["_andon"] = sub.get("Andon_Flag", "").astype(str).str.lower().eq("yes") if "Andon_Flag" in sub.columns else False
-        sub["_highrisk"] = sub.get("Customer_Risk", "").isin(["High", "Critical"]) if "Customer_Risk" in sub.columns else False
+        prior = None
+        if self.yoy_var.get():
+            p_start = (pd.Timestamp(start) - pd.DateOffset(years=1)).to_pydatetime()
+            p_end = (pd.Timestamp(end) - pd.DateOffset(years=1)).to_pydatetime()
+            prior = self._load_window(p_start, p_end)
 
         topn = self._topn()
 
         # Build paretos
-        self._fill_pareto(self.tree_defect, sub, key="Defect_Code", topn=topn, label="Defect")
-        self._fill_pareto(self.tree_machine, sub, key="Machine", topn=topn, label="Machine")
-        self._fill_pareto(self.tree_tool, sub, key="Tool_Num", topn=topn, label="Tool")
-        self._fill_pareto(self.tree_part, sub, key="Part_Number", topn=topn, label="Part")
+        trees = (self.tree_defect, self.tree_machine, self.tree_tool, self.tree_part)
+        for tree, (key, label) in zip(trees, PARETO_KEYS):
+            self._fill_pareto(tree, sub, key=key, topn=topn, label=label, prior=prior)
 
         # Trend by day
         self._fill_trend(self.tree_trend, sub)
 
-        self.status.config(text=f"{len(sub)} rows from {fname} | Window: {start.date()} → {end.date()}")
+        self.status.config(text=f"{len(sub)} rows | Window: {start.date()} → {end.date()}")
 
-    def _fill_pareto(self, tree, df, key: str, topn: int, label: str):
-        if key not in df.columns:
-            return
-
-        # If you want defect pareto to focus only on defects, uncomment below:
-        # if key == "Defect_Code" and "Defects_Present" in df.columns:
-        #     df = df[df["Defects_Present"].astype(str).str.lower().eq("yes")].copy()
-
-        grp = df.groupby(key, dropna=False)
-
-        out = grp.agg(
-            entries=("ID", "count"),
-            defect_qty=("_defect_qty", "sum"),
-            downtime_mins=("_dtmins", "sum"),
-            copq_est=("_copq", "sum")
-        ).reset_index()
-
-        # Clean blanks
-        out[key] = out[key].astype(str)
-        out.loc[out[key].str.strip() == "", key] = "(blank)"
+    def _load_window(self, start, end):
+        return load_window(start, end)
 
-        # Percent of defects share (based on defect_qty)
-        total_defects = float(out["defect_qty"].sum()) if len(out) else 0.0
-        if total_defects > 0:
-            out["pct_defects"] = (out["defect_qty"] / total_defects) * 100.0
-        else:
-            out["pct_defects"] = 0.0
-
-        # Sort primarily by defect_qty then downtime then entries
-        out = out.sort_values(["defect_qty", "downtime_mins", "entries"], ascending=False).head(topn).reset_index(drop=True)
+    def _fill_pareto(self, tree, df, key: str, topn: int, label: str, prior=None):
+        out = pareto_table(df, key, topn, prior)
+        if out is None:
+            return
 
         for i, r in out.iterrows():
             tree.insert("", "end", values=(
@@ -222,26 +326,15 @@ class DashboardUI(tk.Frame):
                 int(r["defect_qty"]),
                 float(r["downtime_mins"]),
                 float(r["copq_est"]),
-                float(r["pct_defects"])
+                float(r["pct_defects"]),
+                int(r["prev_yr_defects"]) if prior is not None else ""
             ))
 
     def _fill_trend(self, tree, df):
         if df.empty:
             return
 
-        df = df.copy()
-        df["_day"] = df["_dt"].dt.strftime("%Y-%m-%d")
-
-        out = df.groupby("_day", dropna=False).agg(
-            entries=("ID", "count"),
-            defect_qty=("_defect_qty", "sum"),
-            downtime_mins=("_dtmins", "sum"),
-            copq_est=("_copq", "sum"),
-            andon_ct=("_andon", "sum"),
-            high_risk_ct=("_highrisk", "sum"),
-        ).reset_index()
-
-        out = out.sort_values("_day", ascending=False).head(60).reset_index(drop=True)
+        out = trend_table(df)
 
         for _, r in out.iterrows():
             tree.insert("", "end", values=(
@@ -7,6 +7,7 @@ import pandas as pd
 
 from .ui_common import HeaderFrame
 from .storage import load_json
+from .ids import new_id
 from .config import (
     GAGES_FILE,
     GAGE_VERIFICATION_Q_FILE,
@@ -196,7 +197,7 @@ class GageVerificationUI(tk.Frame):
 
         # Build record row
         now = datetime.now()
-        verify_id = f"GV-{now.strftime('%Y%m%d-%H%M%S')}-{gid}"
+        verify_id = f"{new_id('GV')}-{gid}"
 
         record = {
             "Verify_ID": verify_id,
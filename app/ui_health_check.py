@@ -2,50 +2,32 @@
 import tkinter as tk
 from tkinter import ttk
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from .ui_common import HeaderFrame
-from .storage import get_df, load_json, safe_int, safe_float
-from .config import GAGES_FILE, RISK_CONFIG_FILE
-
-
-def _parse_date(s: str):
-    s = str(s or "").strip()
-    if not s:
-        return None
-    for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%Y/%m/%d", "%Y-%m-%d %H:%M:%S"):
-        try:
-            return datetime.strptime(s, fmt)
-        except Exception:
-            pass
-    return None
-
-
-def _gage_due_status(g, risk_cfg):
-    rules = (risk_cfg or {}).get("rules", {}) or {}
-    due_soon_days = safe_int((rules.get("gage_calibration_escalation", {}) or {}).get("due_soon_days", 14), 14)
-
-    last = _parse_date(g.get("last_calibration_date", ""))
-    freq = safe_int(g.get("calibration_frequency_days", 0), 0)
-
-    if not last or freq <= 0:
-        return {"next_due": "", "status": "Unknown", "days_until_due": None}
-
-    next_due = last + timedelta(days=freq)
-    days_until = (next_due.date() - datetime.now().date()).days
-
-    if days_until < 0:
-        status = "Overdue"
-    elif days_until <= due_soon_days:
-        status = "Due Soon"
-    else:
-        status = "OK"
-
-    return {"next_due": next_due.strftime("%Y-%m-%d"), "status": status, "days_until_due": days_until}
+from .data_quality import entry_issues, gage_issues, gage_statuses, list_issues, start_evaluator
+from .rule_config import gages, risk_rules
+
+
+def run_checks(df, gage_set, risk):
+    """
+    Rule checks over entry rows, from scratch; gage_set and risk are the compiled
+    Gages and RiskRules (or the raw gages.json / risk_config.json dicts).
+    The screen reads the same rules from data_issues (app/data_quality.py).
+    """
+    issues = []
+    if df is None or df.empty:
+        return issues
 
+    statuses = gage_statuses(gage_set, risk)
+    today = datetime.now().strftime("%Y-%m-%d")
+    for r in df.to_dict("records"):
+        for it in entry_issues(r):
+            if not it["active_from"] or it["active_from"] <= today:
+                issues.append(it)
+        issues.extend(gage_issues(str(r.get("ID", "") or ""), r.get("Gage_Used", ""), statuses))
 
-def _severity_rank(sev: str) -> int:
-    return {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}.get(sev, 0)
+    return issues
 
 
 class HealthCheckUI(tk.Frame):
@@ -56,10 +38,6 @@ class HealthCheckUI(tk.Frame):
         if show_header:
             HeaderFrame(self, controller).pack(fill="x")
 
-        self.risk_cfg = load_json(RISK_CONFIG_FILE, {})
-        self.gage_store = load_json(GAGES_FILE, {"gages": []})
-        self.gage_map = {g.get("gage_id"): g for g in self.gage_store.get("gages", []) if g.get("gage_id")}
-
         # Top bar
         top = tk.Frame(self, bg=controller.colors["bg"], padx=10, pady=10)
         top.pack(fill="x")
@@ -78,6 +56,14 @@ class HealthCheckUI(tk.Frame):
         filt = tk.Frame(self, bg=controller.colors["bg"], padx=10, pady=8)
         filt.pack(fill="x")
 
+        today = datetime.now()
+        self.start_var = tk.StringVar(value=today.strftime("%Y-%m-01"))
+        self.end_var = tk.StringVar(value=today.strftime("%Y-%m-%d"))
+        tk.Label(filt, text="From (YYYY-MM-DD):", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
+        tk.Entry(filt, textvariable=self.start_var, width=12).pack(side="left", padx=6)
+        tk.Label(filt, text="To:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
+        tk.Entry(filt, textvariable=self.end_var, width=12).pack(side="left", padx=(6, 18))
+
         tk.Label(filt, text="Minimum severity:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
         self.min_sev = ttk.Combobox(filt, values=["Low", "Medium", "High", "Critical"], state="readonly", width=12)
         self.min_sev.set("Medium")
@@ -113,27 +99,49 @@ class HealthCheckUI(tk.Frame):
         self.status = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"])
         self.status.pack(anchor="w", padx=12, pady=10)
 
+        self._poll_job = None
         self.refresh()
 
     def refresh(self):
+        # Brings data_issues up to date with the entries changed since the last
+        # refresh, off the Tk thread; a rules rebuild can take seconds.
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+        self._evaluator = start_evaluator()
+        self._poll()
+
+    def _poll(self):
+        self._poll_job = None
+        if not self.winfo_exists():
+            return
+        ev = self._evaluator
+        if ev.is_alive():
+            if ev.rebuilding:
+                # Show what is stored so far while every entry is re-evaluated.
+                self._show(rebuilding=True)
+                self._poll_job = self.after(1000, self._poll)
+            else:
+                self._poll_job = self.after(100, self._poll)
+            return
+        self._show()
+
+    def _show(self, rebuilding=False):
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        df, _ = get_df()
-        issues = self.run_checks(df)
-
-        min_rank = _severity_rank(self.min_sev.get())
-        only_missing = bool(self.only_missing.get())
-
-        filtered = []
-        for it in issues:
-            if _severity_rank(it["severity"]) < min_rank:
-                continue
-            if only_missing and it["category"] != "Missing Field":
-                continue
-            filtered.append(it)
-
-        filtered.sort(key=lambda x: _severity_rank(x["severity"]), reverse=True)
+        try:
+            start = datetime.strptime(self.start_var.get().strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+            end = datetime.strptime(self.end_var.get().strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            self.status.config(text="Use YYYY-MM-DD for the From/To dates.")
+            return
+
+        filtered, truncated = list_issues(
+            start,
+            end,
+            min_severity=self.min_sev.get(),
+            category="Missing Field" if self.only_missing.get() else "",
+        )
 
         for it in filtered:
             self.tree.insert("", "end", values=(
@@ -144,108 +152,14 @@ class HealthCheckUI(tk.Frame):
                 it["suggestion"]
             ))
 
-        self.status.config(text=f"Found {len(filtered)} issues (filtered) — {len(issues)} total issues scanned.")
+        text = f"Found {len(filtered)} issues for {start} to {end}."
+        if truncated:
+            text += " Only the most severe are listed; narrow the dates or raise the minimum severity."
+        if rebuilding:
+            text = "Rebuilding data-quality issues... " + text
+        elif self._evaluator.error:
+            text += f" Issues may be out of date: {self._evaluator.error}"
+        self.status.config(text=text)
 
     def run_checks(self, df):
-        issues = []
-        if df is None or df.empty:
-            return issues
-
-        required = ["Line", "Machine", "Tool_Num", "Reason", "Part_Number"]
-
-        gage_status = {}
-        for gid, g in self.gage_map.items():
-            ds = _gage_due_status(g, self.risk_cfg)
-            gage_status[gid] = {
-                "status": ds["status"],
-                "next_due": ds["next_due"],
-                "criticality": str(g.get("criticality", "Medium") or "Medium")
-            }
-
-        def add(sev, entry_id, cat, issue, suggestion):
-            issues.append({
-                "severity": sev,
-                "entry_id": entry_id,
-                "category": cat,
-                "issue": issue,
-                "suggestion": suggestion
-            })
-
-        for _, r in df.iterrows():
-            entry_id = str(r.get("ID", "") or "")
-
-            for col in required:
-                if not str(r.get(col, "") or "").strip():
-                    add("High", entry_id, "Missing Field",
-                        f"Missing required field: {col}",
-                        f"Fill {col} before saving/closing.")
-
-            defects_present = str(r.get("Defects_Present", "") or "").strip().lower()
-            defect_qty = safe_int(r.get("Defect_Qty", 0), 0)
-            defect_code = str(r.get("Defect_Code", "") or "").strip()
-
-            if defects_present == "yes" and defect_qty <= 0:
-                add("High", entry_id, "Defects Logic",
-                    "Defects_Present=Yes but Defect_Qty is 0/blank",
-                    "Enter a valid defect quantity (or set Defects_Present=No).")
-
-            if defects_present == "no" and defect_qty > 0:
-                add("Medium", entry_id, "Defects Logic",
-                    "Defects_Present=No but Defect_Qty > 0",
-                    "Set Defects_Present=Yes or set Defect_Qty to 0.")
-
-            if defects_present == "yes" and not defect_code:
-                add("High", entry_id, "Defect Classification",
-                    "Defects present but Defect_Code is blank",
-                    "Select a Defect_Code for Pareto and NCR tracking.")
-
-            qc_status = str(r.get("QC_Status", "") or "").strip()
-            q_user = str(r.get("Quality_User", "") or "").strip()
-            q_time = str(r.get("Quality_Time", "") or "").strip()
-
-            if qc_status in ("Verified", "Closed") and (not q_user or not q_time):
-                add("Medium", entry_id, "QC Workflow",
-                    f"QC_Status={qc_status} but missing Quality_User/Quality_Time",
-                    "Set Quality_User and Quality_Time when verifying.")
-
-            ncr_id = str(r.get("NCR_ID", "") or "").strip()
-            ncr_status = str(r.get("NCR_Status", "") or "").strip()
-            ncr_close = str(r.get("NCR_Close_Date", "") or "").strip()
-
-            if ncr_id and ncr_status == "Closed" and not ncr_close:
-                add("High", entry_id, "NCR",
-                    "NCR_Status=Closed but NCR_Close_Date is blank",
-                    "Enter NCR_Close_Date or reopen the NCR.")
-
-            action_status = str(r.get("Action_Status", "") or "").strip()
-            due_str = str(r.get("Action_Due_Date", "") or "").strip()
-            if action_status in ("Open", "Overdue") and due_str:
-                due_dt = _parse_date(due_str)
-                if due_dt and due_dt.date() < datetime.now().date():
-                    add("High", entry_id, "Actions",
-                        f"Action is overdue (due {due_dt.strftime('%Y-%m-%d')})",
-                        "Complete the action or update the due date/owner.")
-
-            g_used = str(r.get("Gage_Used", "") or "").strip()
-            if g_used:
-                gs = gage_status.get(g_used)
-                if gs:
-                    if gs["status"] == "Overdue":
-                        crit = gs["criticality"]
-                        sev = "High"
-                        if crit in ("High", "Critical"):
-                            sev = "Critical"
-                        add(sev, entry_id, "Gage Calibration",
-                            f"Gage {g_used} is Overdue (criticality={crit}, due {gs['next_due']})",
-                            "Stop using this gage until calibrated (or correct last calibration date).")
-                    elif gs["status"] == "Due Soon":
-                        crit = gs["criticality"]
-                        add("Medium", entry_id, "Gage Calibration",
-                            f"Gage {g_used} is Due Soon (criticality={crit}, due {gs['next_due']})",
-                            "Plan calibration before due date to avoid escalation.")
-                else:
-                    add("Medium", entry_id, "Gage Calibration",
-                        f"Gage_Used={g_used} not found in gages.json",
-                        "Add gage in Gages & Calibration Manager or correct the gage ID.")
-
-        return issues
+        return run_checks(df, gages(), risk_rules())
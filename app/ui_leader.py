@@ -3,11 +3,20 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 
 from .ui_common import HeaderFrame, FilePicker, DataTable
-from .storage import get_df, save_df
+from .storage import get_df, get_entries_by_ids, save_df
+from .events import TOOL_ENTRIES, subscribe_widget
 from .ui_action_center import ActionCenterUI
 from .ui_audit import AuditTrailUI
 from .screen_registry import get_screen_class
 from .audit import log_audit
+
+# Above this many changed entries, reloading the month beats patching rows.
+PATCH_LIMIT = 200
+
+
+def _pending(df):
+    return df[df["Leader_Sign"].fillna("Pending").astype(str).str.lower().eq("pending")]
+
 
 class LeaderUI(tk.Frame):
     def __init__(self, parent, controller, show_header=True):
@@ -58,12 +67,22 @@ class LeaderUI(tk.Frame):
         self.table.pack(fill="both", expand=True, padx=10, pady=10)
 
         self.load_pending(self.picker.get())
+        # Entries written here or at another station show up without a reload.
+        subscribe_widget(self, TOOL_ENTRIES, self._on_entries_changed)
 
     def load_pending(self, filename):
-        df, _ = get_df(filename)
-        pending = df[df["Leader_Sign"].fillna("Pending").astype(str).str.lower().eq("pending")]
+        df, month = get_df(filename)
         self._filename = filename
-        self.table.load(pending)
+        self._month = month
+        self.table.load(_pending(df))
+
+    def _on_entries_changed(self, event):
+        if event.ids is None or len(event.ids) > PATCH_LIMIT:
+            self.load_pending(self._filename)
+            return
+        df = get_entries_by_ids(event.ids)
+        df = df[df["Date"].astype(str).str.startswith(self._month)]
+        self.table.update_rows(_pending(df), event.ids)
 
     def sign_selected(self):
         sel_id = self.table.selected_id()
@@ -82,6 +101,6 @@ class LeaderUI(tk.Frame):
         df.loc[idx, "Leader_User"] = self.controller.user
         df.loc[idx, "Leader_Time"] = now.strftime("%Y-%m-%d %H:%M:%S")
 
-        save_df(df, filename)
+        save_df(df.loc[idx], filename)
         log_audit(self.controller.user, f"Leader sign entry {sel_id}")
         self.load_pending(filename)
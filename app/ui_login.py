@@ -3,10 +3,18 @@ import tkinter as tk
 from tkinter import messagebox
 
 from .bootstrap import ensure_app_initialized
+from .backup import start_scheduler
+from .submit_queue import start_drainer
+from .perf import instrument_screens
+from .profiler import install as install_profiler
+from .watchdog import describe_screen, start_watchdog
+from .events import MASTER_DATA, start_events, subscribe
+from .catalog import invalidate as invalidate_catalog
+from .config import SERVICE_URL
 from .db import get_user, update_user_fields, get_meta, set_meta
 from .audit import log_audit
 from .ui_common import LIGHT, DARK
-from .permissions import screen_access as permission_screen_access, can_edit_screen as permission_can_edit_screen, ROLE_SCREEN_DEFAULTS
+from .permissions import effective_screen_matrix, level_at_least, ROLE_SCREEN_DEFAULTS
 from .screen_registry import SCREEN_REGISTRY
 
 # Role UIs
@@ -75,6 +83,20 @@ class App(tk.Tk):
         # Ensure folders/files exist even on double-click launch
         ensure_app_initialized()
 
+        # Scheduled online backups into BACKUPS_DIR (background thread).
+        # With a data service the server owns the file and its backups.
+        if not SERVICE_URL:
+            start_scheduler()
+
+        # Hot-path timing on screen refresh() (no-op unless TOOLLIFE_PERF=1)
+        instrument_screens()
+
+        # On-demand cProfile of screen actions, armed from the Performance screen
+        install_profiler()
+
+        # Writes queued while the database was locked (including from a previous run)
+        start_drainer()
+
         self.title("Tool Life Tracking System")
         self.geometry("1280x850")
 
@@ -84,6 +106,7 @@ class App(tk.Tk):
         self.user = None
         self.role = None
         self.user_line = None
+        self._screen_matrix = None
 
         self.container = tk.Frame(self)
         self.container.pack(fill="both", expand=True)
@@ -96,6 +119,16 @@ class App(tk.Tk):
             set_meta("shown_default_login", "1")
 
         self.show_login()
+
+        # Main-loop stall detection; stalls go to LOGS_DIR with stack samples
+        start_watchdog(self, self.watchdog_context)
+
+        # Live updates: db writes here and commits from other stations reach subscribed screens
+        start_events(self)
+        subscribe(MASTER_DATA, lambda e: invalidate_catalog())
+
+    def watchdog_context(self):
+        return {"user": self.user, "role": self.role, "screen": describe_screen(self.container)}
 
     def toggle_theme(self):
         self.is_dark = not self.is_dark
@@ -119,6 +152,7 @@ class App(tk.Tk):
         self.user = username
         self.role = normalize_role(role)
         self.user_line = line or "Both"
+        self._screen_matrix = None
         log_audit(username, f"Login as {self.role}")
         self.route_role()
 
@@ -149,11 +183,21 @@ class App(tk.Tk):
         except TypeError:
             ui_cls(self.container, self).pack(fill="both", expand=True)
 
+    def screen_matrix(self):
+        """Effective screen levels for the logged-in user, computed once per login."""
+        if self._screen_matrix is None:
+            self._screen_matrix = effective_screen_matrix(self.role, self.user)
+        return self._screen_matrix
+
+    def invalidate_permissions(self):
+        """Recompute screen access on next use (after AdminUI changes overrides)."""
+        self._screen_matrix = None
+
     def screen_access(self, screen: str) -> str:
-        return permission_screen_access(self.role, self.user, screen)
+        return self.screen_matrix().get(screen, "none")
 
     def can_edit_screen(self, screen: str) -> bool:
-        return permission_can_edit_screen(self.role, self.user, screen)
+        return level_at_least(self.screen_access(screen), "edit")
 
     def extra_screens(self):
         defaults = ROLE_SCREEN_DEFAULTS.get(self.role, {})
@@ -171,6 +215,7 @@ class App(tk.Tk):
         self.user = None
         self.role = None
         self.user_line = None
+        self._screen_matrix = None
         self.show_login()
 
 
@@ -3,14 +3,17 @@ from __future__ import annotations
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import shutil
+import os
+import threading
 
 from .storage import safe_float, safe_int
 from .db import (
+    get_meta,
+    set_meta,
     list_tools_simple,
     upsert_tool_inventory,
     deactivate_tool,
-    list_tools_for_line,
+    list_tools_with_mappings,
     list_lines,
     get_tool_lines,
     set_tool_lines,
@@ -18,6 +21,7 @@ from .db import (
     replace_tool_inserts,
     get_tool_parts,
     set_tool_parts,
+    insert_change_cost,
     list_parts_with_lines,
     upsert_part,
     deactivate_part,
@@ -30,7 +34,11 @@ from .db import (
     upsert_production_goal,
 )
 from .audit import log_audit
-from .config import DB_PATH
+from .archive import archive_available, archive_closed_months, closed_months
+from .backup import BackupJob
+from .sync import sync_folder
+from .db_import import ImportValidationError, validate_incoming, merge_database, restore_database
+from .ui_common import JobProgress
 
 
 
@@ -63,6 +71,10 @@ class MasterDataUI(tk.Frame):
         self.db_export_btn.pack(side="right")
         self.db_import_btn = tk.Button(top_controls, text="Import Database", command=self._import_database)
         self.db_import_btn.pack(side="right", padx=8)
+        self.archive_btn = tk.Button(top_controls, text="Archive Closed Months", command=self._archive_closed_months)
+        self.archive_btn.pack(side="right")
+        self.sync_btn = tk.Button(top_controls, text="Sync Stations", command=self._sync_stations)
+        self.sync_btn.pack(side="right", padx=8)
 
         nb = ttk.Notebook(self)
         nb.pack(fill="both", expand=True, padx=10, pady=10)
@@ -91,6 +103,8 @@ class MasterDataUI(tk.Frame):
             return
         self.db_import_btn.configure(state="disabled")
         self.db_export_btn.configure(state="disabled")
+        self.archive_btn.configure(state="disabled")
+        self.sync_btn.configure(state="disabled")
 
     # -------------------- TOOL PRICING --------------------
     def _build_tool_pricing(self, parent):
@@ -157,20 +171,14 @@ class MasterDataUI(tk.Frame):
             self.tool_tree.delete(i)
 
         line_filter = self.tool_line_filter.get() if hasattr(self, "tool_line_filter") else "All"
-        tool_rows = list_tools_simple()
-        if line_filter and line_filter != "All":
-            allowed = set(list_tools_for_line(line_filter, include_unassigned=False))
-            tool_rows = [t for t in tool_rows if t.get("tool_num") in allowed]
-
-        for tool in tool_rows:
-            tool_num = tool.get("tool_num", "")
+        for tool in list_tools_with_mappings(line_filter or "All"):
             self.tool_tree.insert("", "end", values=(
-                tool_num,
+                tool.get("tool_num", ""),
                 tool.get("name", ""),
                 tool.get("unit_cost", 0.0),
                 tool.get("stock_qty", 0),
-                ", ".join(get_tool_lines(tool_num)),
-                ", ".join(get_tool_parts(tool_num)),
+                ", ".join(tool.get("lines", [])),
+                ", ".join(tool.get("parts", [])),
             ))
 
     def _selected_tool(self):
@@ -257,7 +265,7 @@ class MasterDataUI(tk.Frame):
         calc_lbl.grid(row=5, column=0, columnspan=4, sticky="w", pady=(8, 0))
 
         def recalc_cost():
-            cost = self._calculate_insert_cost(self._collect_insert_data(insert_tabs))
+            cost = insert_change_cost(self._collect_insert_data(insert_tabs))
             calc_lbl.config(text=f"Calculated change cost: ${cost:,.4f}")
 
         tk.Button(form, text="Recalculate Cost", command=recalc_cost).grid(row=6, column=0, pady=8, sticky="w")
@@ -336,18 +344,6 @@ class MasterDataUI(tk.Frame):
                 tab["notebook"].tab(tab["frame"], text=name)
         return data
 
-    def _calculate_insert_cost(self, inserts):
-        total = 0.0
-        for ins in inserts:
-            count = safe_float(ins.get("insert_count", 0), 0.0)
-            price = safe_float(ins.get("price_per_insert", 0), 0.0)
-            life = safe_float(ins.get("tool_life", 0), 0.0)
-            sides = safe_float(ins.get("sides_per_insert", 1), 1.0)
-            if life <= 0 or sides <= 0:
-                continue
-            total += ((count * price) / life) / sides
-        return total
-
     # -------------------- PARTS & LINES --------------------
     def _build_parts(self, parent):
         top = tk.Frame(parent, bg=self.controller.colors["bg"], padx=10, pady=10)
@@ -674,12 +670,24 @@ class MasterDataUI(tk.Frame):
         )
         if not path:
             return
-        try:
-            shutil.copyfile(DB_PATH, path)
-            log_audit(self.controller.user, f"Exported database to {path}")
-            messagebox.showinfo("Exported", f"Database exported to:\n{path}")
-        except Exception as exc:
-            messagebox.showerror("Export Failed", f"Unable to export database.\n{exc}")
+
+        # Online backup: consistent with WAL, copied in steps on a worker thread.
+        def done_text(job):
+            res = job.result
+            return (
+                f"Database exported to:\n{path}\n\n"
+                f"{res.get('bytes', 0) / 1024 / 1024:.1f} MB in {res.get('duration_s', 0.0):.1f}s "
+                f"(integrity: {res.get('integrity', '')})"
+            )
+
+        JobProgress(
+            self,
+            BackupJob(path),
+            title="Export Database",
+            unit="pages",
+            success_text=done_text,
+            on_success=lambda job: log_audit(self.controller.user, f"Exported database to {path}"),
+        )
 
     def _import_database(self):
         if self.readonly:
@@ -690,17 +698,108 @@ class MasterDataUI(tk.Frame):
         )
         if not path:
             return
+        try:
+            info = validate_incoming(path)
+        except ImportValidationError as exc:
+            messagebox.showerror("Import Failed", str(exc))
+            return
+
+        counts = "\n".join(f"  {t}: {n}" for t, n in info["counts"].items())
+        mode = messagebox.askyesnocancel(
+            "Import Database",
+            f"Incoming database (schema {info['schema_version']}, integrity ok):\n{counts}\n\n"
+            "Yes = Merge into current data (keeps everything here)\n"
+            "No = Replace current data (a safety backup is taken first)",
+        )
+        if mode is None:
+            return
+        try:
+            if mode:
+                merged = merge_database(path)
+                log_audit(self.controller.user, f"Merged database from {path}: {merged}")
+                lines = "\n".join(f"  {t}: {n}" for t, n in merged.items())
+                messagebox.showinfo("Imported", f"Merged rows (inserted/updated):\n{lines}")
+            else:
+                if not messagebox.askyesno("Confirm Replace", "Replace ALL current data with the incoming database?"):
+                    return
+                res = restore_database(path)
+                log_audit(self.controller.user, f"Restored database from {path}")
+                messagebox.showinfo(
+                    "Imported",
+                    f"Database restored.\nPrevious data saved to:\n{res['safety_backup']}",
+                )
+        except Exception as exc:
+            messagebox.showerror("Import Failed", f"Unable to import database.\n{exc}")
+            return
+        for refresh in (self.refresh_tools, self.refresh_parts, self.refresh_scrap, self.refresh_downtime, self.refresh_goals):
+            refresh()
+
+    def _archive_closed_months(self):
+        if self.readonly:
+            return
+        if not archive_available():
+            messagebox.showwarning("Archive", "Archiving needs the pyarrow package (pip install pyarrow).")
+            return
+        months = closed_months()
+        if not months:
+            messagebox.showinfo("Archive", "No closed months to archive (only months before this quarter are archived).")
+            return
         if not messagebox.askyesno(
-            "Confirm Import",
-            "Importing a database will overwrite current data. Continue?",
+            "Confirm Archive",
+            "Move these months out of the live database into the archive?\n\n" + ", ".join(months),
         ):
             return
+
+        result = {}
+
+        def work():
+            try:
+                result["done"] = archive_closed_months(purge=True)
+            except Exception as exc:
+                result["error"] = exc
+
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        self.archive_btn.configure(state="disabled", text="Archiving...")
+
+        def poll():
+            if worker.is_alive():
+                self.after(200, poll)
+                return
+            self.archive_btn.configure(state="normal", text="Archive Closed Months")
+            if "error" in result:
+                messagebox.showerror("Archive Failed", f"Unable to archive.\n{result['error']}")
+                return
+            done = result.get("done", {})
+            log_audit(self.controller.user, f"Archived months {', '.join(done)}")
+            lines = "\n".join(f"{m}: {n} rows" for m, n in done.items())
+            messagebox.showinfo("Archived", f"Archived:\n{lines}")
+
+        self.after(200, poll)
+
+    def _sync_stations(self):
+        if self.readonly:
+            return
+        folder = get_meta("sync_folder") or ""
+        if not folder or not os.path.isdir(folder):
+            folder = filedialog.askdirectory(title="Shared sync folder")
+            if not folder:
+                return
+            set_meta("sync_folder", folder)
         try:
-            shutil.copyfile(path, DB_PATH)
-            log_audit(self.controller.user, f"Imported database from {path}")
-            messagebox.showinfo("Imported", "Database imported. Please restart the app.")
+            res = sync_folder(folder)
         except Exception as exc:
-            messagebox.showerror("Import Failed", f"Unable to import database.\n{exc}")
+            messagebox.showerror("Sync Failed", f"Unable to sync.\n{exc}")
+            return
+        imported = sum(res["imported"].values())
+        log_audit(self.controller.user, f"Synced stations via {folder}: {imported} changes in")
+        messagebox.showinfo(
+            "Synced",
+            f"Applied {imported} change(s) from {len(res['imported'])} bundle(s).\n"
+            f"Exported: {os.path.basename(res['exported']) if res['exported'] else 'nothing new'}",
+        )
+        for refresh in (self.refresh_tools, self.refresh_parts, self.refresh_scrap, self.refresh_downtime, self.refresh_goals):
+            refresh()
 
     # -------------------- PRODUCTION GOALS --------------------
     def _build_production_goals(self, parent):
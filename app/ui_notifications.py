@@ -1,17 +1,19 @@
 # app/ui_notifications.py
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 
 from .ui_common import HeaderFrame
-from .storage import get_df, load_json
-from .config import GAGES_FILE, RISK_CONFIG_FILE
-from .quality_engine import generate_notifications
+from .alerts import evaluate, list_alerts, acknowledge, snooze
+from .events import TOOL_ENTRIES, subscribe_widget
+
+SNOOZE_CHOICES = {"1 hour": 1, "4 hours": 4, "1 day": 24, "1 week": 24 * 7}
 
 
 class NotificationsUI(tk.Frame):
     def __init__(self, parent, controller, show_header=True):
         super().__init__(parent, bg=controller.colors["bg"])
         self.controller = controller
+        self.username = getattr(controller, "username", "") or getattr(controller, "user", "") or ""
 
         if show_header:
             HeaderFrame(self, controller).pack(fill="x")
@@ -33,7 +35,17 @@ class NotificationsUI(tk.Frame):
         self.min_sev.pack(side="left", padx=8)
         self.min_sev.bind("<<ComboboxSelected>>", lambda e: self.refresh())
 
-        cols = ("severity", "type", "title", "details", "related")
+        self.show_all = tk.BooleanVar(value=False)
+        tk.Checkbutton(filt, text="Show acknowledged / snoozed", variable=self.show_all,
+                       command=self.refresh).pack(side="left", padx=8)
+
+        tk.Button(filt, text="Snooze", command=self.snooze_selected).pack(side="right")
+        self.snooze_for = ttk.Combobox(filt, values=list(SNOOZE_CHOICES), state="readonly", width=10)
+        self.snooze_for.set("4 hours")
+        self.snooze_for.pack(side="right", padx=4)
+        tk.Button(filt, text="Acknowledge", command=self.ack_selected).pack(side="right", padx=8)
+
+        cols = ("severity", "type", "title", "details", "related", "status", "last_seen")
         self.tree = ttk.Treeview(self, columns=cols, show="headings")
         for c in cols:
             self.tree.heading(c, text=c.upper())
@@ -41,30 +53,53 @@ class NotificationsUI(tk.Frame):
         self.tree.pack(fill="both", expand=True, padx=10, pady=10)
 
         self.refresh()
+        # New or changed entries are evaluated as they arrive (only those entries).
+        subscribe_widget(self, TOOL_ENTRIES, lambda e: self.refresh())
 
     def refresh(self):
+        selected = set(self.tree.selection())
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        df, fname = get_df()  # current month
-        gages = load_json(GAGES_FILE, {"gages": []})
-        risk_cfg = load_json(RISK_CONFIG_FILE, {})
-
-        alerts = generate_notifications(df, gages, risk_cfg)
-
-        # filter + sort
-        rank = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
-        min_needed = rank.get(self.min_sev.get(), 2)
-
-        filtered = [a for a in alerts if rank.get(a.get("severity","Low"), 0) >= min_needed]
-        filtered.sort(key=lambda a: rank.get(a.get("severity","Low"), 0), reverse=True)
-
-        for a in filtered:
-            rel = a.get("related", {})
-            self.tree.insert("", "end", values=(
+        # Only entries changed since the last evaluation are looked at.
+        evaluate()
+        show_all = self.show_all.get()
+        alerts = list_alerts(
+            self.min_sev.get() or "High",
+            include_acked=show_all,
+            include_snoozed=show_all,
+        )
+
+        for a in alerts:
+            status = a.get("status", "")
+            if a.get("snoozed_until"):
+                status = f"{status} (snoozed to {a['snoozed_until']})"
+            self.tree.insert("", "end", iid=a["alert_key"], values=(
                 a.get("severity",""),
                 a.get("type",""),
                 a.get("title",""),
                 a.get("details",""),
-                str(rel)
+                str(a.get("related", {})),
+                status,
+                a.get("last_seen",""),
             ))
+        keep = [i for i in selected if self.tree.exists(i)]
+        if keep:
+            self.tree.selection_set(keep)
+
+    def _selected_keys(self):
+        keys = list(self.tree.selection())
+        if not keys:
+            messagebox.showinfo("Notifications", "Select one or more alerts first.")
+        return keys
+
+    def ack_selected(self):
+        for key in self._selected_keys():
+            acknowledge(key, self.username)
+        self.refresh()
+
+    def snooze_selected(self):
+        hours = SNOOZE_CHOICES.get(self.snooze_for.get(), 4)
+        for key in self._selected_keys():
+            snooze(key, hours, self.username)
+        self.refresh()
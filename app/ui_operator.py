@@ -7,7 +7,10 @@ from datetime import datetime
 
 from .ui_common import HeaderFrame
 from .storage import safe_int, safe_float
-from .db import list_downtime_codes, list_lines, upsert_operator_entry, upsert_tool_entry
+from .catalog import get_catalog
+from .ids import new_id
+from .db import upsert_operator_entry
+from .submit_queue import submit_tool_entry
 from .audit import log_audit
 
 
@@ -54,7 +57,7 @@ class OperatorUI(tk.Frame):
         )
 
         tk.Label(body, text="Line:", **style).grid(row=1, column=0, sticky="e", pady=6)
-        line_options = list_lines()
+        line_options = list(get_catalog().lines)
         if not line_options:
             line_options = ["U725", "JL"]
         self.line_var = tk.StringVar(value=self.controller.user_line or "Both")
@@ -94,7 +97,7 @@ class OperatorUI(tk.Frame):
 
         tk.Label(body, text="Downtime Code:", **style).grid(row=4, column=0, sticky="e", pady=6)
         self.downtime_var = tk.StringVar(value="")
-        codes = list_downtime_codes()
+        codes = get_catalog().downtime_codes
         self.downtime_options = []
         self.downtime_map = {}
         for row in codes:
@@ -184,7 +187,7 @@ class OperatorUI(tk.Frame):
         )
 
         tk.Label(body, text="Line:", **style).grid(row=1, column=0, sticky="e", pady=6)
-        line_options = list_lines()
+        line_options = list(get_catalog().lines)
         if not line_options:
             line_options = ["U725", "JL"]
         self.shift_line_var = tk.StringVar(value=self.controller.user_line or line_options[0])
@@ -271,7 +274,7 @@ class OperatorUI(tk.Frame):
         dt_comments = self.dt_comment_entry.get().strip() if downtime_code else ""
 
         now = datetime.now()
-        entry_id = f"SP-{now.strftime('%Y%m%d-%H%M%S')}"
+        entry_id = new_id()
         new_row = {
             "ID": entry_id,
             "Date": now.strftime("%Y-%m-%d"),
@@ -303,10 +306,16 @@ class OperatorUI(tk.Frame):
             "Leader_Time": "",
             "Serial_Numbers": "",
         }
-        upsert_tool_entry(new_row)
-        log_audit(self.controller.user, f"Shift production entry {entry_id} saved")
-
-        messagebox.showinfo("Saved", "Shift production report submitted for leader signoff.")
+        audit = f"Shift production entry {entry_id} saved"
+        saved = submit_tool_entry(new_row, self.controller.user, audit)
+        log_audit(self.controller.user, audit, to_db=False)
+        if saved:
+            messagebox.showinfo("Saved", "Shift production report submitted for leader signoff.")
+        else:
+            messagebox.showinfo(
+                "Queued",
+                "The database is busy. The report is saved on this station and will be written automatically.",
+            )
         self.shift_qty_entry.delete(0, "end")
         self.downtime_var.set("")
         self._toggle_downtime_fields()
@@ -318,7 +327,7 @@ class OperatorUI(tk.Frame):
             return
         downtime = safe_float(self.shift_downtime_entry.get(), 0.0)
         now = datetime.now()
-        entry_id = f"SP-{now.strftime('%Y%m%d-%H%M%S')}"
+        entry_id = new_id()
         new_row = {
             "ID": entry_id,
             "Date": now.strftime("%Y-%m-%d"),
@@ -346,10 +355,16 @@ class OperatorUI(tk.Frame):
             "Leader_Time": "",
             "Serial_Numbers": "",
         }
-        upsert_tool_entry(new_row)
-        log_audit(self.controller.user, f"Shift production entry {entry_id} saved")
-
-        messagebox.showinfo("Saved", "Shift production report submitted for leader signoff.")
+        audit = f"Shift production entry {entry_id} saved"
+        saved = submit_tool_entry(new_row, self.controller.user, audit)
+        log_audit(self.controller.user, audit, to_db=False)
+        if saved:
+            messagebox.showinfo("Saved", "Shift production report submitted for leader signoff.")
+        else:
+            messagebox.showinfo(
+                "Queued",
+                "The database is busy. The report is saved on this station and will be written automatically.",
+            )
         self.shift_qty_entry.delete(0, "end")
         self.shift_downtime_entry.delete(0, "end")
         self.shift_downtime_entry.insert(0, "0")
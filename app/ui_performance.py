@@ -0,0 +1,204 @@
+# app/ui_performance.py
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from .ui_common import HeaderFrame
+from . import perf, profiler, sqltrace
+from .screen_registry import SCREEN_REGISTRY
+
+
+class PerformanceUI(tk.Frame):
+    """
+    Performance (Super):
+    - Per-function / per-screen timings from app/perf.py (count, p50, p95, max)
+    - Submit queue depth and database lock waits
+    - UI stalls caught by the watchdog (details in LOGS_DIR/ui_stalls.jsonl)
+    - Slowest SQL statements and their query plans (TOOLLIFE_SQLTRACE=1)
+    - cProfile the next N refresh/submit calls of any screen (LOGS_DIR/profiles)
+    - Dump to LOGS_DIR for sending to whoever is chasing a slow PC
+    """
+
+    COLUMNS = ("name", "count", "p50_ms", "p95_ms", "max_ms", "mean_ms", "total_s")
+    ALL_ACTIONS = "(all refresh/submit/save/load)"
+    SQL_COLUMNS = ("sql", "count", "total_ms", "mean_ms", "max_ms", "slow", "full_scan")
+
+    def __init__(self, parent, controller, show_header=True):
+        super().__init__(parent, bg=controller.colors["bg"])
+        self.controller = controller
+
+        if show_header:
+            HeaderFrame(self, controller).pack(fill="x")
+
+        top = tk.Frame(self, bg=controller.colors["bg"], padx=10, pady=10)
+        top.pack(fill="x")
+
+        tk.Label(
+            top,
+            text="Performance",
+            bg=controller.colors["bg"],
+            fg=controller.colors["fg"],
+            font=("Arial", 16, "bold"),
+        ).pack(side="left")
+
+        tk.Button(top, text="Dump to Logs", command=self.dump).pack(side="right")
+        tk.Button(top, text="Reset", command=self.reset).pack(side="right", padx=6)
+        tk.Button(top, text="Refresh", command=self.refresh).pack(side="right")
+
+        prof = tk.Frame(self, bg=controller.colors["bg"], padx=10)
+        prof.pack(fill="x")
+        tk.Label(prof, text="Profile screen:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
+        self.prof_screen = tk.StringVar(value="Dashboard")
+        screen_cb = ttk.Combobox(prof, textvariable=self.prof_screen, values=list(SCREEN_REGISTRY), state="readonly", width=18)
+        screen_cb.pack(side="left", padx=4)
+        screen_cb.bind("<<ComboboxSelected>>", self._load_methods)
+        tk.Label(prof, text="Action:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
+        self.prof_method = tk.StringVar(value=self.ALL_ACTIONS)
+        self.method_cb = ttk.Combobox(prof, textvariable=self.prof_method, state="readonly", width=22)
+        self.method_cb.pack(side="left", padx=4)
+        tk.Label(prof, text="Next N calls:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
+        self.prof_calls = tk.Spinbox(prof, from_=1, to=50, width=4)
+        self.prof_calls.pack(side="left", padx=4)
+        tk.Button(prof, text="Arm", command=self.arm_profile).pack(side="left", padx=4)
+        tk.Button(prof, text="Disarm", command=self.disarm_profile).pack(side="left")
+        self.prof_label = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"], anchor="w")
+        self.prof_label.pack(fill="x", padx=12)
+        self._load_methods()
+
+        self.queue_label = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"], anchor="w")
+        self.queue_label.pack(fill="x", padx=12)
+        self.stall_label = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"], anchor="w")
+        self.stall_label.pack(fill="x", padx=12)
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=20)
+        for c in self.COLUMNS:
+            self.tree.heading(c, text=c.upper())
+            self.tree.column(c, width=420 if c == "name" else 110, anchor="w" if c == "name" else "e")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        tk.Label(
+            self, text="Slowest SQL (double-click for query plan)",
+            bg=controller.colors["bg"], fg=controller.colors["fg"], anchor="w",
+        ).pack(fill="x", padx=12)
+        self.sql_tree = ttk.Treeview(self, columns=self.SQL_COLUMNS, show="headings", height=10)
+        for c in self.SQL_COLUMNS:
+            self.sql_tree.heading(c, text=c.upper())
+            self.sql_tree.column(c, width=520 if c == "sql" else 90, anchor="w" if c == "sql" else "e")
+        self.sql_tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.sql_tree.bind("<Double-1>", self._show_plan)
+        self._sql_rows = {}
+
+        self.status = tk.Label(self, text="", bg=controller.colors["bg"], fg=controller.colors["fg"])
+        self.status.pack(anchor="w", padx=12, pady=10)
+
+        self.refresh()
+
+    def refresh(self):
+        for i in self.tree.get_children():
+            self.tree.delete(i)
+
+        rows = perf.stats()
+        for r in rows:
+            self.tree.insert("", "end", values=tuple(r[c] for c in self.COLUMNS))
+
+        for i in self.sql_tree.get_children():
+            self.sql_tree.delete(i)
+        self._sql_rows = {}
+        for r in sqltrace.report(50):
+            iid = self.sql_tree.insert("", "end", values=tuple(
+                ("yes" if r[c] else "") if c == "full_scan" else r[c] for c in self.SQL_COLUMNS
+            ))
+            self._sql_rows[iid] = r
+
+        try:
+            from .submit_queue import queue_stats
+            q = queue_stats()
+            self.queue_label.config(text=(
+                f"Submit queue: {q['depth']} waiting (oldest {q['oldest_age_s']}s), "
+                f"{q['drained']} drained, {q['failed']} failed | "
+                f"Lock waits: {q['lock_retries']} retries, {q['lock_failures']} failures, "
+                f"{q['lock_wait_s']}s total, {q['lock_max_wait_s']}s max"
+            ))
+        except Exception as exc:
+            self.queue_label.config(text=f"Submit queue: unavailable ({exc})")
+
+        parts = []
+        for st in profiler.status():
+            if st["armed"]:
+                parts.append(f"{st['screen']}: armed, {st['remaining']} call(s) left, {len(st['captures'])} saved")
+            elif st["captures"]:
+                parts.append(f"{st['screen']}: {len(st['captures'])} profile(s) in {profiler.PROFILE_DIR}")
+        self.prof_label.config(text=" | ".join(parts) or "No screen armed for profiling.")
+
+        from .watchdog import watchdog_stats
+        w = watchdog_stats()
+        if w is None:
+            self.stall_label.config(text="UI stall watchdog: off")
+        else:
+            last = w["last"]
+            text = f"UI stalls: {w['stalls']} (max {w['max_ms']:.0f} ms)"
+            if last:
+                top = last["first_stack"][0] if last["first_stack"] else "?"
+                text += f" | last {last['at']} {last['stall_ms']:.0f} ms on {last['screen'] or '?'} in {top}"
+            self.stall_label.config(text=text)
+
+        if perf.enabled():
+            self.status.config(text=f"{len(rows)} timed functions/screens.")
+        else:
+            self.status.config(text="Timing is off. Start the app with TOOLLIFE_PERF=1 to collect timings.")
+        if not sqltrace.enabled():
+            self.status.config(text=self.status.cget("text") + " SQL tracing is off (TOOLLIFE_SQLTRACE=1).")
+
+    def _load_methods(self, _event=None):
+        try:
+            methods = profiler.profilable_methods(self.prof_screen.get())
+        except Exception:
+            methods = []
+        self.method_cb.config(values=[self.ALL_ACTIONS] + methods)
+        self.prof_method.set(self.ALL_ACTIONS)
+
+    def arm_profile(self):
+        screen = self.prof_screen.get()
+        method = self.prof_method.get()
+        try:
+            calls = int(self.prof_calls.get())
+            names = profiler.arm(screen, calls, None if method == self.ALL_ACTIONS else [method])
+        except Exception as exc:
+            messagebox.showerror("Profile", str(exc))
+            return
+        if not names:
+            profiler.disarm(screen)
+            messagebox.showwarning("Profile", f"{screen} has no refresh/submit/save/load methods.")
+            return
+        self.refresh()
+
+    def disarm_profile(self):
+        profiler.disarm(self.prof_screen.get())
+        self.refresh()
+
+    def _show_plan(self, _event=None):
+        sel = self.sql_tree.selection()
+        r = self._sql_rows.get(sel[0]) if sel else None
+        if not r:
+            return
+        plan = "\n".join(r["plan"]) or "(no plan captured - the statement has not been slow yet)"
+        messagebox.showinfo(
+            "Query plan",
+            f"{r['sql']}\n\nParameters: {', '.join(r['shapes'])}\n\n{plan}",
+        )
+
+    def reset(self):
+        perf.reset()
+        sqltrace.reset()
+        self.refresh()
+
+    def dump(self):
+        try:
+            path = perf.dump()
+            sql_path = sqltrace.write_report()
+        except Exception as exc:
+            messagebox.showerror("Dump failed", str(exc))
+            return
+        msg = f"Performance stats written to:\n{path}"
+        if sql_path:
+            msg += f"\n\nSQL report written to:\n{sql_path}"
+        messagebox.showinfo("Saved", msg)
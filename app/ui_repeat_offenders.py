@@ -1,13 +1,15 @@
 # app/ui_repeat_offenders.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
 
 import pandas as pd
 
-from .ui_common import HeaderFrame
-from .storage import get_df, load_json, safe_int, safe_float
-from .config import REPEAT_RULES_FILE, DATA_DIR
+from .ui_common import HeaderFrame, run_export
+from .exporter import dataframe_sheet
+from .storage import dimension_keys, entry_dates, entry_numbers, flag_mask, get_df, safe_int
+from .config import DATA_DIR
+from .rule_config import repeat_rules
 
 
 class RepeatOffendersUI(tk.Frame):
@@ -26,8 +28,6 @@ class RepeatOffendersUI(tk.Frame):
         if show_header:
             HeaderFrame(self, controller).pack(fill="x")
 
-        self.rules = load_json(REPEAT_RULES_FILE, {})
-
         top = tk.Frame(self, bg=controller.colors["bg"], padx=10, pady=10)
         top.pack(fill="x")
 
@@ -47,7 +47,7 @@ class RepeatOffendersUI(tk.Frame):
         ctrl.pack(fill="x")
 
         tk.Label(ctrl, text="Window days:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left")
-        self.window_var = tk.StringVar(value=str(safe_int(self.rules.get("window_days", 7), 7)))
+        self.window_var = tk.StringVar(value=str(repeat_rules().window_days))
         tk.Entry(ctrl, textvariable=self.window_var, width=6).pack(side="left", padx=8)
 
         tk.Label(ctrl, text="Min count:", bg=controller.colors["bg"], fg=controller.colors["fg"]).pack(side="left", padx=(18, 6))
@@ -105,11 +105,11 @@ class RepeatOffendersUI(tk.Frame):
             tree.delete(i)
 
     def _date_filter(self, df):
-        window_days = safe_int(self.window_var.get(), safe_int(self.rules.get("window_days", 7), 7))
+        window_days = safe_int(self.window_var.get(), repeat_rules().window_days)
         cutoff = datetime.now().date() - timedelta(days=window_days)
 
         temp = df.copy()
-        temp["_dt"] = pd.to_datetime(temp.get("Date", ""), errors="coerce")
+        temp["_dt"] = entry_dates(temp)
         temp = temp[temp["_dt"].notna()]
         temp = temp[temp["_dt"].dt.date >= cutoff]
         return temp, window_days
@@ -129,13 +129,13 @@ class RepeatOffendersUI(tk.Frame):
         sub, window_days = self._date_filter(df)
 
         # Normalize numeric fields
-        sub["_defect_qty"] = sub.get("Defect_Qty", 0).apply(lambda x: safe_int(x, 0))
-        sub["_dtmins"] = sub.get("Downtime_Mins", 0).apply(lambda x: safe_float(x, 0.0))
-        sub["_copq"] = sub.get("COPQ_Est", 0).apply(lambda x: safe_float(x, 0.0)) if "COPQ_Est" in sub.columns else 0.0
+        sub["_defect_qty"] = entry_numbers(sub, "Defect_Qty", integer=True)
+        sub["_dtmins"] = entry_numbers(sub, "Downtime_Mins")
+        sub["_copq"] = entry_numbers(sub, "COPQ_Est")
 
         # Focus only defect-related rows for repeats
         if "Defects_Present" in sub.columns:
-            def_mask = sub["Defects_Present"].astype(str).str.lower().eq("yes")
+            def_mask = flag_mask(sub, "Defects_Present")
             sub_def = sub[def_mask].copy()
         else:
             sub_def = sub.copy()
@@ -143,13 +143,16 @@ class RepeatOffendersUI(tk.Frame):
         # 1) Part + Defect repeats
         out_part = None
         if "Part_Number" in sub_def.columns and "Defect_Code" in sub_def.columns:
-            grp = sub_def.groupby(["Part_Number", "Defect_Code"], dropna=False)
+            # Parts, machines and tools group on their integer keys, named afterwards.
+            part_key, part_names = dimension_keys(sub_def, "Part_Number")
+            grp = sub_def.groupby([part_key.rename("Part_Number"), "Defect_Code"], dropna=False)
             out_part = grp.agg(
                 count=("ID", "count"),
                 defect_qty=("_defect_qty", "sum"),
                 downtime_mins=("_dtmins", "sum"),
                 copq_est=("_copq", "sum")
             ).reset_index()
+            out_part["Part_Number"] = out_part["Part_Number"].map(part_names)
 
             out_part = out_part[out_part["count"] >= min_count]
             out_part["Part_Number"] = out_part["Part_Number"].astype(str).replace({"": "(blank)"})
@@ -173,13 +176,15 @@ class RepeatOffendersUI(tk.Frame):
         # 2) Machine repeats
         out_mach = None
         if "Machine" in sub_def.columns:
-            grp = sub_def.groupby(["Machine"], dropna=False)
+            mach_key, mach_names = dimension_keys(sub_def, "Machine")
+            grp = sub_def.groupby(mach_key.rename("Machine"), dropna=False)
             out_mach = grp.agg(
                 count=("ID", "count"),
                 defect_qty=("_defect_qty", "sum"),
                 downtime_mins=("_dtmins", "sum"),
                 copq_est=("_copq", "sum")
             ).reset_index()
+            out_mach["Machine"] = out_mach["Machine"].map(mach_names)
 
             out_mach = out_mach[out_mach["count"] >= min_count]
             out_mach["Machine"] = out_mach["Machine"].astype(str).replace({"": "(blank)"})
@@ -199,13 +204,15 @@ class RepeatOffendersUI(tk.Frame):
         # 3) Tool COPQ repeats (only meaningful if tool numbers exist)
         out_tool = None
         if "Tool_Num" in sub.columns:
-            grp = sub.groupby(["Tool_Num"], dropna=False)
+            tool_key, tool_names = dimension_keys(sub, "Tool_Num")
+            grp = sub.groupby(tool_key.rename("Tool_Num"), dropna=False)
             out_tool = grp.agg(
                 count=("ID", "count"),
                 defect_qty=("_defect_qty", "sum"),
                 downtime_mins=("_dtmins", "sum"),
                 copq_est=("_copq", "sum")
             ).reset_index()
+            out_tool["Tool_Num"] = out_tool["Tool_Num"].map(tool_names)
 
             out_tool = out_tool[out_tool["count"] >= min_count]
             out_tool["Tool_Num"] = out_tool["Tool_Num"].astype(str).replace({"": "(blank)"})
@@ -234,17 +241,23 @@ class RepeatOffendersUI(tk.Frame):
             return
 
         now = datetime.now()
-        path = f"{DATA_DIR}/repeat_offenders_{now.strftime('%Y_%m_%d_%H%M')}.xlsx"
-
-        try:
-            with pd.ExcelWriter(path, engine="openpyxl") as writer:
-                if self._out_part is not None:
-                    self._out_part.drop(columns=["_score"], errors="ignore").to_excel(writer, sheet_name="Part_Defect", index=False)
-                if self._out_mach is not None:
-                    self._out_mach.drop(columns=["_score"], errors="ignore").to_excel(writer, sheet_name="Machine", index=False)
-                if self._out_tool is not None:
-                    self._out_tool.drop(columns=["_score"], errors="ignore").to_excel(writer, sheet_name="Tool", index=False)
-
-            messagebox.showinfo("Exported", f"Exported:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Export failed", str(e))
+        path = filedialog.asksaveasfilename(
+            title="Export Repeat Offenders",
+            initialdir=DATA_DIR,
+            initialfile=f"repeat_offenders_{now.strftime('%Y_%m_%d_%H%M')}.xlsx",
+            defaultextension=".xlsx",
+            filetypes=[("Excel Workbook", "*.xlsx"), ("CSV", "*.csv")],
+        )
+        if not path:
+            return
+
+        frames = [
+            ("Part_Defect", self._out_part),
+            ("Machine", self._out_mach),
+            ("Tool", self._out_tool),
+        ]
+
+        def sheets():
+            return [dataframe_sheet(name, df, drop=["_score"]) for name, df in frames if df is not None]
+
+        run_export(self, path, sheets, title="Export Repeat Offenders")
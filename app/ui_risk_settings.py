@@ -5,6 +5,7 @@ from tkinter import ttk, messagebox
 from .ui_common import HeaderFrame
 from .storage import load_json, save_json
 from .config import RISK_CONFIG_FILE
+from .rule_config import invalidate
 
 
 def _safe_int(s: str, default: int) -> int:
@@ -216,6 +217,7 @@ class RiskSettingsUI(tk.Frame):
         gcal.setdefault("overdue_criticality_map", {"Low": "Medium", "Medium": "High", "High": "Critical", "Critical": "Critical"})
 
     def reload(self):
+        invalidate(RISK_CONFIG_FILE)
         self.cfg = load_json(RISK_CONFIG_FILE, {})
         self._ensure_shape()
         messagebox.showinfo("Reloaded", "Risk settings reloaded.\n\n(Re-open tab to refresh fields.)")
@@ -300,4 +302,6 @@ class RiskSettingsUI(tk.Frame):
         }
 
         save_json(RISK_CONFIG_FILE, self.cfg)
+        # Rule screens and alerts use the new thresholds from their next refresh.
+        invalidate(RISK_CONFIG_FILE)
         messagebox.showinfo("Saved", "Risk settings saved successfully.")
@@ -1,12 +1,13 @@
 # app/ui_shift_handoff.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
 
 import pandas as pd
 
-from .ui_common import HeaderFrame
-from .storage import get_df, safe_int, safe_float
+from .ui_common import HeaderFrame, run_export
+from .exporter import dataframe_sheet, tool_entries_sheet
+from .storage import entry_numbers, entry_times, flag_mask, get_df
 from .config import DATA_DIR
 from .db import get_scrap_costs_simple
 
@@ -25,7 +26,7 @@ class ShiftHandoffUI(tk.Frame):
     - Picks a date range
     - Summarizes key metrics
     - Shows top machines/parts/defects by qty and COPQ (if present)
-    - Export to Excel
+    - Export to Excel/CSV (entries streamed from the database)
     """
     def __init__(self, parent, controller, show_header=True):
         super().__init__(parent, bg=controller.colors["bg"])
@@ -46,7 +47,7 @@ class ShiftHandoffUI(tk.Frame):
         ).pack(side="left")
 
         tk.Button(top, text="Generate", command=self.generate).pack(side="right")
-        tk.Button(top, text="Export Excel", command=self.export).pack(side="right", padx=(0, 8))
+        tk.Button(top, text="Export", command=self.export).pack(side="right", padx=(0, 8))
 
         # Range selector
         rng = tk.Frame(self, bg=controller.colors["bg"], padx=10, pady=(0, 8))
@@ -105,6 +106,7 @@ class ShiftHandoffUI(tk.Frame):
         # cache last generated
         self._last_df = None
         self._last_summary_rows = None
+        self._last_range = None
 
         self.generate()
 
@@ -150,7 +152,7 @@ class ShiftHandoffUI(tk.Frame):
 
         # Ensure Date parsed
         df = df.copy()
-        df["_dt"] = pd.to_datetime(df.get("Date", ""), errors="coerce")
+        df["_dt"] = entry_times(df)
 
         start, end = self._get_range()
         if not start or not end:
@@ -162,10 +164,11 @@ class ShiftHandoffUI(tk.Frame):
         sub = df.loc[mask].copy()
 
         self._last_df = sub
+        self._last_range = (start, end)
 
         # Normalize numeric fields
-        sub["_defect_qty"] = sub.get("Defect_Qty", 0).apply(lambda x: safe_int(x, 0))
-        sub["_dtmins"] = sub.get("Downtime_Mins", 0).apply(lambda x: safe_float(x, 0.0))
+        sub["_defect_qty"] = entry_numbers(sub, "Defect_Qty", integer=True)
+        sub["_dtmins"] = entry_numbers(sub, "Downtime_Mins")
 
         # Metrics
         total_entries = len(sub)
@@ -176,7 +179,7 @@ class ShiftHandoffUI(tk.Frame):
         tool_changes = total_entries
 
         # Andon count
-        andon_count = sub.get("Andon_Flag", "").astype(str).str.lower().eq("yes").sum() if "Andon_Flag" in sub.columns else 0
+        andon_count = flag_mask(sub, "Andon_Flag").sum()
 
         # High/Critical risk count
         risk_high = sub.get("Customer_Risk", "").isin(["High", "Critical"]).sum() if "Customer_Risk" in sub.columns else 0
@@ -184,7 +187,7 @@ class ShiftHandoffUI(tk.Frame):
         # COPQ total if present
         copq_total = 0.0
         if "COPQ_Est" in sub.columns:
-            copq_total = sub["COPQ_Est"].apply(lambda x: safe_float(x, 0.0)).sum()
+            copq_total = entry_numbers(sub, "COPQ_Est").sum()
 
         scrap_costs = get_scrap_costs_simple()
         sub["_scrap_cost"] = sub.get("Part_Number", "").map(scrap_costs).fillna(0.0) * sub["_defect_qty"]
@@ -217,9 +220,9 @@ class ShiftHandoffUI(tk.Frame):
             for key, g in grp:
                 key = str(key).strip() if str(key).strip() else "(blank)"
                 count = len(g)
-                dqty = g.get("Defect_Qty", pd.Series([])).apply(lambda x: safe_int(x, 0)).sum()
-                dt = g.get("Downtime_Mins", pd.Series([])).apply(lambda x: safe_float(x, 0.0)).sum()
-                copq = g.get("COPQ_Est", pd.Series([])).apply(lambda x: safe_float(x, 0.0)).sum() if "COPQ_Est" in g.columns else 0.0
+                dqty = entry_numbers(g, "Defect_Qty", integer=True).sum()
+                dt = entry_numbers(g, "Downtime_Mins").sum()
+                copq = entry_numbers(g, "COPQ_Est").sum()
                 rows.append({
                     "group": label,
                     "key": f"{label}: {key}",
@@ -314,14 +317,25 @@ class ShiftHandoffUI(tk.Frame):
             messagebox.showwarning("Nothing to export", "Generate a report first.")
             return
 
+        start, end = self._last_range
+        offenders = self._last_summary_rows
+
         now = datetime.now()
-        path = f"{DATA_DIR}/shift_handoff_{now.strftime('%Y_%m_%d_%H%M')}.xlsx"
+        path = filedialog.asksaveasfilename(
+            title="Export Shift Handoff",
+            initialdir=DATA_DIR,
+            initialfile=f"shift_handoff_{now.strftime('%Y_%m_%d_%H%M')}.xlsx",
+            defaultextension=".xlsx",
+            filetypes=[("Excel Workbook", "*.xlsx"), ("CSV", "*.csv")],
+        )
+        if not path:
+            return
 
-        try:
-            with pd.ExcelWriter(path, engine="openpyxl") as writer:
-                self._last_df.drop(columns=["_dt"], errors="ignore").to_excel(writer, sheet_name="Filtered_Entries", index=False)
-                self._last_summary_rows.drop(columns=["_score"], errors="ignore").to_excel(writer, sheet_name="Top_Offenders", index=False)
+        # Entries are streamed from the database for the whole range, not copied from _last_df.
+        def sheets():
+            return [
+                tool_entries_sheet(start, end, name="Filtered_Entries"),
+                dataframe_sheet("Top_Offenders", offenders, drop=["_score"]),
+            ]
 
-            messagebox.showinfo("Exported", f"Exported:\n{path}")
-        except Exception as e:
-            messagebox.showerror("Export failed", str(e))
+        run_export(self, path, sheets, title="Export Shift Handoff")
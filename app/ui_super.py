@@ -152,6 +152,11 @@ class SuperUI(tk.Frame):
             "Repeat Offenders screen missing",
             "Expected: app/ui_repeat_offenders.py → class RepeatOffendersUI",
         )
+        PerformanceUI = _safe_view(
+            lambda: __import__("app.ui_performance", fromlist=["PerformanceUI"]).PerformanceUI,
+            "Performance screen missing",
+            "Expected: app/ui_performance.py → class PerformanceUI",
+        )
         TopUI = _safe_view(
             lambda: __import__("app.ui_top", fromlist=["TopUI"]).TopUI,
             "Top/Super Tools screen missing",
@@ -180,6 +185,7 @@ class SuperUI(tk.Frame):
             ("Top level", TopUI),
             ("Master Data", MasterDataUI),
             ("Admin", AdminUI),
+            ("Performance", PerformanceUI),
         ]
 
         # Build tabs
@@ -6,9 +6,10 @@ from .ui_common import HeaderFrame
 from .ui_action_center import ActionCenterUI
 from .ui_audit import AuditTrailUI
 from .screen_registry import get_screen_class
-from .storage import next_id, safe_int, safe_float, load_json, parts_for_line
-from .config import REASONS_FILE
-from .db import get_tool, update_tool_stock, upsert_tool_entry, list_tools_for_line, list_tool_inserts
+from .storage import next_id, safe_int, safe_float
+from .catalog import get_catalog
+from .db import get_tool
+from .submit_queue import submit_tool_entry
 from .audit import log_audit
 
 class ToolChangerUI(tk.Frame):
@@ -89,7 +90,7 @@ class ToolChangerUI(tk.Frame):
 
         # Reason
         tk.Label(body, text="Reason:", **style).grid(row=6, column=0, sticky="e", pady=5)
-        reasons = load_json(REASONS_FILE, [])
+        reasons = list(get_catalog().reasons)
         self.reason_cb = ttk.Combobox(body, values=reasons, state="readonly", width=28)
         self.reason_cb.grid(row=6, column=1, sticky="w")
 
@@ -147,7 +148,7 @@ class ToolChangerUI(tk.Frame):
         self.update_parts()
 
     def update_parts(self):
-        parts = parts_for_line(self.line_cb.get())
+        parts = get_catalog().parts_for_line(self.line_cb.get())
         self.part_cb["values"] = parts
 
     def update_tools(self, event=None):
@@ -156,7 +157,7 @@ class ToolChangerUI(tk.Frame):
         if not machine:
             return
 
-        tools = list_tools_for_line(line, include_unassigned=True)
+        tools = get_catalog().tools_for_line(line, include_unassigned=True)
         if not tools:
             if line == "U725":
                 tools = [str(i) for i in range(1, 24)] + ["60"]
@@ -208,20 +209,17 @@ class ToolChangerUI(tk.Frame):
         tool_num = self.tool_cb.get()
         cost = 0.0
 
-        # Inventory decrement (if configured)
+        # Cost per change is kept on the tool row; the stock decrement is queued with the entry
         info = get_tool(tool_num)
-        inserts = list_tool_inserts(tool_num)
-        if inserts:
-            cost = self._calculate_insert_cost(inserts)
+        take_tool = False
         if info:
-            if not inserts:
-                cost = safe_float(info.get("unit_cost", 0), 0.0)
+            cost = safe_float(info.get("cost_per_change", 0), 0.0)
             stock = safe_int(info.get("stock_qty", 0), 0)
             if stock <= 0:
                 if not messagebox.askyesno("Stock Warning", f"Tool {tool_num} is out of stock! Submit anyway?"):
                     return
             else:
-                update_tool_stock(tool_num, stock - 1)
+                take_tool = True
 
         now = datetime.now()
 
@@ -257,10 +255,17 @@ class ToolChangerUI(tk.Frame):
             "Serial_Numbers": ""
         }
 
-        upsert_tool_entry(new_row)
-        log_audit(self.controller.user, f"Tool change entry {new_row['ID']} saved")
-
-        messagebox.showinfo("Saved", f"Entry saved.\nTool cost: ${cost:,.2f}")
+        audit = f"Tool change entry {new_row['ID']} saved"
+        saved = submit_tool_entry(new_row, self.controller.user, audit, take_tool=take_tool)
+        log_audit(self.controller.user, audit, to_db=False)
+        if saved:
+            messagebox.showinfo("Saved", f"Entry saved.\nTool cost: ${cost:,.2f}")
+        else:
+            messagebox.showinfo(
+                "Queued",
+                "The database is busy. The entry is saved on this station and will be "
+                f"written automatically.\nTool cost: ${cost:,.2f}",
+            )
 
         # reset defect UI
         self.defect_var.set(False)
@@ -270,15 +275,3 @@ class ToolChangerUI(tk.Frame):
         self.defect_reason.delete(0, "end")
         self.life_entry.delete(0, "end"); self.life_entry.insert(0, "0")
         self.update_stock_display()
-
-    def _calculate_insert_cost(self, inserts):
-        total = 0.0
-        for ins in inserts:
-            count = safe_float(ins.get("insert_count", 0), 0.0)
-            price = safe_float(ins.get("price_per_insert", 0), 0.0)
-            life = safe_float(ins.get("tool_life", 0), 0.0)
-            sides = safe_float(ins.get("sides_per_insert", 1), 1.0)
-            if life <= 0 or sides <= 0:
-                continue
-            total += ((count * price) / life) / sides
-        return total
@@ -0,0 +1,228 @@
+# app/watchdog.py
+"""
+Tk event-loop stall watchdog.
+
+A heartbeat scheduled with after() every WATCHDOG_INTERVAL_MS records when the
+main loop last got to run, plus who is logged in and which screen is showing.
+A background thread checks the heartbeat; once it is late by more than
+WATCHDOG_STALL_MS the main loop is stalled, and the thread samples the main
+thread's Python stack every WATCHDOG_SAMPLE_MS until the heartbeat comes back.
+
+Each stall is appended to WATCHDOG_LOG_FILE as one JSON line: when, how long,
+station, user, screen, and the sampled stacks (most frequent first), so the
+refresh() or db call that blocked the UI can be read straight off the log.
+A stall still running after WATCHDOG_HANG_S is logged once while it is still
+going, so a station that has to be killed still leaves a record.
+
+On by default; TOOLLIFE_WATCHDOG=0 turns it off.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .config import (
+    PROJECT_ROOT,
+    WATCHDOG_ENABLED,
+    WATCHDOG_HANG_S,
+    WATCHDOG_INTERVAL_MS,
+    WATCHDOG_LOG_FILE,
+    WATCHDOG_SAMPLE_MS,
+    WATCHDOG_STACK_DEPTH,
+    WATCHDOG_STALL_MS,
+)
+
+_ROOT = str(PROJECT_ROOT)
+
+
+def _frame_label(fs: traceback.FrameSummary) -> str:
+    path = fs.filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{fs.lineno} {fs.name}"
+
+
+def sample_stack(thread_id: int, depth: int = WATCHDOG_STACK_DEPTH) -> List[str]:
+    """Innermost-first frames of another thread's current Python stack."""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return []
+    frames = traceback.extract_stack(frame)
+    return [_frame_label(fs) for fs in reversed(frames[-depth:])]
+
+
+def describe_screen(container) -> str:
+    """
+    Class name of the mounted role screen, plus the selected notebook tab when
+    it has one (the Super console keeps every screen in a tab). Main thread only.
+    """
+    try:
+        from tkinter import ttk
+
+        children = container.winfo_children()
+        if not children:
+            return ""
+        view = children[-1]
+        name = type(view).__name__
+        for child in view.winfo_children():
+            if isinstance(child, ttk.Notebook) and child.select():
+                return f"{name} / {child.tab(child.select(), 'text')}"
+        return name
+    except Exception:
+        return ""
+
+
+def _write(event: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(WATCHDOG_LOG_FILE)), exist_ok=True)
+        with open(WATCHDOG_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+    except OSError:
+        pass
+
+
+class Watchdog:
+    def __init__(self, root, context: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.root = root
+        self.context_fn = context
+        self.interval = WATCHDOG_INTERVAL_MS / 1000.0
+        self.stall_s = WATCHDOG_STALL_MS / 1000.0
+        self.sample_s = WATCHDOG_SAMPLE_MS / 1000.0
+
+        self._main_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._context: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._after_id = None
+
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self.count = 0
+        self.max_ms = 0.0
+
+    # ---- main thread ----
+    def start(self) -> None:
+        self._main_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._tick()
+        self._thread = threading.Thread(target=self._run, name="ui-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _tick(self) -> None:
+        if self._stop.is_set():
+            return
+        if self.context_fn is not None:
+            try:
+                self._context = dict(self.context_fn())
+            except Exception:
+                pass
+        self._beat = time.monotonic()
+        self._after_id = self.root.after(WATCHDOG_INTERVAL_MS, self._tick)
+
+    # ---- watchdog thread ----
+    def _late(self) -> float:
+        return time.monotonic() - self._beat - self.interval
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._late() < self.stall_s:
+                continue
+            self._capture()
+
+    def _capture(self) -> None:
+        beat = self._beat
+        started = beat + self.interval
+        context = dict(self._context)
+        stacks: Counter = Counter()
+        first: List[str] = []
+        hang_logged = False
+
+        while self._beat == beat and not self._stop.is_set():
+            stack = sample_stack(self._main_id)
+            if stack:
+                stacks[tuple(stack)] += 1
+                if not first:
+                    first = stack
+            if not hang_logged and time.monotonic() - started >= WATCHDOG_HANG_S:
+                hang_logged = True
+                _write(self._event(started, context, stacks, first, ongoing=True))
+            time.sleep(self.sample_s)
+
+        if self._stop.is_set():
+            return
+        event = self._event(started, context, stacks, first, ongoing=False)
+        self.count += 1
+        self.max_ms = max(self.max_ms, event["stall_ms"])
+        self.recent.append(event)
+        _write(event)
+
+    def _event(self, started: float, context: Dict[str, Any], stacks: Counter, first: List[str], ongoing: bool) -> Dict[str, Any]:
+        end = time.monotonic() if ongoing else self._beat
+        stall_ms = round((end - started) * 1000.0, 1)
+        total = sum(stacks.values())
+        return {
+            "at": datetime.fromtimestamp(time.time() - (time.monotonic() - started)).strftime("%Y-%m-%d %H:%M:%S"),
+            "stall_ms": stall_ms,
+            "ongoing": ongoing,
+            "station": socket.gethostname(),
+            "user": context.get("user") or "",
+            "role": context.get("role") or "",
+            "screen": context.get("screen") or "",
+            "samples": total,
+            "first_stack": first,
+            "stacks": [
+                {"count": n, "frames": list(frames)}
+                for frames, n in stacks.most_common(3)
+            ],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stalls": self.count,
+            "max_ms": self.max_ms,
+            "last": self.recent[-1] if self.recent else None,
+        }
+
+
+_watchdog: Optional[Watchdog] = None
+
+
+def start_watchdog(root, context: Optional[Callable[[], Dict[str, Any]]] = None) -> Optional[Watchdog]:
+    """Start the process-wide watchdog on this Tk root (call from the main thread)."""
+    global _watchdog
+    if not WATCHDOG_ENABLED:
+        return None
+    if _watchdog is None:
+        _watchdog = Watchdog(root, context)
+        _watchdog.start()
+    return _watchdog
+
+
+def stop_watchdog() -> None:
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
+
+
+def watchdog_stats() -> Optional[Dict[str, Any]]:
+    return _watchdog.stats() if _watchdog is not None else None
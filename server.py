@@ -0,0 +1,48 @@
+# server.py
+"""
+Headless Tool Life data service (see app/service.py).
+
+    python server.py [--host 127.0.0.1] [--port 8765] [--db data/toollife.db]
+
+Terminals then run main.py with TOOLLIFE_SERVICE_URL=http://<host>:<port>
+and the same TOOLLIFE_SERVICE_TOKEN as the service (required for any host
+other than loopback).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+
+def main(argv=None) -> int:
+    # This process owns the database file; never route it to another service.
+    os.environ.pop("TOOLLIFE_SERVICE_URL", None)
+
+    from app import config
+
+    parser = argparse.ArgumentParser(description="Tool Life data service")
+    parser.add_argument("--host", default=config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT)
+    parser.add_argument("--db", default=config.DB_PATH, help="SQLite file to serve")
+    args = parser.parse_args(argv)
+
+    # Set before app.db is imported so every module sees the served file.
+    config.DB_PATH = os.path.abspath(args.db)
+
+    from app.bootstrap import ensure_app_initialized
+    from app.backup import start_scheduler
+    from app.service import is_loopback, serve
+
+    if not config.SERVICE_TOKEN and not is_loopback(args.host):
+        print(f"Set TOOLLIFE_SERVICE_TOKEN before serving on {args.host}", file=sys.stderr)
+        return 2
+
+    ensure_app_initialized()
+    start_scheduler()
+    serve(args.host, args.port, config.DB_PATH)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())